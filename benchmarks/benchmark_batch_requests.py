@@ -0,0 +1,64 @@
+from random import Random
+from time import perf_counter
+
+from pyformlang.regular_expression import Regex
+
+from project.utils.batch_utils import batch_regular_request, clear_requests_cache
+from project.utils.graph_utils import gen_labeled_two_cycles_graph, regular_request
+
+SIZES_OF_CYCLES = [(40, 30), (80, 60)]
+COUNT_OF_REGEXES = 100
+PARTS_OF_REGEXES = ["a", "b", "a*", "b*", "(a|b)", "(a b)*", "x"]
+
+
+def gen_regexes(count_of_regexes: int, seed: int = 42) -> list:
+
+    """
+    Generates regular expressions over labels of two cycles graph
+
+    Args:
+        count_of_regexes: count of regular expressions
+        seed: seed of random generator
+
+    Returns:
+        List of texts of regular expressions
+    """
+
+    random = Random(seed)
+
+    return [
+        " ".join(random.choice(PARTS_OF_REGEXES) for _ in range(random.randint(1, 4)))
+        for _ in range(count_of_regexes)
+    ]
+
+
+def main():
+    regexes = gen_regexes(COUNT_OF_REGEXES)
+
+    for fst_num_nodes, snd_num_nodes in SIZES_OF_CYCLES:
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, ("a", "b"))
+
+        start = perf_counter()
+        for regex in regexes:
+            regular_request(graph, set(), set(), Regex(regex))
+        single_time = perf_counter() - start
+
+        clear_requests_cache()
+        start = perf_counter()
+        batch_regular_request(graph, regexes, workers=1)
+        serial_time = perf_counter() - start
+
+        clear_requests_cache()
+        start = perf_counter()
+        batch_regular_request(graph, regexes)
+        parallel_time = perf_counter() - start
+
+        print(
+            f"nodes: {fst_num_nodes + snd_num_nodes + 1}, regexes: {len(regexes)}, "
+            f"one by one: {single_time:.3f}s, batch: {serial_time:.3f}s, "
+            f"parallel batch: {parallel_time:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import io
+import json
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from pyformlang.regular_expression import Regex
+
+from project.server.batch_runner import clear_decompositions_cache, run_batch
+from project.utils.batch_utils import clear_requests_cache
+from project.utils.graph_utils import (
+    gen_labeled_two_cycles_graph,
+    load_from_dot,
+    regular_request,
+    save_as_dot,
+)
+
+SIZES_OF_CYCLES = [(20, 15), (40, 30), (60, 45)]
+COUNT_OF_QUERIES = 2000
+COUNT_OF_NAIVE_QUERIES = 100
+PARTS_OF_REGEXES = ["a", "b", "a*", "b*", "(a|b)", "(a b)*"]
+
+
+def gen_queries(graphs: dict, count_of_queries: int, seed: int = 42) -> list:
+
+    """
+    Generates JSON lines with queries to graphs in random order
+
+    Args:
+        graphs: dictionary where names of graphs matched with counts of vertices
+        count_of_queries: count of queries
+        seed: seed of random generator
+
+    Returns:
+        List of JSON lines
+    """
+
+    random = Random(seed)
+    names = sorted(graphs)
+    lines = []
+
+    for i in range(count_of_queries):
+        name = random.choice(names)
+        lines.append(
+            json.dumps(
+                {
+                    "id": i,
+                    "graph": name,
+                    "regex": " ".join(
+                        random.choice(PARTS_OF_REGEXES)
+                        for _ in range(random.randint(1, 3))
+                    ),
+                    "starting_vertices": [random.randrange(graphs[name])],
+                }
+            )
+        )
+
+    return lines
+
+
+def main():
+    with TemporaryDirectory() as directory:
+        paths = {}
+        sizes = {}
+        for fst_num_nodes, snd_num_nodes in SIZES_OF_CYCLES:
+            name = f"{fst_num_nodes}_{snd_num_nodes}"
+            paths[name] = str(Path(directory) / f"{name}.dot")
+            save_as_dot(
+                gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, ("a", "b")),
+                paths[name],
+            )
+            sizes[name] = fst_num_nodes + snd_num_nodes + 1
+
+        lines = gen_queries(sizes, COUNT_OF_QUERIES)
+
+        start = perf_counter()
+        for line in lines[:COUNT_OF_NAIVE_QUERIES]:
+            query = json.loads(line)
+            regular_request(
+                load_from_dot(paths[query["graph"]]),
+                {str(vertex) for vertex in query["starting_vertices"]},
+                set(),
+                Regex(query["regex"]),
+            )
+        naive_time = (perf_counter() - start) / COUNT_OF_NAIVE_QUERIES
+
+        for workers in (1, None):
+            clear_decompositions_cache()
+            clear_requests_cache()
+            start = perf_counter()
+            run_batch(iter(lines), io.StringIO(), paths, workers)
+            batch_time = (perf_counter() - start) / len(lines)
+
+            print(
+                f"queries: {len(lines)}, workers: {workers or 'all'}, "
+                f"load per query: {naive_time * 1000:.2f}ms, "
+                f"batch runner: {batch_time * 1000:.2f}ms per query"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from time import perf_counter
+
+from scipy.sparse import csr_matrix, random as random_matrix
+
+from project.utils.semiring_utils import boolean_matmul, masked_boolean_matmul
+
+SIZES_OF_MATRIXES = [2_000, 10_000]
+COUNT_OF_NONZERO_IN_ROW = 4
+COUNT_OF_ITERATIONS = 6
+
+
+def numeric_closure_of_rows(adjacency: csr_matrix) -> int:
+
+    """
+    Expands fronts by numeric product and difference with reached pairs
+    """
+
+    reached = csr_matrix(adjacency, dtype=int)
+    front = reached
+    for _ in range(COUNT_OF_ITERATIONS):
+        front = csr_matrix((front @ adjacency) > 0, dtype=int) > reached
+        reached = reached + front
+
+    return reached.count_nonzero()
+
+
+def boolean_closure_of_rows(adjacency: csr_matrix) -> int:
+
+    """
+    Expands fronts by boolean product masked by reached pairs
+    """
+
+    reached = csr_matrix(adjacency, dtype=bool)
+    front = reached
+    for _ in range(COUNT_OF_ITERATIONS):
+        front = masked_boolean_matmul(front, adjacency, reached)
+        reached = reached + front
+
+    return reached.nnz
+
+
+def main():
+    for size in SIZES_OF_MATRIXES:
+        adjacency = random_matrix(
+            size, size, COUNT_OF_NONZERO_IN_ROW / size, format="csr", random_state=42
+        )
+        adjacency.data[:] = 1
+
+        start = perf_counter()
+        numeric_count = (adjacency @ adjacency).count_nonzero()
+        numeric_time = perf_counter() - start
+
+        start = perf_counter()
+        boolean_count = boolean_matmul(adjacency, adjacency).nnz
+        boolean_time = perf_counter() - start
+
+        start = perf_counter()
+        numeric_reached = numeric_closure_of_rows(adjacency)
+        numeric_loop_time = perf_counter() - start
+
+        start = perf_counter()
+        boolean_reached = boolean_closure_of_rows(adjacency)
+        boolean_loop_time = perf_counter() - start
+
+        assert numeric_count == boolean_count and numeric_reached == boolean_reached
+        print(
+            f"size: {size}, numeric product: {numeric_time:.3f}s, "
+            f"boolean product: {boolean_time:.3f}s, "
+            f"numeric fronts: {numeric_loop_time:.3f}s, "
+            f"masked boolean fronts: {boolean_loop_time:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from random import Random
+from time import perf_counter
+
+from pyformlang.finite_automaton import NondeterministicFiniteAutomaton
+from pyformlang.regular_expression import Regex
+
+import project.utils.bin_matrix_utils as bin_matrix_utils
+from project.utils.bin_matrix_utils import (
+    bounded_transitive_closure,
+    build_binary_matrix_by_nfa,
+    transitive_closure,
+)
+from project.utils.graph_utils import bfs_regular_request, gen_labeled_two_cycles_graph
+
+COUNTS_OF_STATES = [500, 1500]
+DENSE_THRESHOLDS = [2.0, 0.25]
+
+
+def gen_binary_matrix(count_of_states: int, seed: int = 42):
+
+    """
+    Generates binary matrix of random automaton whose closure is dense
+
+    Args:
+        count_of_states: count of states of automaton
+        seed: seed of random generator
+
+    Returns:
+        BinaryMatrix of generated automaton
+    """
+
+    random = Random(seed)
+    nfa = NondeterministicFiniteAutomaton()
+
+    for _ in range(2 * count_of_states):
+        nfa.add_transition(
+            random.randrange(count_of_states),
+            random.choice("ab"),
+            random.randrange(count_of_states),
+        )
+
+    return build_binary_matrix_by_nfa(nfa)
+
+
+def main():
+    for count_of_states in COUNTS_OF_STATES:
+        binary_matrix = gen_binary_matrix(count_of_states)
+        graph = gen_labeled_two_cycles_graph(count_of_states // 20, 10, ("a", "b"))
+
+        for dense_threshold in DENSE_THRESHOLDS:
+            start = perf_counter()
+            transitive_closure(binary_matrix, dense_threshold=dense_threshold)
+            closure_time = perf_counter() - start
+
+            start = perf_counter()
+            bounded_transitive_closure(
+                binary_matrix, 10, dense_threshold=dense_threshold
+            )
+            bounded_time = perf_counter() - start
+
+            bin_matrix_utils.DENSITY_OF_DENSE_MATRIXES = dense_threshold
+            start = perf_counter()
+            bfs_regular_request(graph, Regex("(a|b)*"), separated_flag=True)
+            bfs_time = perf_counter() - start
+
+            print(
+                f"states: {count_of_states}, dense threshold: {dense_threshold}, "
+                f"closure: {closure_time:.3f}s, bounded closure: {bounded_time:.3f}s, "
+                f"separated bfs: {bfs_time:.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import tracemalloc
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from networkx import MultiDiGraph, drawing
+
+from project.utils.dot_utils import read_dot, write_dot
+from project.utils.edge_arrays_utils import edge_arrays_of_graph
+
+COUNTS_OF_EDGES = [2_000, 10_000, 100_000, 300_000]
+# reading by pydot takes minutes already on ten thousands of edges
+MAX_EDGES_FOR_PYDOT_READ = 2_000
+MAX_EDGES_FOR_PYDOT_WRITE = 100_000
+MARKS = ["a", "b", "c", "d"]
+
+
+def gen_random_graph(count_of_edges: int, seed: int = 42) -> MultiDiGraph:
+
+    """
+    Generates random labeled graph with ten times less vertices than edges
+
+    Args:
+        count_of_edges: count of edges
+        seed: seed of random generator
+
+    Returns:
+        Graph with attribute "label" of edges
+    """
+
+    random = Random(seed)
+    count_of_vertices = max(count_of_edges // 10, 1)
+    graph = MultiDiGraph()
+
+    graph.add_nodes_from(range(count_of_vertices))
+    for _ in range(count_of_edges):
+        graph.add_edge(
+            random.randrange(count_of_vertices),
+            random.randrange(count_of_vertices),
+            label=random.choice(MARKS),
+        )
+
+    return graph
+
+
+def measure(function, *arguments) -> (float, float):
+
+    """
+    Measures wall time and peak of memory allocated by python, memory is
+    measured by separate run because tracing slows down python code
+
+    Returns:
+        Time in seconds and peak of memory in megabytes
+    """
+
+    start = perf_counter()
+    function(*arguments)
+    time = perf_counter() - start
+
+    tracemalloc.start()
+    function(*arguments)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return time, peak / 2**20
+
+
+def main():
+    with TemporaryDirectory() as directory:
+        path = Path(directory) / "graph.dot"
+
+        for count_of_edges in COUNTS_OF_EDGES:
+            graph = gen_random_graph(count_of_edges)
+            edge_arrays = edge_arrays_of_graph(graph)
+
+            cases = {
+                "write edge arrays": (write_dot, edge_arrays, path),
+                "write graph": (write_dot, graph, path),
+                "read graph": (read_dot, path),
+                "read edge arrays": (read_dot, path, True),
+            }
+            if count_of_edges <= MAX_EDGES_FOR_PYDOT_WRITE:
+                cases["pydot write"] = (
+                    lambda: drawing.nx_pydot.to_pydot(graph).write_raw(path),
+                )
+            if count_of_edges <= MAX_EDGES_FOR_PYDOT_READ:
+                cases["pydot read"] = (drawing.nx_pydot.read_dot, path)
+
+            for name, (function, *arguments) in cases.items():
+                time, memory = measure(function, *arguments)
+                size = path.stat().st_size
+                print(
+                    f"edges: {count_of_edges}, {name}: {time:.3f}s "
+                    f"({count_of_edges / time / 1000:.0f}k edges/s, "
+                    f"{size / time / 2**20:.1f} MB/s), peak: {memory:.1f} MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from random import Random
+from time import perf_counter
+
+from pyformlang.regular_expression import Regex
+
+from project.grammar.extended_contex_free_grammar import (
+    extended_contex_free_grammar_from_string,
+)
+
+COUNTS_OF_RULES = [10_000, 50_000]
+
+
+def gen_extended_grammar(count_of_rules: int, seed: int = 42) -> str:
+
+    """
+    Generates extended contex free grammar with given count of rules
+
+    Args:
+        count_of_rules: count of rules in grammar
+        seed: seed of random generator
+
+    Returns:
+        Extended contex free grammar represented as string
+    """
+
+    random = Random(seed)
+    rules = []
+
+    for i in range(count_of_rules):
+        nonterminal = f"N{random.randrange(count_of_rules)}"
+        rules.append(
+            f"N{i} -> ( label_{random.randrange(100)} {nonterminal} )* "
+            f"| label_{random.randrange(100)}? [ N{i} label_{random.randrange(100)} ]"
+        )
+
+    return "\n".join(rules)
+
+
+def main():
+    for count_of_rules in COUNTS_OF_RULES:
+        grammar = gen_extended_grammar(count_of_rules)
+
+        start = perf_counter()
+        extended_contex_free_grammar = extended_contex_free_grammar_from_string(
+            grammar, "N0"
+        )
+        parse_time = perf_counter() - start
+
+        start = perf_counter()
+        for production in extended_contex_free_grammar.productions.values():
+            Regex(production.text)
+        regex_time = perf_counter() - start
+
+        print(
+            f"rules: {count_of_rules}, parse: {parse_time:.3f}s, "
+            f"eager Regex construction: {regex_time:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from time import perf_counter
+
+from cfpq_data import labeled_two_cycles_graph
+
+from project.utils.edge_arrays_utils import decompose_edge_arrays
+from project.utils.generators_utils import (
+    gen_grid_edge_arrays,
+    gen_power_law_edge_arrays,
+    gen_random_edge_arrays,
+    gen_two_cycles_edge_arrays,
+)
+from project.utils.graph_utils import decompose_graph
+
+SIZES_OF_CYCLES = [10_000, 100_000, 500_000]
+MAX_SIZE_FOR_CFPQ_DATA = 100_000
+COUNT_OF_VERTICES = 1_000_000
+COUNT_OF_EDGES = 2_000_000
+
+
+def measure(function, *arguments) -> (float, any):
+    start = perf_counter()
+    result = function(*arguments)
+
+    return perf_counter() - start, result
+
+
+def main():
+    for size in SIZES_OF_CYCLES:
+        time, edge_arrays = measure(gen_two_cycles_edge_arrays, size, size)
+        decomposition_time, _ = measure(decompose_edge_arrays, edge_arrays)
+        print(
+            f"two cycles of {size}: generation {time:.3f}s, "
+            f"decomposition {decomposition_time:.3f}s"
+        )
+
+        if size <= MAX_SIZE_FOR_CFPQ_DATA:
+            time, graph = measure(labeled_two_cycles_graph, size, size)
+            decomposition_time, _ = measure(decompose_graph, graph)
+            print(
+                f"two cycles of {size} by cfpq_data: generation {time:.3f}s, "
+                f"decomposition {decomposition_time:.3f}s"
+            )
+
+    cases = {
+        "random": (
+            gen_random_edge_arrays,
+            COUNT_OF_VERTICES,
+            COUNT_OF_EDGES / COUNT_OF_VERTICES / (COUNT_OF_VERTICES - 1),
+            ("a", "b"),
+            42,
+        ),
+        "power law": (
+            gen_power_law_edge_arrays,
+            COUNT_OF_VERTICES,
+            COUNT_OF_EDGES,
+            ("a", "b"),
+            2.5,
+            42,
+        ),
+        "grid": (gen_grid_edge_arrays, 1000, COUNT_OF_VERTICES // 1000),
+    }
+    for name, (function, *arguments) in cases.items():
+        time, edge_arrays = measure(function, *arguments)
+        decomposition_time, _ = measure(decompose_edge_arrays, edge_arrays)
+        print(
+            f"{name} with {len(edge_arrays.sources)} edges: generation {time:.3f}s, "
+            f"decomposition {decomposition_time:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
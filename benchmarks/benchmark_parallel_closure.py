@@ -0,0 +1,60 @@
+from os import cpu_count
+from random import Random
+from time import perf_counter
+
+from pyformlang.finite_automaton import NondeterministicFiniteAutomaton
+
+from project.utils.bin_matrix_utils import build_binary_matrix_by_nfa
+from project.utils.closure_utils import parallel_transitive_closure
+
+COUNT_OF_STATES = 5_000
+COUNT_OF_TRANSITIONS = 6_000
+
+
+def gen_binary_matrix(seed: int = 42):
+
+    """
+    Generates binary matrix of random automaton with two labels
+
+    Args:
+        seed: seed of random generator
+
+    Returns:
+        BinaryMatrix of generated automaton
+    """
+
+    random = Random(seed)
+    nfa = NondeterministicFiniteAutomaton()
+
+    for _ in range(COUNT_OF_TRANSITIONS):
+        nfa.add_transition(
+            random.randrange(COUNT_OF_STATES),
+            random.choice("ab"),
+            random.randrange(COUNT_OF_STATES),
+        )
+
+    return build_binary_matrix_by_nfa(nfa)
+
+
+def main():
+    binary_matrix = gen_binary_matrix()
+    counts_of_workers = sorted({1, 2, 4, cpu_count() or 1})
+    base_time = None
+
+    for workers in counts_of_workers:
+        start = perf_counter()
+        closure = parallel_transitive_closure(binary_matrix, workers)
+        closure_time = perf_counter() - start
+
+        if base_time is None:
+            base_time = closure_time
+
+        print(
+            f"workers: {workers}, states: {len(binary_matrix.indexes)}, "
+            f"pairs: {closure.nnz}, closure: {closure_time:.3f}s "
+            f"(x{base_time / closure_time:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from os import cpu_count
+from random import Random
+from time import perf_counter
+
+from networkx import MultiDiGraph
+from pyformlang.regular_expression import Regex
+
+from project.utils.graph_utils import bfs_regular_request, regular_request
+
+COUNT_OF_NODES = 400
+COUNT_OF_EDGES = 4_000
+COUNT_OF_LABELS = 16
+REGEX = "(" + " | ".join(f"l{i}" for i in range(COUNT_OF_LABELS)) + ")* l0"
+
+
+def gen_graph(seed: int = 42) -> MultiDiGraph:
+
+    """
+    Generates random graph with many labels
+
+    Args:
+        seed: seed of random generator
+
+    Returns:
+        Generated graph
+    """
+
+    random = Random(seed)
+    graph = MultiDiGraph()
+    graph.add_nodes_from(range(COUNT_OF_NODES))
+
+    for _ in range(COUNT_OF_EDGES):
+        graph.add_edge(
+            random.randrange(COUNT_OF_NODES),
+            random.randrange(COUNT_OF_NODES),
+            label=f"l{random.randrange(COUNT_OF_LABELS)}",
+        )
+
+    return graph
+
+
+def main():
+    graph = gen_graph()
+    regex = Regex(REGEX)
+    counts_of_threads = sorted({1, 2, 4, cpu_count() or 1})
+    base_times = None
+
+    for threads in counts_of_threads:
+        start = perf_counter()
+        regular_request(graph, set(), set(), regex, threads=threads)
+        product_time = perf_counter() - start
+
+        start = perf_counter()
+        bfs_regular_request(graph, regex, {0}, threads=threads)
+        bfs_time = perf_counter() - start
+
+        if base_times is None:
+            base_times = (product_time, bfs_time)
+
+        print(
+            f"threads: {threads}, "
+            f"product and closure: {product_time:.3f}s "
+            f"(x{base_times[0] / product_time:.2f}), "
+            f"bfs: {bfs_time:.3f}s (x{base_times[1] / bfs_time:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import io
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from pyformlang.regular_expression import Regex
+
+from project.language.interpreter import interpret
+from project.utils.graph_utils import (
+    gen_labeled_two_cycles_graph,
+    load_from_dot,
+    regular_request,
+    save_as_dot,
+)
+
+SIZES_OF_CYCLES = [(100, 80), (300, 200)]
+COUNT_OF_QUERIES = 20
+# regular expression and equal expression of query language
+REQUESTS = [
+    ("a* b", '"a"* . "b"'),
+    ("(a | b)* b b", '("a" | "b")* . "b" . "b"'),
+    ("a (b a)*", '"a" . ("b" . "a")*'),
+    ("(a a | b)*", '("a" . "a" | "b")*'),
+]
+
+
+def gen_program(path: str, count_of_queries: int, seed: int = 42) -> (str, list):
+
+    """
+    Generates program where requests are asked from few starting vertices
+    of graph, so some queries are repeated
+
+    Args:
+        path: path to graph in DOT format
+        count_of_queries: count of queries
+        seed: seed of random generator
+
+    Returns:
+        Text of program and list of pairs of starting vertex and regular expression
+    """
+
+    random = Random(seed)
+    lines = [f'let g = load("{path}")']
+    queries = []
+
+    for i in range(count_of_queries):
+        regex, expression = random.choice(REQUESTS)
+        vertex = random.randrange(10)
+        lines.append(
+            f"let r{i} = get_reachable(set_start({{{vertex}}}, g) & ({expression}))"
+        )
+        queries.append((vertex, regex))
+
+    return "\n".join(lines), queries
+
+
+def main():
+    with TemporaryDirectory() as directory:
+        for fst_num_nodes, snd_num_nodes in SIZES_OF_CYCLES:
+            path = str(Path(directory) / f"{fst_num_nodes}_{snd_num_nodes}.dot")
+            save_as_dot(
+                gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, ("a", "b")),
+                path,
+            )
+            program, queries = gen_program(path, COUNT_OF_QUERIES)
+
+            start = perf_counter()
+            graph = load_from_dot(path)
+            for vertex, regex in queries:
+                regular_request(graph, {str(vertex)}, set(), Regex(regex))
+            eager_time = perf_counter() - start
+
+            start = perf_counter()
+            interpret(program, io.StringIO())
+            lazy_time = perf_counter() - start
+
+            print(
+                f"nodes: {fst_num_nodes + snd_num_nodes + 1}, "
+                f"queries: {len(queries)}, "
+                f"regular_request one by one: {eager_time:.3f}s, "
+                f"interpreter: {lazy_time:.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
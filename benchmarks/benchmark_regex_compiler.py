@@ -0,0 +1,70 @@
+from random import Random
+from time import perf_counter
+
+from pyformlang.regular_expression import Regex
+
+from project.utils.automata_utils import gen_min_dfa_by_reg
+from project.utils.bin_matrix_utils import build_binary_matrix_by_nfa
+from project.utils.regex_utils import build_binary_matrix_by_reg
+
+COUNTS_OF_ALTERNATIVES = [25, 50, 100, 1000]
+COUNT_OF_PREDICATES = 20
+
+
+def gen_union_regex(count_of_alternatives: int, seed: int = 42) -> str:
+
+    """
+    Generates union of sequences of predicates like machine-generated requests
+
+    Args:
+        count_of_alternatives: count of sequences in union
+        seed: seed of random generator
+
+    Returns:
+        Text of regular expression
+    """
+
+    random = Random(seed)
+    predicates = [f"p{i}" for i in range(COUNT_OF_PREDICATES)]
+
+    return " | ".join(
+        "("
+        + " ".join(random.choice(predicates) for _ in range(random.randint(2, 5)))
+        + ("*" if random.random() < 0.1 else "")
+        + ")"
+        for _ in range(count_of_alternatives)
+    )
+
+
+def main():
+    for count_of_alternatives in COUNTS_OF_ALTERNATIVES:
+        regex = gen_union_regex(count_of_alternatives)
+
+        start = perf_counter()
+        try:
+            states = len(
+                build_binary_matrix_by_nfa(gen_min_dfa_by_reg(Regex(regex))).indexes
+            )
+            pyformlang_time = f"{perf_counter() - start:.3f}s ({states} states)"
+        except RecursionError:
+            pyformlang_time = "failed by recursion"
+
+        start = perf_counter()
+        states = len(build_binary_matrix_by_reg(regex).indexes)
+        minimal_time = perf_counter() - start
+
+        start = perf_counter()
+        subset_states = len(build_binary_matrix_by_reg(regex, minimize=False).indexes)
+        subset_time = perf_counter() - start
+
+        print(
+            f"alternatives: {count_of_alternatives}, "
+            f"pyformlang: {pyformlang_time}, "
+            f"glushkov: {minimal_time:.3f}s ({states} states), "
+            f"glushkov without minimization: {subset_time:.3f}s "
+            f"({subset_states} states)"
+        )
+
+
+if __name__ == "__main__":
+    main()
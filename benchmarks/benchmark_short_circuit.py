@@ -0,0 +1,112 @@
+from random import Random
+from time import perf_counter
+
+from pyformlang.finite_automaton import State
+from pyformlang.regular_expression import Regex
+
+from project.utils.edge_arrays_utils import graph_of_edge_arrays
+from project.utils.generators_utils import gen_random_edge_arrays
+from project.utils.graph_utils import (
+    bfs_by_direction,
+    bfs_regular_request,
+    decompose_graph,
+    exists,
+    exists_by_binary_matrixes,
+    regular_request,
+)
+from project.utils.regex_utils import build_binary_matrix_by_reg
+
+COUNT_OF_VERTICES = 3000
+AVERAGE_DEGREE = 3
+COUNT_OF_PAIRS = 10
+LIMIT = 100
+REGEXES = ["a* b", "(a | b)* c", "a b* (c | a)*"]
+
+
+def measure(function, *arguments, **options) -> (float, any):
+    start = perf_counter()
+    result = function(*arguments, **options)
+
+    return perf_counter() - start, result
+
+
+def main():
+    graph = graph_of_edge_arrays(
+        gen_random_edge_arrays(
+            COUNT_OF_VERTICES,
+            AVERAGE_DEGREE / (COUNT_OF_VERTICES - 1),
+            ("a", "b", "c"),
+            seed=42,
+        )
+    )
+    random = Random(42)
+    pairs = [
+        (random.randrange(COUNT_OF_VERTICES), random.randrange(COUNT_OF_VERTICES))
+        for _ in range(COUNT_OF_PAIRS)
+    ]
+
+    decomposition = decompose_graph(graph)
+
+    for regex in REGEXES:
+        full_time = exists_time = 0
+        for vertex_from, vertex_to in pairs:
+            time, reached = measure(
+                bfs_regular_request, graph, Regex(regex), {vertex_from}, None
+            )
+            full_time += time
+            time, answer = measure(exists, graph, vertex_from, vertex_to, Regex(regex))
+            exists_time += time
+            assert answer == (vertex_to in reached)
+        print(
+            f"{regex}: {COUNT_OF_PAIRS} pairs, full bfs {full_time:.3f}s, "
+            f"exists {exists_time:.3f}s"
+        )
+
+        binary_matrix_of_request = build_binary_matrix_by_reg(Regex(regex))
+        full_time = exists_time = 0
+        for vertex_from, vertex_to in pairs:
+            time, reached = measure(
+                lambda: {
+                    key
+                    for key, _ in bfs_by_direction(
+                        binary_matrix_of_request,
+                        decomposition._replace(starting_states={State(vertex_from)}),
+                    )
+                }
+            )
+            full_time += time
+            time, answer = measure(
+                exists_by_binary_matrixes,
+                decomposition,
+                binary_matrix_of_request,
+                vertex_from,
+                vertex_to,
+            )
+            exists_time += time
+            assert answer == (vertex_to in reached)
+        print(
+            f"{regex}: {COUNT_OF_PAIRS} pairs by prebuilt decomposition, "
+            f"full bfs {full_time:.3f}s, exists {exists_time:.3f}s"
+        )
+
+        starting_vertices = set(range(0, COUNT_OF_VERTICES, 10))
+        full_time, result = measure(
+            regular_request, graph, starting_vertices, set(), Regex(regex)
+        )
+        limit_time, limited = measure(
+            regular_request,
+            graph,
+            starting_vertices,
+            set(),
+            Regex(regex),
+            limit=LIMIT,
+        )
+        assert limited <= result
+        print(
+            f"{regex}: {len(result)} pairs by closure {full_time:.3f}s, "
+            f"first {len(limited)} of them {limit_time:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
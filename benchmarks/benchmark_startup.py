@@ -0,0 +1,81 @@
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from project.utils.graph_utils import gen_labeled_two_cycles_graph, save_as_dot
+
+MODULES = [
+    "project.__main__",
+    "project.utils.graph_utils",
+    "project.utils.batch_utils",
+    "project.utils.cfpq_utils",
+    "project.server.query_server",
+]
+COUNT_OF_RUNS = 5
+
+
+def time_of_command(arguments: list) -> float:
+
+    """
+    Measures wall time of fresh python process, the best of several runs is taken
+
+    Args:
+        arguments: arguments of python interpreter
+
+    Returns:
+        Minimal wall time of runs in seconds
+    """
+
+    times = []
+    for _ in range(COUNT_OF_RUNS):
+        start = perf_counter()
+        subprocess.run(
+            [sys.executable, *arguments],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        times.append(perf_counter() - start)
+
+    return min(times)
+
+
+def main():
+    interpreter_time = time_of_command(["-c", "pass"])
+    print(f"interpreter: {interpreter_time:.3f}s")
+
+    for module in MODULES:
+        print(
+            f"import {module}: "
+            f"{time_of_command(['-c', f'import {module}']) - interpreter_time:.3f}s"
+        )
+
+    with TemporaryDirectory() as directory:
+        path_to_graph = Path(directory) / "graph.dot"
+        save_as_dot(gen_labeled_two_cycles_graph(5, 5, ("a", "b")), path_to_graph)
+        path_to_grammar = Path(directory) / "grammar.txt"
+        path_to_grammar.write_text("S -> a S b | a b")
+
+        commands = {
+            "help": ["--help"],
+            "regular": ["regular", str(path_to_graph), "a* b"],
+            "regular by bfs": [
+                "regular",
+                str(path_to_graph),
+                "a* b",
+                "--algorithm",
+                "bfs",
+            ],
+            "cfg": ["cfg", str(path_to_graph), str(path_to_grammar)],
+        }
+        for name, arguments in commands.items():
+            print(
+                f"python -m project {name}: "
+                f"{time_of_command(['-m', 'project', *arguments]):.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,231 @@
-print("exec sources directory")
+import argparse
+import sys
+
+
+def _parse_graph(graph: str) -> tuple:
+
+    """
+    Parses graph given as NAME=PATH
+    """
+
+    name, separator, path = graph.partition("=")
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"Graph {graph} is not NAME=PATH")
+
+    return name, path
+
+
+def _write_pairs(pairs, output):
+
+    """
+    Writes pairs of vertices sorted by their names, one pair per line
+    separated by tab
+    """
+
+    for vertex_from, vertex_to in sorted(
+        pairs, key=lambda pair: (str(pair[0]), str(pair[1]))
+    ):
+        output.write(f"{vertex_from}\t{vertex_to}\n")
+
+
+def _load_graph(path: str):
+
+    """
+    Loads graph from DOT file, heavy modules are imported only here
+    """
+
+    from project.server.query_server import load_graphs
+
+    return load_graphs({path: path})[path]
+
+
+def build_parser() -> argparse.ArgumentParser:
+
+    """
+    Builds parser of command line arguments
+    """
+
+    parser = argparse.ArgumentParser(prog="python -m project")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="answer regular requests over socket")
+    serve.add_argument(
+        "--graph",
+        action="append",
+        default=[],
+        type=_parse_graph,
+        metavar="NAME=PATH",
+        help="graph in DOT format to be loaded, can be repeated",
+    )
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--unix", default=None, help="path of unix socket")
+    serve.add_argument("--workers", type=int, default=None)
+    serve.add_argument("--timeout", type=float, default=None)
+    serve.add_argument("--max-pending", type=int, default=None)
+    serve.add_argument("--heavy-cost", type=int, default=None)
+
+    regular = commands.add_parser(
+        "regular", help="find pairs of vertices connected by path satisfying regex"
+    )
+    regular.add_argument("graph", help="path of graph in DOT format")
+    regular.add_argument("regex", help="text of regular expression")
+    regular.add_argument(
+        "--algorithm",
+        choices=("closure", "bfs"),
+        default="closure",
+        help="transitive closure of intersection xor multiple source bfs",
+    )
+    regular.add_argument("--start", nargs="*", default=[], metavar="VERTEX")
+    regular.add_argument("--final", nargs="*", default=[], metavar="VERTEX")
+
+    contex_free = commands.add_parser(
+        "cfg", help="find pairs of vertices connected by path derivable in grammar"
+    )
+    contex_free.add_argument("graph", help="path of graph in DOT format")
+    contex_free.add_argument("grammar", help="path of file with contex free grammar")
+    contex_free.add_argument("--starting-nonterminal", default="S")
+    contex_free.add_argument("--start", nargs="*", default=[], metavar="VERTEX")
+    contex_free.add_argument("--final", nargs="*", default=[], metavar="VERTEX")
+
+    run = commands.add_parser("run", help="execute program of graph query language")
+    run.add_argument("program", help="path of file with program, stdin if -")
+
+    batch = commands.add_parser(
+        "batch", help="answer regular requests given as JSON lines"
+    )
+    batch.add_argument(
+        "input", nargs="?", default="-", help="file with queries, stdin if -"
+    )
+    batch.add_argument(
+        "--graph",
+        action="append",
+        default=[],
+        type=_parse_graph,
+        metavar="NAME=PATH",
+        help="name of graph that is used in queries, can be repeated",
+    )
+    batch.add_argument("--workers", type=int, default=None)
+    batch.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="count of queries that are grouped by graphs at once",
+    )
+
+    return parser
+
+
+def main(arguments: list = None, output=None):
+
+    """
+    Runs command, modules of queries are imported only by commands that use them,
+    so parsing of arguments and help are fast
+    """
+
+    arguments = build_parser().parse_args(arguments)
+    output = sys.stdout if output is None else output
+
+    if arguments.command == "regular":
+        from pyformlang.regular_expression import Regex
+
+        from project.utils.graph_utils import bfs_regular_request, regular_request
+
+        graph = _load_graph(arguments.graph)
+
+        if arguments.algorithm == "bfs":
+            pairs = bfs_regular_request(
+                graph,
+                Regex(arguments.regex),
+                set(arguments.start),
+                set(arguments.final),
+                separated_flag=True,
+            )
+        else:
+            pairs = {
+                (vertex_from.value, vertex_to.value)
+                for vertex_from, vertex_to in regular_request(
+                    graph,
+                    set(arguments.start),
+                    set(arguments.final),
+                    Regex(arguments.regex),
+                )
+            }
+
+        _write_pairs(pairs, output)
+
+    elif arguments.command == "cfg":
+        from project.utils.cfpq_utils import matrix_contex_free_request
+
+        with open(arguments.grammar, "r") as file:
+            grammar = file.read()
+
+        _write_pairs(
+            matrix_contex_free_request(
+                _load_graph(arguments.graph),
+                grammar,
+                set(arguments.start),
+                set(arguments.final),
+                arguments.starting_nonterminal,
+            ),
+            output,
+        )
+
+    elif arguments.command == "run":
+        from project.language.interpreter import QueryInterpreterExepction, interpret
+        from project.language.query_parser import QueryParserExepction
+
+        if arguments.program == "-":
+            text = sys.stdin.read()
+        else:
+            with open(arguments.program, "r") as file:
+                text = file.read()
+
+        try:
+            interpret(text, output)
+        except (QueryParserExepction, QueryInterpreterExepction) as exception:
+            sys.stderr.write(f"Program is failed. {exception.message}\n")
+            return 1
+        sys.stderr.write("Program is finished successfully\n")
+
+    elif arguments.command == "batch":
+        from project.server.batch_runner import DEFAULT_SIZE_OF_CHUNK, run_batch
+
+        lines = sys.stdin if arguments.input == "-" else open(arguments.input, "r")
+        try:
+            run_batch(
+                lines,
+                output,
+                dict(arguments.graph),
+                arguments.workers,
+                arguments.chunk_size or DEFAULT_SIZE_OF_CHUNK,
+            )
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+
+    elif arguments.command == "serve":
+        import asyncio
+
+        from project.server.query_server import QueryServer, load_graphs
+
+        options = {
+            name: getattr(arguments, name)
+            for name in ("timeout", "max_pending", "heavy_cost")
+            if getattr(arguments, name) is not None
+        }
+        server = QueryServer(
+            load_graphs(dict(arguments.graph)),
+            workers=arguments.workers,
+            **options,
+        )
+        try:
+            asyncio.run(
+                server.serve_forever(arguments.host, arguments.port, arguments.unix)
+            )
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
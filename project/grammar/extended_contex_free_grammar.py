@@ -1,7 +1,9 @@
+import re
 from pathlib import Path
 from collections import namedtuple
 
 from pyformlang.cfg import CFG, Variable
+from pyformlang.finite_automaton import EpsilonNFA
 from pyformlang.regular_expression import Regex
 
 from project.utils.grammar_utils import read_contex_free_grammar_from_file
@@ -12,11 +14,57 @@ ExtendedContexFreeGrammar = namedtuple(
 )
 
 
+_OPERATORS = {"(", ")", "|", "+", "*", ".", "$"}
+_EPSILONS = {"epsilon", "endpoint", "$"}
+_TOKEN_PATTERN = re.compile(r"[()\[\]|+*?.$]|[^\s()\[\]|+*?.$]+")
+
+
 class ExtendedContexFreeGrammarExepction(Exception):
     def __init__(self, msg: str):
         self.message = msg
 
 
+class LazyRegex:
+
+    """
+    Regular expression of production that is kept as text
+    and converted to pyformlang Regex only when it is needed
+    """
+
+    __slots__ = ("text", "_regex")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._regex = None
+
+    @property
+    def regex(self) -> Regex:
+        if self._regex is None:
+            self._regex = Regex(self.text)
+        return self._regex
+
+    def to_epsilon_nfa(self) -> EpsilonNFA:
+        return self.regex.to_epsilon_nfa()
+
+    def union(self, other: "LazyRegex") -> "LazyRegex":
+        return LazyRegex(f"( {self.text} ) | ( {other.text} )")
+
+    def __repr__(self) -> str:
+        return self.text
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, LazyRegex) and self.text == other.text
+
+    def __hash__(self) -> int:
+        return hash(self.text)
+
+    def __getstate__(self) -> tuple:
+        return (self.text,)
+
+    def __setstate__(self, state: tuple):
+        self.text, self._regex = state[0], None
+
+
 def extend_contex_free_grammar(
     contex_free_grammar: CFG | str | Path, starting_nonterminal: str = None
 ) -> ExtendedContexFreeGrammar:
@@ -38,7 +86,7 @@ def extend_contex_free_grammar(
             contex_free_grammar, Variable(starting_nonterminal)
         )
 
-    if isinstance(contex_free_grammar, str):
+    if isinstance(contex_free_grammar, Path):
         contex_free_grammar = read_contex_free_grammar_from_file(
             contex_free_grammar, starting_nonterminal
         )
@@ -70,12 +118,76 @@ def extend_contex_free_grammar(
     )
 
 
+def _tokenize_body(body: str, number_of_line: int) -> (list, set):
+
+    """
+    Splits body of production into tokens of regular expression
+    and normalizes them to syntax of pyformlang
+
+    Args:
+        body: body of production
+        number_of_line: number of line with production for error messages
+
+    Returns:
+        Normalized tokens of regular expression and set of names of symbols
+    """
+
+    tokens = []
+    symbols = set()
+    opened_groups = []
+    # start of the last operand with its postfix *, None after
+    # opening parenthesis and binary operators |, + and .
+    operand_start = None
+
+    for token in _TOKEN_PATTERN.findall(body):
+        if token in ("(", "["):
+            opened_groups.append(len(tokens))
+            tokens.append("(")
+            operand_start = None
+        elif token in (")", "]"):
+            if not opened_groups:
+                raise ExtendedContexFreeGrammarExepction(
+                    f"Unbalanced parentheses in production at line {number_of_line}"
+                )
+            operand_start = opened_groups.pop()
+            tokens.append(")")
+        elif token == "?":
+            if operand_start is None:
+                raise ExtendedContexFreeGrammarExepction(
+                    f"Missing operand of ? in production at line {number_of_line}"
+                )
+            # operand is grouped, so union with $ does not take neighbours
+            operand = tokens[operand_start:]
+            tokens[operand_start:] = ["(", "(", *operand, ")", "|", "$", ")"]
+        elif token in ("|", "+", "."):
+            tokens.append(token)
+            operand_start = None
+        elif token == "*":
+            tokens.append(token)
+        else:
+            if token in _EPSILONS:
+                token = "$"
+            elif token not in _OPERATORS:
+                symbols.add(token)
+            operand_start = len(tokens)
+            tokens.append(token)
+
+    if opened_groups:
+        raise ExtendedContexFreeGrammarExepction(
+            f"Unbalanced parentheses in production at line {number_of_line}"
+        )
+
+    return tokens, symbols
+
+
 def extended_contex_free_grammar_from_string(
     extend_contex_free_grammar: str, starting_symbol: str
 ) -> ExtendedContexFreeGrammar:
 
     """
     Builds extended contex free grammar from string representation
+    in one pass over its tokens, regular expressions of productions are
+    kept as text until their automata are needed
 
     Args:
         extend_contex_free_grammar: extended contex free grammar
@@ -86,35 +198,42 @@ def extended_contex_free_grammar_from_string(
         Extended contex free grammar as namedtuple
     """
 
-    string_productions = extend_contex_free_grammar.split("\n")
-
-    productions: dict[Variable, Regex] = {}
-    nonterminals = set()
-    terminals = set()
-    for production in string_productions:
-        tokens = production.split(" ")
-
-        if len(tokens) < 3:
-            raise ExtendedContexFreeGrammarExepction("Production missing elements")
-
-        if tokens[1] not in ["->"]:
-            raise ExtendedContexFreeGrammarExepction("Missing -> in production")
-
-        for token in tokens[2:]:
-            if token in ["epsilon", "endpoint"]:
-                continue
-            token = filter(lambda char: char not in "[]()|+*?", token)
-            for symbol in token:
-                terminals.add(symbol)
-
-        nonterminal = tokens[0]
-        subautomata = Regex(" ".join(tokens[2:]))
-
-        productions[Variable(nonterminal)] = subautomata
-        nonterminals.add(nonterminal)
+    bodies: dict[str, list] = {}
+    symbols = set()
+
+    for number_of_line, production in enumerate(
+        extend_contex_free_grammar.splitlines(), 1
+    ):
+        if not production.strip():
+            continue
+
+        head, arrow, body = production.partition("->")
+        head = head.strip()
+
+        if not arrow:
+            raise ExtendedContexFreeGrammarExepction(
+                f"Missing -> in production at line {number_of_line}"
+            )
+        if not head or " " in head or not body.strip():
+            raise ExtendedContexFreeGrammarExepction(
+                f"Production missing elements at line {number_of_line}"
+            )
+
+        tokens, body_symbols = _tokenize_body(body, number_of_line)
+        symbols |= body_symbols
+        bodies.setdefault(head, []).append(" ".join(tokens))
+
+    productions: dict[Variable, LazyRegex] = {
+        Variable(head): LazyRegex(
+            head_bodies[0]
+            if len(head_bodies) == 1
+            else " | ".join(f"( {body} )" for body in head_bodies)
+        )
+        for head, head_bodies in bodies.items()
+    }
 
-    terminals = list(map(lambda symbol: Variable(symbol), terminals - nonterminals))
-    nonterminals = list(map(lambda symbol: Variable(symbol), nonterminals))
+    terminals = [Variable(symbol) for symbol in sorted(symbols - bodies.keys())]
+    nonterminals = [Variable(symbol) for symbol in bodies.keys()]
 
     return ExtendedContexFreeGrammar(
         nonterminals, terminals, Variable(starting_symbol), productions
@@ -138,6 +257,6 @@ def extended_contex_free_grammar_from_file(
     """
 
     with open(path_to_file_with_grammar, "r") as file:
-        grammar = file.read().trim()
+        grammar = file.read()
 
-    return extend_contex_free_grammar_from_string(grammar, starting_symbol)
+    return extended_contex_free_grammar_from_string(grammar, starting_symbol)
@@ -0,0 +1,432 @@
+from collections import namedtuple
+
+from networkx import MultiDiGraph
+from pyformlang.cfg import CFG
+from pyformlang.finite_automaton import NondeterministicFiniteAutomaton
+
+from project.grammar.extended_contex_free_grammar import ExtendedContexFreeGrammar
+
+GrammarAnalysis = namedtuple(
+    "GrammarAnalysis",
+    [
+        "starting_symbol",
+        "nullable",
+        "generating",
+        "reachable",
+        "first",
+        "follow",
+        "relevant_labels",
+    ],
+)
+
+_Box = namedtuple("_Box", ["head", "starting_states", "final_states", "transitions"])
+
+
+def analyze_grammar(grammar: CFG | ExtendedContexFreeGrammar) -> GrammarAnalysis:
+
+    """
+    Computes nullable, generating and reachable nonterminals,
+    FIRST and FOLLOW sets of labels and set of labels that can appear
+    in derivation from starting nonterminal
+
+    Args:
+        grammar: contex free grammar or extended contex free grammar
+
+    Returns:
+        GrammarAnalysis - namedtuple that contains name of starting nonterminal,
+        sets of names of nullable, generating and reachable nonterminals,
+        dictionaries where nonterminals matched with FIRST and FOLLOW sets
+        and set of labels that are relevant for queries with grammar
+    """
+
+    if isinstance(grammar, CFG):
+        starting_symbol, nonterminals, boxes = _boxes_of_contex_free_grammar(grammar)
+    else:
+        starting_symbol, nonterminals, boxes = _boxes_of_extended_grammar(grammar)
+
+    nullable = _fixpoint_of_boxes(boxes, lambda symbol, found: symbol in found)
+    generating = _fixpoint_of_boxes(
+        boxes, lambda symbol, found: symbol not in nonterminals or symbol in found
+    )
+    boxes = [_trim_box(box, nonterminals, generating) for box in boxes]
+
+    boxes_by_heads = {}
+    for box in boxes:
+        boxes_by_heads.setdefault(box.head, []).append(box)
+
+    reachable = set()
+    if starting_symbol in generating:
+        reachable.add(starting_symbol)
+        worklist = [starting_symbol]
+        while worklist:
+            for box in boxes_by_heads[worklist.pop()]:
+                for symbol, _ in _edges_of_box(box):
+                    if symbol in nonterminals and symbol not in reachable:
+                        reachable.add(symbol)
+                        worklist.append(symbol)
+
+    relevant_labels = {
+        symbol
+        for box in boxes
+        if box.head in reachable
+        for symbol, _ in _edges_of_box(box)
+        if symbol not in nonterminals
+    }
+
+    first = _first_sets(boxes, nonterminals, nullable)
+    follow = _follow_sets(boxes, nonterminals, nullable, first)
+
+    return GrammarAnalysis(
+        starting_symbol,
+        nullable,
+        generating,
+        reachable,
+        first,
+        follow,
+        relevant_labels,
+    )
+
+
+def prune_graph_by_labels(graph: MultiDiGraph, labels: set) -> MultiDiGraph:
+
+    """
+    Removes edges which labels can not be used by query, all vertices are kept
+
+    Args:
+        graph: graph to be pruned
+        labels: labels that can be used by query
+
+    Returns:
+        Graph with edges marked by given labels only
+    """
+
+    pruned_graph = MultiDiGraph()
+    pruned_graph.add_nodes_from(graph.nodes(data=True))
+    pruned_graph.add_edges_from(
+        (state_from, state_to, key, data)
+        for state_from, state_to, key, data in graph.edges(keys=True, data=True)
+        if data.get("label") in labels
+    )
+
+    return pruned_graph
+
+
+def prune_graph_by_grammar(
+    graph: MultiDiGraph, grammar: CFG | ExtendedContexFreeGrammar | GrammarAnalysis
+) -> MultiDiGraph:
+
+    """
+    Removes edges which labels never contribute to derivation
+    from starting nonterminal of grammar
+
+    Args:
+        graph: graph to be pruned
+        grammar: grammar of query or its analysis
+
+    Returns:
+        Graph with relevant edges only
+    """
+
+    if not isinstance(grammar, GrammarAnalysis):
+        grammar = analyze_grammar(grammar)
+
+    return prune_graph_by_labels(graph, grammar.relevant_labels)
+
+
+def _boxes_of_contex_free_grammar(contex_free_grammar: CFG) -> (str, set, list):
+
+    """
+    Represents each production of contex free grammar as chain automaton
+
+    Args:
+        contex_free_grammar: grammar to be represented
+
+    Returns:
+        Name of starting nonterminal, names of nonterminals and list of boxes
+    """
+
+    nonterminals = {str(variable.value) for variable in contex_free_grammar.variables}
+    boxes = []
+
+    for production in contex_free_grammar.productions:
+        body = [str(symbol.value) for symbol in production.body]
+        boxes.append(
+            _Box(
+                str(production.head.value),
+                {0},
+                {len(body)},
+                {i: [(symbol, i + 1)] for i, symbol in enumerate(body)},
+            )
+        )
+
+    starting_symbol = contex_free_grammar.start_symbol
+
+    return (
+        None if starting_symbol is None else str(starting_symbol.value),
+        nonterminals,
+        boxes,
+    )
+
+
+def _boxes_of_extended_grammar(
+    extended_contex_free_grammar: ExtendedContexFreeGrammar,
+) -> (str, set, list):
+
+    """
+    Represents each production of extended contex free grammar
+    as automaton without epsilon transitions
+
+    Args:
+        extended_contex_free_grammar: grammar to be represented
+
+    Returns:
+        Name of starting nonterminal, names of nonterminals and list of boxes
+    """
+
+    nonterminals = {
+        str(nonterminal.value)
+        for nonterminal in extended_contex_free_grammar.nonterminals
+    }
+    boxes = []
+
+    for head, regex in extended_contex_free_grammar.productions.items():
+        automaton = regex.to_epsilon_nfa()
+        if not isinstance(automaton, NondeterministicFiniteAutomaton):
+            automaton = automaton.remove_epsilon_transitions()
+
+        transitions = {}
+        for state_from, marked_transitions in automaton.to_dict().items():
+            for mark, states_to in marked_transitions.items():
+                if not isinstance(states_to, set):
+                    states_to = {states_to}
+                transitions.setdefault(state_from, []).extend(
+                    (str(mark.value), state_to) for state_to in states_to
+                )
+
+        boxes.append(
+            _Box(
+                str(head.value),
+                set(automaton.start_states),
+                set(automaton.final_states),
+                transitions,
+            )
+        )
+
+    return (
+        str(extended_contex_free_grammar.starting_symbol.value),
+        nonterminals,
+        boxes,
+    )
+
+
+def _edges_of_box(box: _Box):
+
+    """
+    Iterates over labels and target states of all transitions of box
+    """
+
+    for edges in box.transitions.values():
+        yield from edges
+
+
+def _closure_of_states(box: _Box, states: set, passable) -> set:
+
+    """
+    Finds states of box reachable from given ones by passable symbols
+
+    Args:
+        box: box to traverse
+        states: states traversal starts from
+        passable: predicate on symbols that can be passed
+
+    Returns:
+        Set of reachable states including given ones
+    """
+
+    visited = set(states)
+    worklist = list(states)
+
+    while worklist:
+        for symbol, state_to in box.transitions.get(worklist.pop(), []):
+            if state_to not in visited and passable(symbol):
+                visited.add(state_to)
+                worklist.append(state_to)
+
+    return visited
+
+
+def _fixpoint_of_boxes(boxes: list, passable) -> set:
+
+    """
+    Finds nonterminals whose boxes accept a word of passable symbols,
+    where passability may depend on nonterminals found so far
+
+    Args:
+        boxes: boxes of grammar
+        passable: predicate on symbol and set of found nonterminals
+
+    Returns:
+        Set of found nonterminals
+    """
+
+    found = set()
+    changed = True
+
+    while changed:
+        changed = False
+        for box in boxes:
+            if box.head in found:
+                continue
+            closure = _closure_of_states(
+                box, box.starting_states, lambda symbol: passable(symbol, found)
+            )
+            if closure & box.final_states:
+                found.add(box.head)
+                changed = True
+
+    return found
+
+
+def _trim_box(box: _Box, nonterminals: set, generating: set) -> _Box:
+
+    """
+    Removes transitions that do not lie on accepting path
+    of generating symbols
+
+    Args:
+        box: box to be trimmed
+        nonterminals: names of nonterminals
+        generating: names of generating nonterminals
+
+    Returns:
+        Trimmed box
+    """
+
+    def passable(symbol):
+        return symbol not in nonterminals or symbol in generating
+
+    forward = _closure_of_states(box, box.starting_states, passable)
+
+    reversed_box = _Box(box.head, box.final_states, box.starting_states, {})
+    for state_from, edges in box.transitions.items():
+        for symbol, state_to in edges:
+            reversed_box.transitions.setdefault(state_to, []).append(
+                (symbol, state_from)
+            )
+    backward = _closure_of_states(reversed_box, box.final_states, passable)
+
+    return _Box(
+        box.head,
+        box.starting_states & forward & backward,
+        box.final_states & forward & backward,
+        {
+            state_from: [
+                (symbol, state_to)
+                for symbol, state_to in edges
+                if passable(symbol) and state_to in backward
+            ]
+            for state_from, edges in box.transitions.items()
+            if state_from in forward
+        },
+    )
+
+
+def _first_from_states(
+    box: _Box, states: set, nonterminals: set, nullable: set, first: dict
+) -> (set, bool):
+
+    """
+    Computes FIRST set of language accepted by box from given states
+
+    Args:
+        box: box of grammar
+        states: states to start from
+        nonterminals: names of nonterminals
+        nullable: names of nullable nonterminals
+        first: FIRST sets of nonterminals computed so far
+
+    Returns:
+        FIRST set and flag that represented whether empty word is accepted
+    """
+
+    closure = _closure_of_states(box, states, lambda symbol: symbol in nullable)
+    labels = set()
+
+    for state in closure:
+        for symbol, _ in box.transitions.get(state, []):
+            if symbol in nonterminals:
+                labels |= first.get(symbol, set())
+            else:
+                labels.add(symbol)
+
+    return labels, bool(closure & box.final_states)
+
+
+def _first_sets(boxes: list, nonterminals: set, nullable: set) -> dict:
+
+    """
+    Computes FIRST sets of all nonterminals by fixpoint iteration
+
+    Args:
+        boxes: trimmed boxes of grammar
+        nonterminals: names of nonterminals
+        nullable: names of nullable nonterminals
+
+    Returns:
+        Dictionary where nonterminals matched with FIRST sets
+    """
+
+    first = {nonterminal: set() for nonterminal in nonterminals}
+    changed = True
+
+    while changed:
+        changed = False
+        for box in boxes:
+            labels, _ = _first_from_states(
+                box, box.starting_states, nonterminals, nullable, first
+            )
+            if not labels <= first[box.head]:
+                first[box.head] |= labels
+                changed = True
+
+    return first
+
+
+def _follow_sets(boxes: list, nonterminals: set, nullable: set, first: dict) -> dict:
+
+    """
+    Computes FOLLOW sets of all nonterminals by fixpoint iteration
+
+    Args:
+        boxes: trimmed boxes of grammar
+        nonterminals: names of nonterminals
+        nullable: names of nullable nonterminals
+        first: FIRST sets of nonterminals
+
+    Returns:
+        Dictionary where nonterminals matched with FOLLOW sets
+    """
+
+    follow = {nonterminal: set() for nonterminal in nonterminals}
+    constraints = []
+
+    for box in boxes:
+        for symbol, state_to in _edges_of_box(box):
+            if symbol not in nonterminals:
+                continue
+            labels, is_ending = _first_from_states(
+                box, {state_to}, nonterminals, nullable, first
+            )
+            follow[symbol] |= labels
+            if is_ending:
+                constraints.append((box.head, symbol))
+
+    changed = True
+    while changed:
+        changed = False
+        for head, symbol in constraints:
+            if not follow[head] <= follow[symbol]:
+                follow[symbol] |= follow[head]
+                changed = True
+
+    return follow
@@ -1,20 +1,178 @@
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from os import cpu_count
 from pathlib import Path
 
+from numpy import (
+    arange,
+    array,
+    bincount,
+    concatenate,
+    cumsum,
+    load,
+    ones,
+    repeat as repeat_array,
+    savez_compressed,
+    split,
+)
+from pyformlang.finite_automaton import EpsilonNFA, NondeterministicFiniteAutomaton
+from pyformlang.regular_expression import Regex
+from scipy.sparse import csr_matrix
+
 from project.grammar.extended_contex_free_grammar import (
     ExtendedContexFreeGrammar,
     extended_contex_free_grammar_from_string,
     extended_contex_free_grammar_from_file,
 )
+from project.utils.bin_matrix_utils import BinaryMatrix
 
 RecursiveStateMachine = namedtuple(
     "RecursiveStateMachine", ["starting_symbol", "subautomatons"]
 )
 
+CompiledRecursiveStateMachine = namedtuple(
+    "CompiledRecursiveStateMachine",
+    [
+        "starting_symbol",
+        "nonterminals",
+        "binary_matrix",
+        "boxes_of_states",
+        "starting_indexes",
+        "final_indexes",
+    ],
+)
+
+MIN_BOXES_FOR_PROCESS_POOL = 16
+SIZE_OF_BOXES_CACHE = 1024
+
+_boxes_cache: OrderedDict = OrderedDict()
+
+
+def clear_boxes_cache():
+
+    """
+    Forgets all compiled boxes
+    """
+
+    _boxes_cache.clear()
+
+
+def _compile_box(regex: Regex, minimize: bool) -> EpsilonNFA:
+
+    """
+    Compiles regular expression of production to box of recursive state machine
+
+    Args:
+        regex: regular expression of production
+        minimize: flag that represented whether box must be minimized
+
+    Returns:
+        Box of recursive state machine
+    """
+
+    box = regex.to_epsilon_nfa()
+
+    return box.minimize() if minimize else box
+
+
+def _minimize_box(box: EpsilonNFA) -> EpsilonNFA:
+
+    """
+    Minimizes box of recursive state machine
+
+    Args:
+        box: box to be minimized
+
+    Returns:
+        Minimized box
+    """
+
+    return box.minimize()
+
+
+def _map_boxes(function, *iterables, workers: int = None) -> list:
+
+    """
+    Applies function to boxes in order on process pool if there are
+    enough of them and serially otherwise
+
+    Args:
+        function: function to be applied, must be picklable
+        iterables: arguments of function
+        workers: count of worker processes, all cores if None
+
+    Returns:
+        List of results in the same order as arguments
+    """
+
+    arguments = list(zip(*iterables))
+    workers = cpu_count() if workers is None else workers
+
+    if workers > 1 and len(arguments) >= MIN_BOXES_FOR_PROCESS_POOL:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    function,
+                    *zip(*arguments),
+                    chunksize=max(1, len(arguments) // (workers * 4)),
+                )
+            )
+
+    return [function(*argument) for argument in arguments]
+
+
+def compile_boxes(
+    productions: dict, minimize: bool = False, workers: int = None
+) -> dict:
+
+    """
+    Compiles boxes of recursive state machine from productions of extended
+    contex free grammar. Boxes are cached by text of regular expressions,
+    so unchanged productions of edited grammar are not compiled again
+
+    Args:
+        productions: dictionary where nonterminals matched with regular expressions
+        minimize: flag that represented whether boxes must be minimized
+        workers: count of worker processes, all cores if None
+
+    Returns:
+        Dictionary where nonterminals matched with boxes
+    """
+
+    keys = {
+        nonterminal: (repr(regex), minimize)
+        for nonterminal, regex in productions.items()
+    }
+
+    missing = {}
+    for nonterminal, key in keys.items():
+        if key in _boxes_cache:
+            _boxes_cache.move_to_end(key)
+        elif key not in missing:
+            missing[key] = productions[nonterminal]
+
+    compiled = _map_boxes(
+        _compile_box, missing.values(), repeat(minimize), workers=workers
+    )
+
+    boxes = dict(zip(missing.keys(), compiled))
+    for key, box in boxes.items():
+        _boxes_cache[key] = box
+    while len(_boxes_cache) > SIZE_OF_BOXES_CACHE:
+        _boxes_cache.popitem(last=False)
+
+    return {
+        nonterminal: (boxes[key] if key in boxes else _boxes_cache[key]).copy()
+        for nonterminal, key in keys.items()
+    }
+
 
 def recursive_state_machine_from_extended_contex_free_grammar(
     extended_contex_free_grammar: ExtendedContexFreeGrammar | Path | str,
     starting_symbol: str,
+    minimize: bool = False,
+    workers: int = None,
 ) -> RecursiveStateMachine:
 
     """
@@ -24,6 +182,8 @@ def recursive_state_machine_from_extended_contex_free_grammar(
         extended_contex_free_grammar: extended contex free grammar to
         be sourse represented as namedtuple or string or path to file with grammar
         starting_symbol: starting nonterminal to builded grammar
+        minimize: flag that represented whether boxes must be minimized
+        workers: count of worker processes that compile boxes, all cores if None
 
     Returns:
         Recursive state machine equivalent given grammar
@@ -41,15 +201,14 @@ def recursive_state_machine_from_extended_contex_free_grammar(
 
     return RecursiveStateMachine(
         extended_contex_free_grammar.starting_symbol,
-        {
-            nonterminal: subautomata.to_epsilon_nfa()
-            for nonterminal, subautomata in extended_contex_free_grammar.productions.items()
-        },
+        compile_boxes(
+            extended_contex_free_grammar.productions, minimize, workers=workers
+        ),
     )
 
 
 def minimize_recursive_state_machine(
-    recursive_state_machine: RecursiveStateMachine,
+    recursive_state_machine: RecursiveStateMachine, workers: int = None
 ) -> RecursiveStateMachine:
 
     """
@@ -58,12 +217,256 @@ def minimize_recursive_state_machine(
     Args:
         recursive_state_machine: recursive state machine to
         be minimized
+        workers: count of worker processes that minimize boxes, all cores if None
 
     Returns:
         Minimize recursive state machine
     """
 
-    for nonterminal, subautomata in recursive_state_machine.subautomatons.items():
-        recursive_state_machine.subautomatons[nonterminal] = subautomata.minimize()
+    nonterminals = list(recursive_state_machine.subautomatons.keys())
+    minimized = _map_boxes(
+        _minimize_box,
+        recursive_state_machine.subautomatons.values(),
+        workers=workers,
+    )
+
+    for nonterminal, subautomata in zip(nonterminals, minimized):
+        recursive_state_machine.subautomatons[nonterminal] = subautomata
 
     return recursive_state_machine
+
+
+def compile_recursive_state_machine(
+    recursive_state_machine: RecursiveStateMachine,
+) -> CompiledRecursiveStateMachine:
+
+    """
+    Compiles recursive state machine to one binary matrix where states of all
+    boxes are numbered globally, boxes follow each other in order of nonterminals
+
+    Args:
+        recursive_state_machine: recursive state machine to be compiled
+
+    Returns:
+        CompiledRecursiveStateMachine - namedtuple that contains name of starting
+        symbol, names of nonterminals in order of boxes, binary matrix whose states
+        are pairs of nonterminal and number of state in box, array that matches
+        indexes of states with numbers of boxes, arrays of indexes of starting
+        and final states of each box
+    """
+
+    nonterminals = []
+    sizes_of_boxes = []
+    starting_indexes = []
+    final_indexes = []
+    transitions = {}
+    count_of_states = 0
+
+    for nonterminal, subautomata in recursive_state_machine.subautomatons.items():
+        if not isinstance(subautomata, NondeterministicFiniteAutomaton):
+            subautomata = subautomata.remove_epsilon_transitions()
+
+        indexes = {
+            state: count_of_states + local_index
+            for local_index, state in enumerate(sorted(subautomata.states, key=str))
+        }
+
+        nonterminals.append(_name_of_symbol(nonterminal))
+        sizes_of_boxes.append(len(indexes))
+        starting_indexes.append(
+            array(sorted(indexes[state] for state in subautomata.start_states))
+        )
+        final_indexes.append(
+            array(sorted(indexes[state] for state in subautomata.final_states))
+        )
+
+        for state_from, marked_transitions in subautomata.to_dict().items():
+            for mark, states_to in marked_transitions.items():
+                if not isinstance(states_to, set):
+                    states_to = {states_to}
+                rows, columns = transitions.setdefault(_name_of_symbol(mark), ([], []))
+                for state_to in states_to:
+                    rows.append(indexes[state_from])
+                    columns.append(indexes[state_to])
+
+        count_of_states += len(indexes)
+
+    return _build_compiled_recursive_state_machine(
+        _name_of_symbol(recursive_state_machine.starting_symbol),
+        nonterminals,
+        sizes_of_boxes,
+        starting_indexes,
+        final_indexes,
+        {
+            mark: csr_matrix(
+                (ones(len(rows), dtype=bool), (rows, columns)),
+                shape=(count_of_states, count_of_states),
+            )
+            for mark, (rows, columns) in transitions.items()
+        },
+    )
+
+
+def save_compiled_recursive_state_machine(
+    compiled_recursive_state_machine: CompiledRecursiveStateMachine, path: Path
+):
+
+    """
+    Saves compiled recursive state machine to compressed numpy archive
+
+    Args:
+        compiled_recursive_state_machine: compiled recursive state machine to be saved
+        path: path to be saved to
+    """
+
+    marks = sorted(compiled_recursive_state_machine.binary_matrix.matrix.keys())
+    matrixes = [
+        compiled_recursive_state_machine.binary_matrix.matrix[mark].tocsr()
+        for mark in marks
+    ]
+
+    with open(path, "wb") as file:
+        savez_compressed(
+            file,
+            starting_symbol=array(compiled_recursive_state_machine.starting_symbol),
+            nonterminals=array(
+                compiled_recursive_state_machine.nonterminals, dtype=str
+            ),
+            sizes_of_boxes=bincount(
+                compiled_recursive_state_machine.boxes_of_states,
+                minlength=len(compiled_recursive_state_machine.nonterminals),
+            ),
+            starting_indexes=concatenate(
+                [array([], dtype=int)]
+                + compiled_recursive_state_machine.starting_indexes
+            ),
+            counts_of_starting_indexes=array(
+                list(map(len, compiled_recursive_state_machine.starting_indexes)),
+                dtype=int,
+            ),
+            final_indexes=concatenate(
+                [array([], dtype=int)] + compiled_recursive_state_machine.final_indexes
+            ),
+            counts_of_final_indexes=array(
+                list(map(len, compiled_recursive_state_machine.final_indexes)),
+                dtype=int,
+            ),
+            marks=array(marks, dtype=str),
+            indptrs=concatenate(
+                [array([], dtype=int)] + [matrix.indptr for matrix in matrixes]
+            ),
+            indices=concatenate(
+                [array([], dtype=int)] + [matrix.indices for matrix in matrixes]
+            ),
+            counts_of_indices=array([matrix.nnz for matrix in matrixes], dtype=int),
+        )
+
+
+def load_compiled_recursive_state_machine(
+    path: Path,
+) -> CompiledRecursiveStateMachine:
+
+    """
+    Loads compiled recursive state machine saved
+    by save_compiled_recursive_state_machine
+
+    Args:
+        path: path to archive with compiled recursive state machine
+
+    Returns:
+        Loaded compiled recursive state machine
+    """
+
+    with load(path, allow_pickle=False) as archive:
+        sizes_of_boxes = archive["sizes_of_boxes"].tolist()
+        count_of_states = sum(sizes_of_boxes)
+        marks = archive["marks"].tolist()
+
+        indptrs = split(
+            archive["indptrs"], cumsum([count_of_states + 1] * len(marks))[:-1]
+        )
+        indices = split(archive["indices"], cumsum(archive["counts_of_indices"])[:-1])
+
+        return _build_compiled_recursive_state_machine(
+            str(archive["starting_symbol"]),
+            archive["nonterminals"].tolist(),
+            sizes_of_boxes,
+            split(
+                archive["starting_indexes"],
+                cumsum(archive["counts_of_starting_indexes"])[:-1],
+            ),
+            split(
+                archive["final_indexes"],
+                cumsum(archive["counts_of_final_indexes"])[:-1],
+            ),
+            {
+                mark: csr_matrix(
+                    (ones(len(indices[i]), dtype=bool), indices[i], indptrs[i]),
+                    shape=(count_of_states, count_of_states),
+                )
+                for i, mark in enumerate(marks)
+            },
+        )
+
+
+def _name_of_symbol(symbol) -> str:
+
+    """
+    Gives name of symbol of grammar or automaton
+
+    Args:
+        symbol: pyformlang symbol, variable, state or plain string
+
+    Returns:
+        Name of symbol
+    """
+
+    return str(symbol.value) if hasattr(symbol, "value") else str(symbol)
+
+
+def _build_compiled_recursive_state_machine(
+    starting_symbol: str,
+    nonterminals: list,
+    sizes_of_boxes: list,
+    starting_indexes: list,
+    final_indexes: list,
+    matrix: dict,
+) -> CompiledRecursiveStateMachine:
+
+    """
+    Wraps arrays of compiled recursive state machine into namedtuple
+
+    Args:
+        starting_symbol: name of starting nonterminal
+        nonterminals: names of nonterminals in order of boxes
+        sizes_of_boxes: counts of states in each box
+        starting_indexes: arrays of indexes of starting states of each box
+        final_indexes: arrays of indexes of final states of each box
+        matrix: decomposition of binary matrix of all boxes
+
+    Returns:
+        Compiled recursive state machine
+    """
+
+    boxes_of_states = repeat_array(arange(len(sizes_of_boxes)), sizes_of_boxes)
+    first_indexes = cumsum([0] + list(sizes_of_boxes))
+
+    indexes = {
+        (nonterminals[box], index - first_indexes[box]): index
+        for index, box in enumerate(boxes_of_states.tolist())
+    }
+    states = list(indexes.keys())
+
+    return CompiledRecursiveStateMachine(
+        starting_symbol,
+        list(nonterminals),
+        BinaryMatrix(
+            {states[index] for box in starting_indexes for index in box.tolist()},
+            {states[index] for box in final_indexes for index in box.tolist()},
+            indexes,
+            matrix,
+        ),
+        boxes_of_states,
+        [box.astype(int) for box in starting_indexes],
+        [box.astype(int) for box in final_indexes],
+    )
@@ -0,0 +1,520 @@
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from pyformlang.finite_automaton import State
+
+from project.language.query_parser import Expression, Let, parse_program
+from project.utils.bin_matrix_utils import (
+    BinaryMatrix,
+    concat_of_binary_matixes,
+    intersect_of_automata_by_binary_matixes,
+    star_of_binary_matrix,
+    union_of_binary_matixes,
+)
+from project.utils.closure_utils import transitive_closure_of_rows
+from project.utils.regex_utils import build_binary_matrix_by_postfix
+
+# node of lazy expression DAG of automata: kind of operation, its parameter
+# (path, label xor set of states) and tuple of operands. Nodes are compared
+# by structure, so identical subexpressions are the same node
+Automaton = namedtuple("Automaton", ["operation", "value", "operands"])
+Lambda = namedtuple("Lambda", ["pattern", "body", "environment"])
+
+REGULAR_OPERATIONS = {"symbol", "union", "concat", "star"}
+OPERATIONS_OF_STATES = {"set_start", "set_final", "add_start", "add_final"}
+CONSUMERS = {
+    "get_start",
+    "get_final",
+    "get_reachable",
+    "get_vertices",
+    "get_edges",
+    "get_labels",
+}
+
+
+class QueryInterpreterExepction(Exception):
+    def __init__(self, msg: str):
+        self.message = msg
+
+
+def _type_of(value) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, Automaton):
+        return "automaton"
+    if isinstance(value, Lambda):
+        return "lambda"
+    if isinstance(value, tuple):
+        return "tuple"
+    return "set"
+
+
+def format_value(value) -> str:
+
+    """
+    Formats value of query language as it is printed, elements of sets
+    are sorted and automata are shown as expressions that build them
+    """
+
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    if isinstance(value, Automaton):
+        return _format_automaton(value)
+    if isinstance(value, Lambda):
+        return "lambda"
+    if isinstance(value, tuple):
+        return "(" + ", ".join(format_value(element) for element in value) + ")"
+    if isinstance(value, frozenset):
+        return (
+            "{" + ", ".join(sorted((format_value(element) for element in value))) + "}"
+        )
+    return str(value)
+
+
+def _format_automaton(automaton: Automaton) -> str:
+    if automaton.operation == "graph":
+        return f"load({format_value(automaton.value)})"
+    if automaton.operation == "symbol":
+        return format_value(automaton.value)
+    if automaton.operation == "star":
+        return f"{_format_automaton(automaton.operands[0])}*"
+    if automaton.operation in OPERATIONS_OF_STATES:
+        return (
+            f"{automaton.operation}({format_value(automaton.value)}, "
+            f"{_format_automaton(automaton.operands[0])})"
+        )
+
+    operator = {"union": " | ", "concat": " . ", "intersect": " & "}
+    return (
+        "("
+        + operator[automaton.operation].join(
+            _format_automaton(operand) for operand in automaton.operands
+        )
+        + ")"
+    )
+
+
+def _vertex_value(name):
+
+    """
+    Vertices of graphs are integers if their names are integers
+    """
+
+    name = str(name)
+
+    return int(name) if name.lstrip("-").isdigit() else name
+
+
+class QueryInterpreter:
+
+    """
+    Interpreter of graph query language. Operations over graphs and regular
+    expressions build lazy DAG of Automaton nodes, nothing is computed until
+    results are consumed by get_* functions. Then maximal regular subexpressions
+    are compiled into single minimal automaton by direct construction, other
+    nodes are compiled by operations over binary matrixes, and compiled nodes
+    are memoized within program, so identical subexpressions are built once
+    """
+
+    def __init__(self, output=None):
+        self.output = sys.stdout if output is None else output
+        self.environment = {}
+        self.compiled = {}
+        self.consumed = {}
+        self.regular = {}
+
+    def run(self, text: str) -> dict:
+
+        """
+        Executes program, printed values are written to output
+
+        Args:
+            text: text of program
+
+        Returns:
+            Dictionary where variables matched with their values
+        """
+
+        for statement in parse_program(text):
+            try:
+                value = self.evaluate(statement.expression, self.environment)
+            except QueryInterpreterExepction as exception:
+                raise QueryInterpreterExepction(
+                    f"Line {statement.line}: {exception.message}"
+                )
+            if isinstance(statement, Let):
+                self.environment[statement.name] = value
+            else:
+                self.output.write(format_value(value) + "\n")
+
+        return self.environment
+
+    def evaluate(self, expression: Expression, environment: dict):
+
+        """
+        Evaluates expression in environment, sets are evaluated at once,
+        automata are nodes of lazy DAG
+        """
+
+        kind = expression.kind
+        arguments = expression.arguments
+
+        if kind in ("int", "string", "bool"):
+            return expression.value
+        if kind == "var":
+            if expression.value not in environment:
+                raise QueryInterpreterExepction(
+                    f"variable {expression.value} is not defined"
+                )
+            return environment[expression.value]
+        if kind == "lambda":
+            return Lambda(expression.value, arguments[0], environment)
+        if kind == "tuple":
+            return tuple(self.evaluate(argument, environment) for argument in arguments)
+        if kind == "set":
+            return frozenset(
+                self.evaluate(argument, environment) for argument in arguments
+            )
+        if kind == "range":
+            first, last = (
+                self._expect("int", self.evaluate(argument, environment), "range")
+                for argument in arguments
+            )
+            return frozenset(range(first, last + 1))
+
+        if kind == "call":
+            return self._call(expression.value, arguments, environment)
+
+        values = [self.evaluate(argument, environment) for argument in arguments]
+
+        if kind == "not":
+            return not self._expect("bool", values[0], kind)
+        if kind in ("and", "or"):
+            left, right = (self._expect("bool", value, kind) for value in values)
+            return (left and right) if kind == "and" else (left or right)
+        if kind == "in":
+            return values[0] in self._expect("set", values[1], kind)
+        if kind == "equal":
+            return values[0] == values[1]
+        if kind == "not_equal":
+            return values[0] != values[1]
+
+        if kind in ("union", "intersect") and all(
+            _type_of(value) == "set" for value in values
+        ):
+            left, right = values
+            return left | right if kind == "union" else left & right
+
+        operands = tuple(self._as_automaton(value, kind) for value in values)
+        # union of regular node with itself is the same language, so shared
+        # node is not doubled by let r = r | r
+        if (
+            kind == "union"
+            and operands[0] == operands[1]
+            and _is_regular(operands[0], self.regular)
+        ):
+            return operands[0]
+
+        return Automaton(kind, None, operands)
+
+    def _expect(self, expected: str, value, operation: str):
+        if _type_of(value) != expected:
+            raise QueryInterpreterExepction(
+                f"{operation} expects {expected}, but got {_type_of(value)}"
+            )
+        return value
+
+    def _as_automaton(self, value, operation: str) -> Automaton:
+
+        """
+        Strings are automata of single symbol where they are operands
+        """
+
+        if isinstance(value, str):
+            return Automaton("symbol", value, ())
+        return self._expect("automaton", value, operation)
+
+    def _call(self, function: str, arguments: tuple, environment: dict):
+        count_of_arguments = 2 if function in ("map", "filter") else 1
+        if function in OPERATIONS_OF_STATES:
+            count_of_arguments = 2
+        if len(arguments) != count_of_arguments:
+            raise QueryInterpreterExepction(
+                f"{function} expects {count_of_arguments} arguments, "
+                f"but got {len(arguments)}"
+            )
+
+        values = [self.evaluate(argument, environment) for argument in arguments]
+
+        if function == "load":
+            return Automaton("graph", self._expect("string", values[0], function), ())
+
+        if function in OPERATIONS_OF_STATES:
+            return Automaton(
+                function,
+                self._expect("set", values[0], function),
+                (self._as_automaton(values[1], function),),
+            )
+
+        if function in CONSUMERS:
+            automaton = self._as_automaton(values[0], function)
+            if (function, automaton) not in self.consumed:
+                self.consumed[(function, automaton)] = self._consume(
+                    function, self.compile(automaton)
+                )
+            return self.consumed[(function, automaton)]
+
+        function_of_lambda = self._expect("lambda", values[0], function)
+        elements = self._expect("set", values[1], function)
+        if function == "map":
+            return frozenset(
+                self._apply(function_of_lambda, element) for element in elements
+            )
+        return frozenset(
+            element
+            for element in elements
+            if self._expect("bool", self._apply(function_of_lambda, element), function)
+        )
+
+    def _apply(self, function: Lambda, value):
+        environment = dict(function.environment)
+        self._bind(function.pattern, value, environment)
+        return self.evaluate(function.body, environment)
+
+    def _bind(self, pattern, value, environment: dict):
+        if isinstance(pattern, str):
+            if pattern != "_":
+                environment[pattern] = value
+            return
+        if not isinstance(value, tuple) or len(value) != len(pattern):
+            raise QueryInterpreterExepction(
+                f"{format_value(value)} does not match pattern of lambda"
+            )
+        for subpattern, element in zip(pattern, value):
+            self._bind(subpattern, element, environment)
+
+    def compile(self, automaton: Automaton) -> BinaryMatrix:
+
+        """
+        Builds binary matrix of lazy automaton, compiled nodes are memoized
+
+        Args:
+            automaton: node of lazy DAG
+
+        Returns:
+            Binary matrix whose states are State of values of vertices
+            and marks are Symbol of labels
+        """
+
+        if automaton in self.compiled:
+            return self.compiled[automaton]
+
+        if _is_regular(automaton, self.regular):
+            compiled = build_binary_matrix_by_postfix(_postfix_of_automaton(automaton))
+        elif automaton.operation == "graph":
+            compiled = _load_graph(automaton.value)
+        elif automaton.operation in OPERATIONS_OF_STATES:
+            compiled = _with_states(
+                self.compile(automaton.operands[0]),
+                automaton.operation,
+                automaton.value,
+            )
+        elif automaton.operation == "star":
+            compiled = star_of_binary_matrix(self.compile(automaton.operands[0]))
+        else:
+            left, right = (self.compile(operand) for operand in automaton.operands)
+            if automaton.operation == "intersect":
+                compiled = _intersect(left, right)
+            elif automaton.operation == "union":
+                compiled = union_of_binary_matixes(left, right)
+            else:
+                compiled = concat_of_binary_matixes(left, right)
+
+        self.compiled[automaton] = compiled
+
+        return compiled
+
+    def _consume(self, function: str, bin_matrix: BinaryMatrix) -> frozenset:
+        if function == "get_start":
+            return frozenset(state.value for state in bin_matrix.starting_states)
+        if function == "get_final":
+            return frozenset(state.value for state in bin_matrix.final_states)
+        if function == "get_vertices":
+            return frozenset(state.value for state in bin_matrix.indexes)
+        if function == "get_labels":
+            return frozenset(
+                mark.value
+                for mark, matrix in bin_matrix.matrix.items()
+                if matrix.count_nonzero()
+            )
+
+        states = [None] * len(bin_matrix.indexes)
+        for state, index in bin_matrix.indexes.items():
+            states[index] = state.value
+
+        if function == "get_edges":
+            edges = set()
+            for mark, matrix in bin_matrix.matrix.items():
+                rows, columns = matrix.nonzero()
+                edges |= {
+                    (states[row], mark.value, states[column])
+                    for row, column in zip(rows.tolist(), columns.tolist())
+                }
+            return frozenset(edges)
+
+        rows = sorted(bin_matrix.indexes[state] for state in bin_matrix.starting_states)
+        finals = {bin_matrix.indexes[state] for state in bin_matrix.final_states}
+        block_rows, columns = transitive_closure_of_rows(bin_matrix, rows).nonzero()
+
+        return frozenset(
+            (states[rows[row]], states[column])
+            for row, column in zip(block_rows.tolist(), columns.tolist())
+            if column in finals
+        )
+
+
+def _is_regular(automaton: Automaton, regular: dict) -> bool:
+
+    """
+    Checks whether node is built from symbols by regular operations only,
+    results are memoized in regular for every visited node, so shared
+    nodes of DAG are checked once
+    """
+
+    stack = [automaton]
+    while stack:
+        node = stack[-1]
+        if node in regular:
+            stack.pop()
+        elif node.operation not in REGULAR_OPERATIONS:
+            regular[node] = False
+            stack.pop()
+        elif all(operand in regular for operand in node.operands):
+            regular[node] = all(regular[operand] for operand in node.operands)
+            stack.pop()
+        else:
+            stack.extend(operand for operand in node.operands if operand not in regular)
+
+    return regular[automaton]
+
+
+def _postfix_of_automaton(automaton: Automaton) -> list:
+
+    """
+    Converts regular node to postfix notation of regex_utils without recursion
+    """
+
+    postfix = []
+    stack = [(automaton, False)]
+
+    while stack:
+        node, is_visited = stack.pop()
+        if node.operation == "symbol":
+            postfix.append(("symbol", node.value))
+        elif is_visited:
+            postfix.append((node.operation, None))
+        else:
+            stack.append((node, True))
+            stack.extend((operand, False) for operand in reversed(node.operands))
+
+    return postfix
+
+
+def _load_graph(path: str) -> BinaryMatrix:
+
+    """
+    Loads graph from DOT file xor from CFPQ dataset by name if it is not
+    path of DOT file, all vertices are starting and finale
+    """
+
+    from project.utils.graph_utils import decompose_graph, get_graph, load_from_dot
+
+    try:
+        if Path(path).is_file() or path.endswith(".dot"):
+            graph = load_from_dot(path)
+        else:
+            graph = get_graph(path)
+    except Exception:
+        raise QueryInterpreterExepction(f"graph {path} can not be loaded")
+
+    decomposition = decompose_graph(graph)
+    indexes = {
+        State(_vertex_value(state.value)): index
+        for state, index in decomposition.indexes.items()
+    }
+
+    return BinaryMatrix(set(indexes), set(indexes), indexes, dict(decomposition.matrix))
+
+
+def _with_states(bin_matrix: BinaryMatrix, operation: str, values: frozenset):
+
+    """
+    Sets xor adds starting xor finale states, values that are not states
+    of automaton are ignored
+    """
+
+    states = {State(value) for value in values} & bin_matrix.indexes.keys()
+
+    if operation == "set_start":
+        return bin_matrix._replace(starting_states=states)
+    if operation == "add_start":
+        return bin_matrix._replace(starting_states=bin_matrix.starting_states | states)
+    if operation == "set_final":
+        return bin_matrix._replace(final_states=states)
+
+    return bin_matrix._replace(final_states=bin_matrix.final_states | states)
+
+
+def _intersect(left: BinaryMatrix, right: BinaryMatrix) -> BinaryMatrix:
+
+    """
+    Intersects automata by single Kronecker product of their matrixes,
+    states of product are pairs of values of states
+    """
+
+    product = intersect_of_automata_by_binary_matixes(left, right)
+
+    values_of_left = [None] * len(left.indexes)
+    for state, index in left.indexes.items():
+        values_of_left[index] = state.value
+    values_of_right = [None] * len(right.indexes)
+    for state, index in right.indexes.items():
+        values_of_right[index] = state.value
+
+    def state_of(index: int) -> State:
+        return State(
+            (
+                values_of_left[index // len(values_of_right)],
+                values_of_right[index % len(values_of_right)],
+            )
+        )
+
+    return BinaryMatrix(
+        {state_of(index) for index in product.starting_states},
+        {state_of(index) for index in product.final_states},
+        {state_of(index): index for index in product.indexes.values()},
+        product.matrix,
+    )
+
+
+def interpret(text: str, output=None) -> dict:
+
+    """
+    Executes program of graph query language
+
+    Args:
+        text: text of program
+        output: file where printed values are written, stdout if None
+
+    Returns:
+        Dictionary where variables matched with their values
+    """
+
+    return QueryInterpreter(output).run(text)
@@ -0,0 +1,294 @@
+from collections import namedtuple
+
+Token = namedtuple("Token", ["kind", "value", "line"])
+
+Let = namedtuple("Let", ["name", "expression", "line"])
+Print = namedtuple("Print", ["expression", "line"])
+
+# kind of expression, value of constant, name of variable, function xor pattern
+# of lambda, tuple of subexpressions
+Expression = namedtuple("Expression", ["kind", "value", "arguments"])
+
+KEYWORDS = {"let", "print", "fun", "in", "and", "or", "not", "true", "false"}
+FUNCTIONS = {
+    "load",
+    "set_start",
+    "set_final",
+    "add_start",
+    "add_final",
+    "get_start",
+    "get_final",
+    "get_reachable",
+    "get_vertices",
+    "get_edges",
+    "get_labels",
+    "map",
+    "filter",
+}
+PUNCTUATION = ["->", "..", "==", "!=", "(", ")", "{", "}", ",", "=", "|", "&", ".", "*"]
+COMPARISONS = {"in": "in", "==": "equal", "!=": "not_equal"}
+
+
+class QueryParserExepction(Exception):
+    def __init__(self, msg: str):
+        self.message = msg
+
+
+def tokenize_program(text: str) -> list:
+
+    """
+    Splits text of program into tokens, comments start with # and last
+    until the end of line, strings are quoted by " and may contain \\" and \\\\
+
+    Args:
+        text: text of program
+
+    Returns:
+        List of tokens with kinds "name", "keyword", "int", "string",
+        punctuation itself and "end" in the end
+    """
+
+    tokens = []
+    position = 0
+    line = 1
+
+    while position < len(text):
+        char = text[position]
+
+        if char == "\n":
+            line += 1
+            position += 1
+        elif char.isspace():
+            position += 1
+        elif char == "#":
+            while position < len(text) and text[position] != "\n":
+                position += 1
+        elif char == '"':
+            value = []
+            position += 1
+            while position < len(text) and text[position] != '"':
+                if text[position] == "\n":
+                    raise QueryParserExepction(f"Line {line}: string is not closed")
+                if text[position] == "\\" and position + 1 < len(text):
+                    position += 1
+                value.append(text[position])
+                position += 1
+            if position == len(text):
+                raise QueryParserExepction(f"Line {line}: string is not closed")
+            tokens.append(Token("string", "".join(value), line))
+            position += 1
+        elif char.isdigit():
+            start = position
+            while position < len(text) and text[position].isdigit():
+                position += 1
+            tokens.append(Token("int", int(text[start:position]), line))
+        elif char.isalpha() or char == "_":
+            start = position
+            while position < len(text) and (
+                text[position].isalnum() or text[position] in "_'"
+            ):
+                position += 1
+            word = text[start:position]
+            tokens.append(Token("keyword" if word in KEYWORDS else "name", word, line))
+        else:
+            for punctuation in PUNCTUATION:
+                if text.startswith(punctuation, position):
+                    tokens.append(Token(punctuation, punctuation, line))
+                    position += len(punctuation)
+                    break
+            else:
+                raise QueryParserExepction(f"Line {line}: unexpected symbol {char}")
+
+    tokens.append(Token("end", None, line))
+
+    return tokens
+
+
+class _Parser:
+
+    """
+    Recursive descent parser over list of tokens, each method parses
+    one level of priority of operators
+    """
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.position = 0
+
+    @property
+    def current(self) -> Token:
+        return self.tokens[self.position]
+
+    def error(self, expected: str):
+        token = self.current
+        found = "end of program" if token.kind == "end" else repr(token.value)
+        raise QueryParserExepction(
+            f"Line {token.line}: expected {expected}, but found {found}"
+        )
+
+    def is_at(self, kind: str, value=None) -> bool:
+        return self.current.kind == kind and (
+            value is None or self.current.value == value
+        )
+
+    def expect(self, kind: str, value=None) -> Token:
+        if not self.is_at(kind, value):
+            self.error(value or kind)
+        token = self.current
+        self.position += 1
+        return token
+
+    def accept(self, kind: str, value=None) -> bool:
+        if self.is_at(kind, value):
+            self.position += 1
+            return True
+        return False
+
+    def program(self) -> list:
+        statements = []
+        while not self.is_at("end"):
+            line = self.current.line
+            if self.accept("keyword", "let"):
+                name = self.expect("name").value
+                self.expect("=")
+                statements.append(Let(name, self.expression(), line))
+            elif self.accept("keyword", "print"):
+                statements.append(Print(self.expression(), line))
+            else:
+                self.error("let or print")
+        return statements
+
+    def expression(self) -> Expression:
+        if self.accept("keyword", "fun"):
+            pattern = self.pattern()
+            self.expect("->")
+            return Expression("lambda", pattern, (self.expression(),))
+        return self.disjunction()
+
+    def pattern(self):
+        if self.accept("("):
+            patterns = [self.pattern()]
+            while self.accept(","):
+                patterns.append(self.pattern())
+            self.expect(")")
+            return tuple(patterns) if len(patterns) > 1 else patterns[0]
+        return self.expect("name").value
+
+    def disjunction(self) -> Expression:
+        expression = self.conjunction()
+        while self.accept("keyword", "or"):
+            expression = Expression("or", None, (expression, self.conjunction()))
+        return expression
+
+    def conjunction(self) -> Expression:
+        expression = self.negation()
+        while self.accept("keyword", "and"):
+            expression = Expression("and", None, (expression, self.negation()))
+        return expression
+
+    def negation(self) -> Expression:
+        if self.accept("keyword", "not"):
+            return Expression("not", None, (self.negation(),))
+        return self.comparison()
+
+    def comparison(self) -> Expression:
+        expression = self.union()
+        for operator, kind in COMPARISONS.items():
+            if self.accept("keyword" if operator == "in" else operator, operator):
+                return Expression(kind, None, (expression, self.union()))
+        return expression
+
+    def union(self) -> Expression:
+        expression = self.intersect()
+        while self.accept("|"):
+            expression = Expression("union", None, (expression, self.intersect()))
+        return expression
+
+    def intersect(self) -> Expression:
+        expression = self.concat()
+        while self.accept("&"):
+            expression = Expression("intersect", None, (expression, self.concat()))
+        return expression
+
+    def concat(self) -> Expression:
+        expression = self.star()
+        while self.accept("."):
+            expression = Expression("concat", None, (expression, self.star()))
+        return expression
+
+    def star(self) -> Expression:
+        expression = self.primary()
+        while self.accept("*"):
+            expression = Expression("star", None, (expression,))
+        return expression
+
+    def primary(self) -> Expression:
+        token = self.current
+
+        if self.accept("int"):
+            return Expression("int", token.value, ())
+        if self.accept("string"):
+            return Expression("string", token.value, ())
+        if self.accept("keyword", "true") or self.accept("keyword", "false"):
+            return Expression("bool", token.value == "true", ())
+
+        if self.accept("name"):
+            if token.value not in FUNCTIONS:
+                return Expression("var", token.value, ())
+            self.expect("(")
+            arguments = [self.expression()]
+            while self.accept(","):
+                arguments.append(self.expression())
+            self.expect(")")
+            return Expression("call", token.value, tuple(arguments))
+
+        if self.accept("("):
+            expressions = [self.expression()]
+            while self.accept(","):
+                expressions.append(self.expression())
+            self.expect(")")
+            if len(expressions) == 1:
+                return expressions[0]
+            return Expression("tuple", None, tuple(expressions))
+
+        if self.accept("{"):
+            if self.accept("}"):
+                return Expression("set", None, ())
+            first = self.expression()
+            if self.accept(".."):
+                last = self.expression()
+                self.expect("}")
+                return Expression("range", None, (first, last))
+            expressions = [first]
+            while self.accept(","):
+                expressions.append(self.expression())
+            self.expect("}")
+            return Expression("set", None, tuple(expressions))
+
+        self.error("expression")
+
+
+def parse_program(text: str) -> list:
+
+    """
+    Parses program of graph query language. Program is sequence of statements
+
+        let NAME = expression
+        print expression
+
+    Expressions are integers, "strings", true, false, variables,
+    tuples (e1, e2), sets {e1, e2} and ranges {0..100}, lambdas
+    fun (x, y) -> expression and calls of functions load, set_start,
+    set_final, add_start, add_final, get_start, get_final, get_reachable,
+    get_vertices, get_edges, get_labels, map and filter. Operators from
+    the weakest are or, and, not, comparisons in == !=, union |,
+    intersection &, concatenation . and postfix Kleene star *
+
+    Args:
+        text: text of program
+
+    Returns:
+        List of statements Let and Print with trees of Expression
+    """
+
+    return _Parser(tokenize_program(text)).program()
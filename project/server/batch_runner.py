@@ -0,0 +1,255 @@
+import json
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from os import cpu_count
+
+from project.server.query_server import load_graphs
+from project.utils.batch_utils import compile_regular_request
+from project.utils.bin_matrix_utils import BinaryMatrix
+from project.utils.graph_utils import (
+    decompose_graph,
+    regular_request_by_binary_matrixes,
+)
+from project.utils.regex_utils import RegexExepction
+
+DEFAULT_SIZE_OF_CHUNK = 1024
+MAX_QUERIES_PER_TASK = 64
+SIZE_OF_DECOMPOSITIONS_CACHE = 4
+
+_decompositions_cache: OrderedDict = OrderedDict()
+
+
+class BatchRunnerExepction(Exception):
+    def __init__(self, msg: str):
+        self.message = msg
+
+
+def clear_decompositions_cache():
+
+    """
+    Forgets all loaded decompositions of graphs
+    """
+
+    _decompositions_cache.clear()
+
+
+def decomposition_of_graph(path: str) -> BinaryMatrix:
+
+    """
+    Loads graph from DOT file and decomposes it, decompositions are cached
+    by path and only few of them are kept, so memory does not grow with
+    count of graphs
+
+    Args:
+        path: path to graph in DOT format
+
+    Returns:
+        Decomposition of graph built by decompose_graph
+    """
+
+    if path in _decompositions_cache:
+        _decompositions_cache.move_to_end(path)
+        return _decompositions_cache[path]
+
+    try:
+        decomposition = decompose_graph(load_graphs({path: path})[path])
+    except Exception:
+        raise BatchRunnerExepction(f"Graph {path} can not be loaded")
+
+    _decompositions_cache[path] = decomposition
+    if len(_decompositions_cache) > SIZE_OF_DECOMPOSITIONS_CACHE:
+        _decompositions_cache.popitem(last=False)
+
+    return decomposition
+
+
+def _parse_query(line: str, number_of_line: int) -> dict:
+
+    """
+    Decodes query from JSON line, "id" of query is number of line by default
+    and "graph" and "regex" are required
+    """
+
+    try:
+        query = json.loads(line)
+    except json.JSONDecodeError:
+        raise BatchRunnerExepction(f"Line {number_of_line} is not JSON")
+
+    if not isinstance(query, dict):
+        raise BatchRunnerExepction(f"Line {number_of_line} is not JSON object")
+
+    query.setdefault("id", number_of_line)
+
+    if not isinstance(query.get("graph"), str):
+        raise BatchRunnerExepction(f"Query {query['id']} has no graph")
+    if not isinstance(query.get("regex"), str):
+        raise BatchRunnerExepction(f"Query {query['id']} has no regex")
+    for field in ("starting_vertices", "final_vertices"):
+        if not isinstance(query.get(field, []), list | None):
+            raise BatchRunnerExepction(f"Query {query['id']}: {field} is not list")
+
+    return query
+
+
+def evaluate_query(path: str, query: dict) -> dict:
+
+    """
+    Evaluates single regular request against cached decomposition of graph,
+    automaton of request is compiled with cache too
+
+    Args:
+        path: path to graph in DOT format
+        query: decoded query with "id", "regex" and optional
+            "starting_vertices" and "final_vertices", vertices are
+            compared with names of vertices in DOT file
+
+    Returns:
+        Dictionary with "result" xor "error" and "id" of query
+    """
+
+    response = {"id": query.get("id")}
+
+    try:
+        decomposition = decomposition_of_graph(path)
+        binary_matrix_of_request = compile_regular_request(query["regex"])
+
+        pairs = regular_request_by_binary_matrixes(
+            decomposition,
+            binary_matrix_of_request,
+            {str(vertex) for vertex in query.get("starting_vertices") or []},
+            {str(vertex) for vertex in query.get("final_vertices") or []},
+        )
+        response["result"] = sorted(
+            ([vertex_from.value, vertex_to.value] for vertex_from, vertex_to in pairs),
+            key=lambda pair: (str(pair[0]), str(pair[1])),
+        )
+    except (BatchRunnerExepction, RegexExepction) as exception:
+        response["error"] = exception.message
+    except Exception as exception:
+        # any failure of single query must not stop the whole batch
+        response["error"] = f"Query can not be evaluated: {exception!r}"
+
+    return response
+
+
+def evaluate_queries(path: str, queries: list) -> list:
+
+    """
+    Evaluates queries to the same graph in worker process
+    """
+
+    return [evaluate_query(path, query) for query in queries]
+
+
+def tasks_of_chunk(lines: list, first_number: int, graphs: dict) -> (list, list):
+
+    """
+    Decodes chunk of lines and groups queries by graphs, groups are split
+    into tasks of at most MAX_QUERIES_PER_TASK queries
+
+    Args:
+        lines: lines of chunk
+        first_number: number of first line of chunk
+        graphs: dictionary where names of graphs matched with paths
+
+    Returns:
+        List of pairs of path to graph and list of queries and list of responses
+        with errors for lines that are not queries
+    """
+
+    by_graphs = {}
+    errors = []
+
+    for number_of_line, line in enumerate(lines, first_number):
+        if not line.strip():
+            continue
+        try:
+            query = _parse_query(line, number_of_line)
+        except BatchRunnerExepction as exception:
+            errors.append({"id": number_of_line, "error": exception.message})
+            continue
+        path = graphs.get(query["graph"], query["graph"])
+        by_graphs.setdefault(path, []).append(query)
+
+    tasks = [
+        (path, queries[i : i + MAX_QUERIES_PER_TASK])
+        for path, queries in by_graphs.items()
+        for i in range(0, len(queries), MAX_QUERIES_PER_TASK)
+    ]
+
+    return tasks, errors
+
+
+def _write_responses(responses: list, output):
+    for response in responses:
+        output.write(json.dumps(response) + "\n")
+    output.flush()
+
+
+def run_batch(
+    lines,
+    output,
+    graphs: dict = None,
+    workers: int = None,
+    size_of_chunk: int = DEFAULT_SIZE_OF_CHUNK,
+):
+
+    """
+    Evaluates regular requests given as JSON lines and writes JSON line
+    with "result" xor "error" and "id" of query as soon as query is finished,
+    so responses may go in other order than queries. Queries are read
+    by chunks and grouped by graphs inside chunk, decompositions of graphs
+    and automata of requests are cached in each process. At most two chunks
+    are kept in memory, so memory does not depend on size of input.
+    Query looks like:
+
+        {"id": id, "graph": name or path, "regex": text,
+         "starting_vertices": [...], "final_vertices": [...]}
+
+    Args:
+        lines: iterable of lines with queries, file or stdin
+        output: file where responses are written
+        graphs: dictionary where names of graphs matched with paths,
+            other names are considered as paths
+        workers: count of worker processes, all cores if None
+        size_of_chunk: count of lines that are grouped together
+    """
+
+    graphs = graphs or {}
+    workers = cpu_count() if workers is None else workers
+    lines = iter(lines)
+    first_number = 1
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending = {}
+
+    try:
+        while chunk := list(islice(lines, size_of_chunk)):
+            tasks, errors = tasks_of_chunk(chunk, first_number, graphs)
+            first_number += len(chunk)
+            _write_responses(errors, output)
+
+            if executor is None:
+                for path, queries in tasks:
+                    for query in queries:
+                        _write_responses([evaluate_query(path, query)], output)
+                continue
+
+            for path, queries in tasks:
+                pending[executor.submit(evaluate_queries, path, queries)] = len(queries)
+
+            while sum(pending.values()) > size_of_chunk:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    _write_responses(future.result(), output)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                _write_responses(future.result(), output)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,490 @@
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from networkx import MultiDiGraph
+from pyformlang.regular_expression import Regex
+
+from project.utils.graph_utils import (
+    decompose_graph,
+    load_from_dot,
+    regular_request_by_binary_matrix,
+)
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_PENDING = 64
+DEFAULT_HEAVY_COST = 1_000_000
+
+_decompositions_of_worker = {}
+
+
+class QueryServerExepction(Exception):
+    def __init__(self, msg: str):
+        self.message = msg
+
+
+def _init_worker(graphs: dict):
+
+    """
+    Builds decompositions of graphs in worker process once. Graphs are sent
+    instead of decompositions, because states of pyformlang keep hashes of
+    values that differ in processes which are not forked from server
+    """
+
+    _decompositions_of_worker.update(
+        (name, decompose_graph(graph)) for name, graph in graphs.items()
+    )
+
+
+def _evaluate_query(
+    name_of_graph: str, regex: str, starting_vertices: list, final_vertices: list
+) -> list:
+
+    """
+    Evaluates regular request in worker process
+
+    Args:
+        name_of_graph: name of loaded graph
+        regex: text of regular expression
+        starting_vertices: list of starting vertices, all vertices if empty
+        final_vertices: list of finale vertices, all vertices if empty
+
+    Returns:
+        Sorted list of pairs of vertices that connected by satisfying path
+    """
+
+    pairs = regular_request_by_binary_matrix(
+        _decompositions_of_worker[name_of_graph],
+        set(starting_vertices),
+        set(final_vertices),
+        Regex(regex),
+    )
+
+    return sorted(
+        ([vertex_from.value, vertex_to.value] for vertex_from, vertex_to in pairs),
+        key=lambda pair: (str(pair[0]), str(pair[1])),
+    )
+
+
+class QueryServer:
+
+    """
+    Long-running server that answers regular requests to loaded graphs.
+    Each line of connection is JSON request, each answer is JSON line with
+    the same "id". Requests are:
+
+        {"command": "query", "graph": name, "regex": text,
+         "starting_vertices": [...], "final_vertices": [...]}
+        {"command": "graphs"}
+        {"command": "ping"}
+
+    Queries are evaluated by worker processes which keep decompositions
+    of graphs in memory, each worker evaluates one query at once and is
+    replaced by new one if its query is timed out. At most max_pending
+    queries are admitted at once, others are rejected at once, and queries
+    which estimated cost is greater than heavy_cost share fewer workers
+    than all, so light queries always have free worker. With single worker
+    heavy queries are evaluated by separate worker process
+    """
+
+    def __init__(
+        self,
+        graphs: dict,
+        workers: int = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        heavy_cost: int = DEFAULT_HEAVY_COST,
+    ):
+
+        """
+        Args:
+            graphs: dictionary where names matched with graphs
+            workers: count of worker processes, count of cpus if None
+            timeout: seconds to wait for result of query
+            max_pending: maximal count of queries that are evaluated at once
+            heavy_cost: cost of query from which it is considered heavy
+        """
+
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.heavy_cost = heavy_cost
+        self.graphs = graphs
+        self.decompositions = {
+            name: decompose_graph(graph) for name, graph in graphs.items()
+        }
+        # vertices of requests are matched by names as in DOT files,
+        # so 0 and "0" are the same vertex of graph
+        self.vertices = {
+            name: {str(state.value): state.value for state in decomposition.indexes}
+            for name, decomposition in self.decompositions.items()
+        }
+
+        self._pending = 0
+        self._heavy_slots = None
+        self._executors = None
+        self._idle = None
+        self._idle_of_heavy = None
+        self._server = None
+
+    def _start_executor(self) -> ProcessPoolExecutor:
+
+        """
+        Starts executor of single worker and waits until worker is ready.
+        Workers are forked by forkserver that is started before any socket
+        is opened, so workers that replace timed out ones do not hold
+        connections of server
+        """
+
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context(
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            ),
+            initializer=_init_worker,
+            initargs=(self.graphs,),
+        )
+        executor.submit(_init_worker, {}).result()
+
+        return executor
+
+    def start_pool(self):
+
+        """
+        Starts workers, it is done once. Light queries take any idle worker,
+        heavy ones take the same workers if there are several of them
+        and separate worker otherwise
+        """
+
+        if self._executors is None:
+            self._executors = [self._start_executor() for _ in range(self.workers)]
+            self._idle = asyncio.Queue()
+            for executor in self._executors:
+                self._idle.put_nowait(executor)
+
+            if self.workers > 1:
+                self._idle_of_heavy = self._idle
+            else:
+                self._executors.append(self._start_executor())
+                self._idle_of_heavy = asyncio.Queue()
+                self._idle_of_heavy.put_nowait(self._executors[-1])
+
+    def close(self):
+
+        """
+        Stops server and workers, queries that are not started
+        are cancelled and running ones are waited for
+        """
+
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._executors is not None:
+            for executor in self._executors:
+                executor.shutdown(wait=True, cancel_futures=True)
+            self._executors = None
+
+    def cost_of_query(self, name_of_graph: str, regex: Regex) -> int:
+
+        """
+        Estimates cost of query as count of edges with labels of query
+        multiplied by count of states of automaton of query
+        """
+
+        automaton = regex.to_epsilon_nfa()
+        marks = {symbol.value for symbol in automaton.symbols}
+        count_of_edges = sum(
+            matrix.nnz
+            for mark, matrix in self.decompositions[name_of_graph].matrix.items()
+            if mark.value in marks
+        )
+
+        return count_of_edges * max(len(automaton.states), 1)
+
+    async def handle_request(self, request: dict) -> dict:
+
+        """
+        Answers single request
+
+        Args:
+            request: decoded JSON request
+
+        Returns:
+            Dictionary with "result" xor "error" and "id" of request
+        """
+
+        response = {"id": request.get("id")}
+
+        try:
+            response["result"] = await self._answer(request)
+        except QueryServerExepction as exception:
+            response["error"] = exception.message
+        except Exception as exception:
+            # failure of single request must not break connection
+            response["error"] = f"Request is failed: {exception!r}"
+
+        return response
+
+    def _is_heavy_query(self, name_of_graph: str, regex: str) -> bool:
+
+        """
+        Parses regex and compares cost of query with heavy cost, it is run
+        in thread, so building of automaton of big regex does not block loop
+        """
+
+        try:
+            regex = Regex(regex)
+        except Exception:
+            raise QueryServerExepction("Query has no valid regex")
+
+        return self.cost_of_query(name_of_graph, regex) > self.heavy_cost
+
+    async def _answer(self, request: dict):
+
+        """
+        Dispatches request by command and raises QueryServerExepction on failure
+        """
+
+        command = request.get("command", "query")
+
+        if command == "ping":
+            return "pong"
+        if command == "graphs":
+            return {
+                name: {
+                    "nodes": len(decomposition.indexes),
+                    "edges": sum(
+                        matrix.nnz for matrix in decomposition.matrix.values()
+                    ),
+                }
+                for name, decomposition in self.decompositions.items()
+            }
+        if command != "query":
+            raise QueryServerExepction(f"Unknown command {command}")
+
+        name_of_graph = request.get("graph")
+        if name_of_graph not in self.decompositions:
+            raise QueryServerExepction(f"Unknown graph {name_of_graph}")
+
+        if not isinstance(request.get("regex"), str):
+            raise QueryServerExepction("Query has no valid regex")
+        vertices = {}
+        for field in ("starting_vertices", "final_vertices"):
+            if not isinstance(request.get(field), list | None):
+                raise QueryServerExepction(f"Query has {field} that is not list")
+            vertices[field] = self._vertices_of_graph(
+                name_of_graph, request.get(field) or []
+            )
+
+        if self._pending >= self.max_pending:
+            raise QueryServerExepction("Server is busy")
+
+        self._pending += 1
+        try:
+            is_heavy = await asyncio.get_running_loop().run_in_executor(
+                None, self._is_heavy_query, name_of_graph, request["regex"]
+            )
+            return await self._evaluate(
+                is_heavy,
+                _evaluate_query,
+                name_of_graph,
+                request["regex"],
+                vertices["starting_vertices"],
+                vertices["final_vertices"],
+            )
+        finally:
+            self._pending -= 1
+
+    def _vertices_of_graph(self, name_of_graph: str, names: list) -> list:
+
+        """
+        Finds vertices of graph by their names, raises QueryServerExepction
+        if some of them are not in graph
+        """
+
+        vertices = self.vertices[name_of_graph]
+        missing = [name for name in names if str(name) not in vertices]
+        if missing:
+            raise QueryServerExepction(f"Vertices {missing} are not in graph")
+
+        return [vertices[str(name)] for name in names]
+
+    async def _evaluate(self, is_heavy: bool, function, *arguments):
+
+        """
+        Evaluates function in idle worker within timeout. Started function
+        can not be cancelled, so worker of timed out query is terminated
+        and replaced by new one, as well as worker that is crashed
+        """
+
+        self.start_pool()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+
+        if self._heavy_slots is None:
+            self._heavy_slots = asyncio.Semaphore(max(self.workers - 1, 1))
+
+        idle = self._idle_of_heavy if is_heavy else self._idle
+        is_acquired = False
+        executor = None
+
+        try:
+            if is_heavy:
+                await asyncio.wait_for(self._heavy_slots.acquire(), self.timeout)
+                is_acquired = True
+            executor = await asyncio.wait_for(
+                idle.get(), max(deadline - loop.time(), 0)
+            )
+            future = executor.submit(function, *arguments)
+
+            try:
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(future), max(deadline - loop.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                if not future.cancel():
+                    executor = await self._replace_executor(executor)
+                raise
+            except BrokenProcessPool:
+                executor = await self._replace_executor(executor)
+                raise
+        except asyncio.TimeoutError:
+            raise QueryServerExepction("Query is timed out")
+        except QueryServerExepction:
+            raise
+        except Exception as exception:
+            raise QueryServerExepction(f"Query is failed: {exception}")
+        finally:
+            if executor is not None:
+                idle.put_nowait(executor)
+            if is_acquired:
+                self._heavy_slots.release()
+
+    async def _replace_executor(
+        self, executor: ProcessPoolExecutor
+    ) -> ProcessPoolExecutor:
+
+        """
+        Terminates worker of executor and starts new executor instead of it
+        """
+
+        # ProcessPoolExecutor has no public way to stop running task
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        new_executor = await asyncio.get_running_loop().run_in_executor(
+            None, self._start_executor
+        )
+        if self._executors is not None:
+            self._executors[self._executors.index(executor)] = new_executor
+
+        return new_executor
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+
+        """
+        Reads requests line by line and answers them concurrently
+        """
+
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(line: bytes):
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError
+            except ValueError:
+                response = {"id": None, "error": "Request is not JSON object"}
+            else:
+                response = await self.handle_request(request)
+
+            async with lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, path: str = None
+    ) -> asyncio.AbstractServer:
+
+        """
+        Starts listening of local socket
+
+        Args:
+            host: host of TCP socket
+            port: port of TCP socket, any free port if 0
+            path: path of unix socket, TCP socket is used if None
+
+        Returns:
+            Started asyncio server
+        """
+
+        self.start_pool()
+
+        if path is None:
+            self._server = await asyncio.start_server(
+                self._handle_connection, host, port
+            )
+        else:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path
+            )
+
+        return self._server
+
+    async def serve_forever(
+        self, host: str = "127.0.0.1", port: int = 0, path: str = None
+    ):
+
+        """
+        Starts server and serves until it is cancelled
+        """
+
+        server = await self.start(host, port, path)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+
+def load_graphs(paths: dict) -> dict:
+
+    """
+    Loads graphs from DOT files
+
+    Args:
+        paths: dictionary where names matched with paths to graphs
+
+    Returns:
+        Dictionary where names matched with loaded graphs
+    """
+
+    graphs = {}
+    for name, path in paths.items():
+        graph = load_from_dot(path)
+        if not isinstance(graph, MultiDiGraph):
+            graph = MultiDiGraph(graph)
+        graphs[name] = graph
+
+    return graphs
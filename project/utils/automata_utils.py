@@ -1,6 +1,7 @@
 from networkx import MultiDiGraph
 from pyformlang.finite_automaton import (
     DeterministicFiniteAutomaton,
+    EpsilonNFA,
     NondeterministicFiniteAutomaton,
     State,
 )
@@ -34,7 +35,10 @@ def gen_min_dfa_by_reg(reg: Regex) -> DeterministicFiniteAutomaton:
 
 
 def gen_nfa_by_graph(
-    graph: MultiDiGraph, starting_vertices: set = None, final_vertices: set = None
+    graph: MultiDiGraph,
+    starting_vertices: set = None,
+    final_vertices: set = None,
+    marks: set = None,
 ) -> NondeterministicFiniteAutomaton:
 
     """
@@ -44,6 +48,7 @@ def gen_nfa_by_graph(
         graph: graph that would be base for automata
         start_vs: set of vertexes that would be start states
         fin_vs: set of vertexes that would be finale states
+        marks: labels of edges that would be transitions, all labels if None
 
     Returns:
         Genereted automata
@@ -57,7 +62,9 @@ def gen_nfa_by_graph(
                 lambda e: (e[0], e[2]["label"], e[1])
                 if "label" in e[2].keys()
                 else None,
-                graph.edges.data(),
+                graph.edges.data()
+                if marks is None
+                else filter(lambda e: e[2].get("label") in marks, graph.edges.data()),
             )
         )
     )
@@ -82,6 +89,21 @@ def gen_nfa_by_graph(
     return nfa
 
 
+def marks_of_automaton(automaton: EpsilonNFA) -> set:
+
+    """
+    Gives labels of transitions of automaton as they are written in graphs
+
+    Args:
+        automaton: automaton to get labels of
+
+    Returns:
+        Set of labels
+    """
+
+    return {symbol.value for symbol in automaton.symbols}
+
+
 def intersect_of_automata(
     left_nfa: NondeterministicFiniteAutomaton,
     right_nfa: NondeterministicFiniteAutomaton,
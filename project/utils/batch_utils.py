@@ -0,0 +1,347 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+
+from networkx import MultiDiGraph
+from pyformlang.finite_automaton import DeterministicFiniteAutomaton, State
+from pyformlang.regular_expression import Regex
+
+from project.utils.automata_utils import gen_nfa_by_graph
+from project.utils.bin_matrix_utils import BinaryMatrix, build_binary_matrix_by_nfa
+from project.utils.graph_utils import (
+    bfs_by_binary_matrixes,
+    regular_request_by_binary_matrixes,
+)
+from project.utils.regex_utils import build_binary_matrix_by_reg, refine_partition
+
+MIN_QUERIES_FOR_PROCESS_POOL = 8
+SIZE_OF_REQUESTS_CACHE = 1024
+
+_requests_cache: OrderedDict = OrderedDict()
+
+
+def clear_requests_cache():
+
+    """
+    Forgets all compiled regular requests
+    """
+
+    _requests_cache.clear()
+
+
+def compile_regular_request(regex: str | Regex) -> BinaryMatrix:
+
+    """
+    Builds binary matrix of minimal deterministic automaton of regular
+    expression by direct construction. Requests given as text are cached by it
+
+    Args:
+        regex: text of regular expression or regular expression
+
+    Returns:
+        Binary matrix of minimal deterministic automaton
+    """
+
+    if isinstance(regex, Regex):
+        return build_binary_matrix_by_reg(regex)
+
+    if regex in _requests_cache:
+        _requests_cache.move_to_end(regex)
+        return _requests_cache[regex]
+
+    binary_matrix = build_binary_matrix_by_reg(regex)
+
+    _requests_cache[regex] = binary_matrix
+    if len(_requests_cache) > SIZE_OF_REQUESTS_CACHE:
+        _requests_cache.popitem(last=False)
+
+    return binary_matrix
+
+
+def restrict_binary_matrix(binary_matrix: BinaryMatrix, marks: set) -> BinaryMatrix:
+
+    """
+    Keeps only matrixes of given marks, other fields are shared
+
+    Args:
+        binary_matrix: binary matrix to be restricted
+        marks: marks that are kept
+
+    Returns:
+        Binary matrix with matrixes of given marks only
+    """
+
+    return BinaryMatrix(
+        binary_matrix.starting_states,
+        binary_matrix.final_states,
+        binary_matrix.indexes,
+        {
+            mark: matrix
+            for mark, matrix in binary_matrix.matrix.items()
+            if mark in marks
+        },
+    )
+
+
+def group_by_alphabets(binary_matrixes: dict, count_of_groups: int) -> list:
+
+    """
+    Splits requests into groups of about equal size, requests with
+    the same alphabet get into the same group and similar alphabets
+    are placed next to each other
+
+    Args:
+        binary_matrixes: dictionary where requests matched with binary matrixes
+        count_of_groups: desired count of groups
+
+    Returns:
+        List of lists of requests
+    """
+
+    by_alphabets = {}
+    for request, binary_matrix in binary_matrixes.items():
+        alphabet = frozenset(binary_matrix.matrix.keys())
+        by_alphabets.setdefault(alphabet, []).append(request)
+
+    alphabets = sorted(
+        by_alphabets, key=lambda alphabet: sorted(str(mark) for mark in alphabet)
+    )
+    size_of_group = -(-len(binary_matrixes) // max(count_of_groups, 1))
+
+    groups = [[]]
+    for alphabet in alphabets:
+        if groups[-1] and len(groups[-1]) >= size_of_group:
+            groups.append([])
+        groups[-1].extend(by_alphabets[alphabet])
+
+    return [group for group in groups if group]
+
+
+def _evaluate_group(
+    binary_matrix_of_graph: BinaryMatrix, binary_matrixes_of_requests: list
+) -> list:
+
+    """
+    Evaluates group of requests against the same decomposition of graph
+    """
+
+    return [
+        regular_request_by_binary_matrixes(binary_matrix_of_graph, binary_matrix)
+        for binary_matrix in binary_matrixes_of_requests
+    ]
+
+
+def batch_regular_request(
+    graph: MultiDiGraph,
+    regexes: list,
+    starting_vertices: set = None,
+    final_vertices: set = None,
+    workers: int = None,
+) -> dict:
+
+    """
+    Evaluates many regular requests against the same graph. Decomposition
+    of graph is built once, requests are compiled with cache and groups
+    of requests with similar alphabets are evaluated in parallel, each group
+    gets decomposition restricted to labels of its requests
+
+    Args:
+        graph: graph to find paths
+        regexes: texts of regular expressions or regular expressions
+        starting_vertices: set of starting vertices, all vertices if None
+        final_vertices: set of finale vertices, all vertices if None
+        workers: count of worker processes, all cores if None
+
+    Returns:
+        Dictionary where requests matched with sets of pairs of vertices
+        that connected by satisfying path
+    """
+
+    regexes = list(dict.fromkeys(regexes))
+    binary_matrixes = {regex: compile_regular_request(regex) for regex in regexes}
+
+    marks = set()
+    for binary_matrix in binary_matrixes.values():
+        marks |= binary_matrix.matrix.keys()
+
+    binary_matrix_of_graph = build_binary_matrix_by_nfa(
+        gen_nfa_by_graph(
+            graph,
+            starting_vertices,
+            final_vertices,
+            {mark.value for mark in marks},
+        )
+    )
+
+    workers = cpu_count() if workers is None else workers
+    use_pool = workers > 1 and len(regexes) >= MIN_QUERIES_FOR_PROCESS_POOL
+    groups = group_by_alphabets(binary_matrixes, workers * 4 if use_pool else 1)
+
+    arguments = []
+    for group in groups:
+        marks_of_group = set()
+        for request in group:
+            marks_of_group |= binary_matrixes[request].matrix.keys()
+        arguments.append(
+            (
+                restrict_binary_matrix(binary_matrix_of_graph, marks_of_group),
+                [binary_matrixes[request] for request in group],
+            )
+        )
+
+    if use_pool:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_evaluate_group, *zip(*arguments)))
+    else:
+        results = [_evaluate_group(*argument) for argument in arguments]
+
+    return {
+        request: result
+        for group, results_of_group in zip(groups, results)
+        for request, result in zip(group, results_of_group)
+    }
+
+
+def _transitions_of_binary_matrix(binary_matrix: BinaryMatrix) -> dict:
+
+    """
+    Converts decomposition of deterministic automaton to dictionary where
+    marks matched with dictionaries of transitions between indexes of states
+    """
+
+    transitions = {}
+    for mark, matrix in binary_matrix.matrix.items():
+        rows, columns = matrix.nonzero()
+        transitions[mark] = dict(zip(rows.tolist(), columns.tolist()))
+
+    return transitions
+
+
+def build_tagged_automaton(regexes: list) -> (BinaryMatrix, dict):
+
+    """
+    Unites regular requests into one minimal deterministic automaton where
+    finale states are tagged by requests they accept. Union is determinized
+    by subset construction and minimized by refinement of partition
+    where states are initially separated by their tags
+
+    Args:
+        regexes: texts of regular expressions or regular expressions
+
+    Returns:
+        Binary matrix of tagged automaton and dictionary where
+        its finale states matched with sets of requests
+    """
+
+    regexes = list(dict.fromkeys(regexes))
+    binary_matrixes = [compile_regular_request(regex) for regex in regexes]
+    transitions = [_transitions_of_binary_matrix(matrix) for matrix in binary_matrixes]
+    final_indexes = [
+        {matrix.indexes[state] for state in matrix.final_states}
+        for matrix in binary_matrixes
+    ]
+    marks = sorted(
+        {mark for matrix in binary_matrixes for mark in matrix.matrix.keys()},
+        key=lambda mark: str(mark.value),
+    )
+
+    starting_state = frozenset(
+        (number, matrix.indexes[state])
+        for number, matrix in enumerate(binary_matrixes)
+        for state in matrix.starting_states
+    )
+    states = {starting_state: 0}
+    worklist = [starting_state]
+    delta = []
+
+    while worklist:
+        state = worklist.pop()
+        while len(delta) <= states[state]:
+            delta.append({})
+        for mark in marks:
+            next_state = frozenset(
+                (number, transitions[number][mark][index])
+                for number, index in state
+                if mark in transitions[number] and index in transitions[number][mark]
+            )
+            if not next_state:
+                continue
+            if next_state not in states:
+                states[next_state] = len(states)
+                worklist.append(next_state)
+            delta[states[state]][mark] = states[next_state]
+
+    tags = [None] * len(states)
+    for state, index in states.items():
+        tags[index] = frozenset(
+            number
+            for number, local_index in state
+            if local_index in final_indexes[number]
+        )
+
+    blocks = refine_partition(delta, tags, marks)
+
+    automaton = DeterministicFiniteAutomaton()
+    automaton.add_start_state(State(blocks[0]))
+    for index, block in enumerate(blocks):
+        if tags[index]:
+            automaton.add_final_state(State(block))
+        for mark, next_index in delta[index].items():
+            automaton.add_transition(State(block), mark, State(blocks[next_index]))
+
+    binary_matrix = build_binary_matrix_by_nfa(automaton)
+    tags_of_states = {
+        State(blocks[index]): {regexes[number] for number in tags[index]}
+        for index in range(len(tags))
+        if tags[index]
+    }
+
+    return binary_matrix, tags_of_states
+
+
+def multi_bfs_regular_request(
+    graph: MultiDiGraph,
+    regexes: list,
+    starting_vertices: set = None,
+    final_vertices: set = None,
+    separated_flag: bool = False,
+) -> dict:
+
+    """
+    Evaluates many regular requests by single bfs over tagged automaton
+    that unites them, so common prefixes of requests are explored once
+
+    Args:
+        graph: graph to find paths
+        regexes: texts of regular expressions or regular expressions
+        starting_vertices: set of starting vertices, all vertices if None
+        final_vertices: set of finale vertices, all vertices if None
+        separated_flag: flag that represented what kind of result is required
+
+    Returns:
+        Dictionary where requests matched with results of bfs_regular_request
+    """
+
+    binary_matrix_of_request, tags_of_states = build_tagged_automaton(regexes)
+    binary_matrix_of_graph = build_binary_matrix_by_nfa(
+        gen_nfa_by_graph(
+            graph,
+            starting_vertices,
+            final_vertices,
+            {mark.value for mark in binary_matrix_of_request.matrix.keys()},
+        )
+    )
+
+    tags_of_indexes = {
+        binary_matrix_of_request.indexes[state]: tags
+        for state, tags in tags_of_states.items()
+    }
+    result = {regex: set() for regex in dict.fromkeys(regexes)}
+
+    for request_index, key, _ in bfs_by_binary_matrixes(
+        binary_matrix_of_request, binary_matrix_of_graph, separated_flag
+    ):
+        for regex in tags_of_indexes.get(request_index, ()):
+            result[regex].add(key)
+
+    return result
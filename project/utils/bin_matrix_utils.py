@@ -1,20 +1,153 @@
 from collections import namedtuple
-
+from concurrent.futures import ThreadPoolExecutor
+
+from numpy import (
+    concatenate,
+    count_nonzero,
+    diff,
+    float32,
+    full,
+    int32,
+    int64,
+    matmul,
+    ndarray,
+    nonzero,
+    ones,
+    unique,
+    zeros,
+)
 from pyformlang.finite_automaton import NondeterministicFiniteAutomaton, State
 from scipy.sparse import (
     dok_matrix,
     kron,
     block_diag,
+    csr_matrix,
     lil_matrix,
     csr_array,
+    diags,
+    hstack,
     lil_array,
     vstack,
 )
 
+from project.utils.semiring_utils import (
+    Semiring,
+    boolean_matmul,
+    masked_boolean_matmul,
+    lift_to_semiring,
+    semiring_add,
+    semiring_closure,
+    semiring_kron,
+)
+
 BinaryMatrix = namedtuple(
     "BinaryMatrix", ["starting_states", "final_states", "indexes", "matrix"]
 )
 
+Witness = namedtuple("Witness", ["marks", "parents", "marks_of_parents", "distances"])
+
+DENSITY_OF_DENSE_MATRIXES = 0.25
+
+
+def map_by_marks(function, marks, threads: int = None) -> dict:
+
+    """
+    Applies function to each mark, concurrently on pool of threads
+    if more than one thread is given. Sparse kernels of scipy work
+    in compiled code, so independent work of marks overlaps.
+    Pool lives only during call, so no threads are left after it
+
+    Args:
+        function: function of mark
+        marks: marks to apply function to
+        threads: count of threads, work is serial if None or 1
+
+    Returns:
+        Dictionary where marks matched with results of function
+    """
+
+    marks = list(marks)
+
+    if threads is None or threads <= 1 or len(marks) <= 1:
+        return {mark: function(mark) for mark in marks}
+
+    with ThreadPoolExecutor(max_workers=min(threads, len(marks))) as pool:
+        return dict(zip(marks, pool.map(function, marks)))
+
+
+def count_of_nonzero(matrix) -> int:
+
+    """
+    Counts nonzero elements of sparse matrix xor dense array
+    """
+
+    if isinstance(matrix, ndarray):
+        return int(count_nonzero(matrix))
+    if matrix.format == "csr":
+        return int(count_nonzero(matrix.data))
+
+    return matrix.count_nonzero()
+
+
+def adapt_format(matrix, dense_threshold: float = None):
+
+    """
+    Switches boolean matrix to dense array when its density is greater than
+    threshold and back to sparse matrix when density is less than half of it,
+    so matrix does not jump between formats at threshold
+
+    Args:
+        matrix: sparse matrix xor dense array
+        dense_threshold: density of dense matrixes, DENSITY_OF_DENSE_MATRIXES if None
+
+    Returns:
+        Dense boolean array xor matrix itself xor boolean matrix in csr format
+    """
+
+    if dense_threshold is None:
+        dense_threshold = DENSITY_OF_DENSE_MATRIXES
+
+    size = matrix.shape[0] * matrix.shape[1]
+    if not size:
+        return matrix
+
+    density = count_of_nonzero(matrix) / size
+
+    if isinstance(matrix, ndarray):
+        return (
+            csr_matrix(matrix, dtype=bool) if density < dense_threshold / 2 else matrix
+        )
+
+    return matrix.toarray().astype(bool) if density > dense_threshold else matrix
+
+
+def multiply_front(front, matrix):
+
+    """
+    Multiplies front by matrix of mark, sparse front is multiplied
+    over boolean semiring and dense one by product of numpy
+    """
+
+    if isinstance(front, ndarray):
+        return front @ matrix
+
+    return boolean_matmul(front, matrix)
+
+
+def unite_fronts(visited, front):
+
+    """
+    Adds front to visited states, both are sparse xor both are dense
+    """
+
+    if isinstance(visited, ndarray):
+        visited |= front
+        return visited
+
+    visited += front
+
+    return visited
+
 
 def build_binary_matrix_by_nfa(nfa: NondeterministicFiniteAutomaton) -> BinaryMatrix:
 
@@ -98,13 +231,19 @@ def build_nfa_by_binary_matrix(
     return nfa
 
 
-def transitive_closure(bin_matrix: BinaryMatrix) -> lil_matrix:
+def transitive_closure(
+    bin_matrix: BinaryMatrix, on_iteration=None, dense_threshold: float = None
+) -> lil_matrix:
 
     """
-    Calculates transitive closure of graph that is represented by binary matrix
+    Calculates transitive closure of graph that is represented by binary matrix,
+    closure is squared as dense array when its density exceeds threshold
 
     Args:
         bin_matrix: namedtuple with necessary information
+        on_iteration: function that is called with count of nonzero elements
+        after each iteration
+        dense_threshold: density of dense matrixes, DENSITY_OF_DENSE_MATRIXES if None
 
     Returns:
         Transitive closure of graph
@@ -113,23 +252,178 @@ def transitive_closure(bin_matrix: BinaryMatrix) -> lil_matrix:
     if not bin_matrix.matrix.values():
         return lil_array((1, 1)).tocsr()
 
-    transitive_closure = sum(bin_matrix.matrix.values())
+    transitive_closure = csr_matrix(sum(bin_matrix.matrix.values()), dtype=bool)
 
-    prev_count_of_nonzero_elems = transitive_closure.count_nonzero()
+    prev_count_of_nonzero_elems = count_of_nonzero(transitive_closure)
     curr_count_of_nonzero_elems = 0
 
     while prev_count_of_nonzero_elems != curr_count_of_nonzero_elems:
-        transitive_closure += transitive_closure @ transitive_closure
+        transitive_closure = adapt_format(transitive_closure, dense_threshold)
+        if isinstance(transitive_closure, ndarray):
+            dense_closure = transitive_closure.astype(float32)
+            transitive_closure = (dense_closure + dense_closure @ dense_closure) > 0
+        else:
+            transitive_closure = transitive_closure + masked_boolean_matmul(
+                transitive_closure, transitive_closure, transitive_closure
+            )
         prev_count_of_nonzero_elems, curr_count_of_nonzero_elems = (
             curr_count_of_nonzero_elems,
-            transitive_closure.count_nonzero(),
+            count_of_nonzero(transitive_closure),
         )
+        if on_iteration is not None:
+            on_iteration(curr_count_of_nonzero_elems)
+
+    if isinstance(transitive_closure, ndarray):
+        return csr_matrix(transitive_closure)
 
     return transitive_closure
 
 
+def bounded_transitive_closure(
+    bin_matrix: BinaryMatrix,
+    max_length: int,
+    on_iteration=None,
+    dense_threshold: float = None,
+) -> (csr_matrix, csr_matrix):
+
+    """
+    Calculates pairs of states of graph that is represented by binary matrix
+    connected by paths not longer than given length, each front expansion
+    extends paths by exactly one edge so lengths of shortest paths are recorded.
+    Reached pairs and lengths become dense arrays when density of reached pairs
+    exceeds threshold, front switches between formats by its own density
+
+    Args:
+        bin_matrix: namedtuple with necessary information
+        max_length: maximal length of paths
+        on_iteration: function that is called with count of nonzero elements
+        after each expansion
+        dense_threshold: density of dense matrixes, DENSITY_OF_DENSE_MATRIXES if None
+
+    Returns:
+        Bounded transitive closure of graph and matrix of lengths of shortest paths
+    """
+
+    if not bin_matrix.matrix.values():
+        return lil_array((1, 1)).tocsr(), lil_array((1, 1), dtype=int32).tocsr()
+
+    adjacency = csr_matrix(sum(bin_matrix.matrix.values()), dtype=bool)
+
+    if max_length < 1:
+        return csr_matrix(adjacency.shape, dtype=bool), csr_matrix(
+            adjacency.shape, dtype=int32
+        )
+
+    reached = adjacency.copy()
+    distances = csr_matrix(adjacency, dtype=int32)
+    front = adjacency
+
+    for distance in range(2, max_length + 1):
+        if not isinstance(reached, ndarray):
+            reached = adapt_format(reached, dense_threshold)
+            if isinstance(reached, ndarray):
+                distances = distances.toarray()
+
+        if isinstance(reached, ndarray):
+            if isinstance(front, ndarray):
+                new_front = (front @ adjacency > 0) & ~reached
+                if not new_front.any():
+                    break
+                reached |= new_front
+                distances[new_front] = distance
+            else:
+                new_front = masked_boolean_matmul(front, adjacency, reached)
+                if not new_front.nnz:
+                    break
+                rows, columns = new_front.nonzero()
+                reached[rows, columns] = True
+                distances[rows, columns] = distance
+            front = adapt_format(new_front, dense_threshold)
+        else:
+            front = masked_boolean_matmul(front, adjacency, reached)
+            if front.nnz == 0:
+                break
+            reached = reached + front
+            distances = distances + csr_matrix(front, dtype=int32) * distance
+
+        if on_iteration is not None:
+            on_iteration(count_of_nonzero(reached))
+
+    if isinstance(reached, ndarray):
+        return csr_matrix(reached), csr_matrix(distances)
+
+    return reached, distances
+
+
+def semiring_transitive_closure(
+    bin_matrix: BinaryMatrix, semiring: Semiring, max_length: int = None
+) -> csr_matrix:
+
+    """
+    Calculates closure of graph that is represented by binary matrix
+    over given semiring, for example lengths of shortest paths
+    over (min, +) semiring or counts of paths over counting semiring
+
+    Args:
+        bin_matrix: namedtuple with necessary information
+        semiring: semiring of values
+        max_length: maximal length of paths, unbounded if None
+
+    Returns:
+        Matrix where pairs of connected states matched with values over semiring
+    """
+
+    size = len(bin_matrix.indexes)
+    adjacency = csr_matrix((size, size), dtype=semiring.dtype)
+
+    for matrix in bin_matrix.matrix.values():
+        adjacency = semiring_add(
+            adjacency, lift_to_semiring(matrix, semiring), semiring
+        )
+
+    return semiring_closure(adjacency, semiring, max_length)
+
+
+def semiring_intersect_of_binary_matixes(
+    left_bin_matrix: BinaryMatrix, right_bin_matrix: BinaryMatrix, semiring: Semiring
+) -> csr_matrix:
+
+    """
+    Calculates adjacency matrix over semiring of intersect of given automata
+    represented as binary matixes, states are numbered
+    as in intersect_of_automata_by_binary_matixes. Each transition
+    weighs as single edge of left automaton, right one is taken as query
+
+    Args:
+        left_bin_matrix: left side matrix
+        right_bin_matrix: right side matrix
+        semiring: semiring of values
+
+    Returns:
+        Adjacency matrix of intersect over semiring
+    """
+
+    size = len(left_bin_matrix.indexes) * len(right_bin_matrix.indexes)
+    adjacency = csr_matrix((size, size), dtype=semiring.dtype)
+
+    for mark in left_bin_matrix.matrix.keys() & right_bin_matrix.matrix.keys():
+        adjacency = semiring_add(
+            adjacency,
+            semiring_kron(
+                lift_to_semiring(left_bin_matrix.matrix[mark], semiring),
+                lift_to_semiring(right_bin_matrix.matrix[mark], semiring, semiring.one),
+                semiring,
+            ),
+            semiring,
+        )
+
+    return adjacency
+
+
 def intersect_of_automata_by_binary_matixes(
-    left_bin_matrix: BinaryMatrix, right_bin_matrix: BinaryMatrix
+    left_bin_matrix: BinaryMatrix,
+    right_bin_matrix: BinaryMatrix,
+    threads: int = None,
 ) -> BinaryMatrix:
 
     """
@@ -138,6 +432,7 @@ def intersect_of_automata_by_binary_matixes(
     Args:
         left_bin_matrix: left side matrix
         right_bin_matrix: right side matrix
+        threads: count of threads for products of marks, serial if None
 
     Returns:
         Binary matrix that represent intersect of automata
@@ -145,17 +440,19 @@ def intersect_of_automata_by_binary_matixes(
 
     marks = left_bin_matrix.matrix.keys() & right_bin_matrix.matrix.keys()
 
-    matrix = dict()
     starting_states = set()
     final_states = set()
     indexes = {}
 
-    for mark in marks:
-        matrix[mark] = kron(
+    matrix = map_by_marks(
+        lambda mark: kron(
             left_bin_matrix.matrix[mark],
             right_bin_matrix.matrix[mark],
             format="csr",
-        )
+        ),
+        marks,
+        threads,
+    )
 
     for left_state, left_index in left_bin_matrix.indexes.items():
         for right_state, right_index in right_bin_matrix.indexes.items():
@@ -181,6 +478,7 @@ def intersect_of_automata_by_binary_matixes(
 def direct_sum(
     left_bin_matrix: BinaryMatrix,
     right_bin_matrix: BinaryMatrix,
+    threads: int = None,
 ) -> dict:
 
     """
@@ -189,16 +487,16 @@ def direct_sum(
     Args:
         left_bin_matrix: left side matrix
         right_bin_matrix: right side matrix
+        threads: count of threads for sums of marks, serial if None
 
     Returns:
         Dictionary where keys-marks matched with direct sums of corresponding matrixes
     """
 
-    result_matrix = dict()
     size_of_right_matrix = len(right_bin_matrix.indexes)
 
-    for mark in left_bin_matrix.matrix.keys():
-        result_matrix[mark] = csr_array(
+    return map_by_marks(
+        lambda mark: csr_array(
             block_diag(
                 (
                     left_bin_matrix.matrix[mark],
@@ -209,9 +507,255 @@ def direct_sum(
                     ),
                 )
             )
+        ),
+        left_bin_matrix.matrix.keys(),
+        threads,
+    )
+
+
+def _tag_states(bin_matrix: BinaryMatrix, tag: int, offset: int = 0) -> dict:
+
+    """
+    Matches states of binary matrix with new states that are pairs of tag
+    and value of state, indexes are shifted by offset
+    """
+
+    return {
+        state: (State((tag, state.value)), index + offset)
+        for state, index in bin_matrix.indexes.items()
+    }
+
+
+def _indicator_of_states(bin_matrix: BinaryMatrix, states: set) -> csr_matrix:
+
+    """
+    Builds boolean row that is nonzero at indexes of given states
+    """
+
+    columns = [bin_matrix.indexes[state] for state in states]
+
+    return csr_matrix(
+        (ones(len(columns), dtype=bool), ([0] * len(columns), columns)),
+        shape=(1, len(bin_matrix.indexes)),
+    )
+
+
+def _matrix_of_mark(bin_matrix: BinaryMatrix, mark) -> csr_matrix:
+    size = len(bin_matrix.indexes)
+
+    if mark not in bin_matrix.matrix:
+        return csr_matrix((size, size), dtype=bool)
+
+    return csr_matrix(bin_matrix.matrix[mark], dtype=bool)
+
+
+def union_of_binary_matixes(
+    left_bin_matrix: BinaryMatrix, right_bin_matrix: BinaryMatrix
+) -> BinaryMatrix:
+
+    """
+    Calculates union of given automata represented as binary matixes,
+    states of automata are placed side by side
+
+    Args:
+        left_bin_matrix: left side matrix
+        right_bin_matrix: right side matrix
+
+    Returns:
+        Binary matrix where states are pairs of 0 xor 1 for left and right
+        automaton and values of their states, matrixes are in csr format
+    """
+
+    left_states = _tag_states(left_bin_matrix, 0)
+    right_states = _tag_states(right_bin_matrix, 1, len(left_states))
+
+    return BinaryMatrix(
+        {left_states[state][0] for state in left_bin_matrix.starting_states}
+        | {right_states[state][0] for state in right_bin_matrix.starting_states},
+        {left_states[state][0] for state in left_bin_matrix.final_states}
+        | {right_states[state][0] for state in right_bin_matrix.final_states},
+        dict(left_states.values()) | dict(right_states.values()),
+        {
+            mark: block_diag(
+                (
+                    _matrix_of_mark(left_bin_matrix, mark),
+                    _matrix_of_mark(right_bin_matrix, mark),
+                ),
+                format="csr",
+                dtype=bool,
+            )
+            for mark in left_bin_matrix.matrix.keys() | right_bin_matrix.matrix.keys()
+        },
+    )
+
+
+def concat_of_binary_matixes(
+    left_bin_matrix: BinaryMatrix, right_bin_matrix: BinaryMatrix
+) -> BinaryMatrix:
+
+    """
+    Calculates concatenation of given automata represented as binary matixes
+    without epsilon transitions: finale states of left automaton get
+    transitions of starting states of right one
+
+    Args:
+        left_bin_matrix: left side matrix
+        right_bin_matrix: right side matrix
+
+    Returns:
+        Binary matrix where states are pairs of 0 xor 1 for left and right
+        automaton and values of their states, matrixes are in csr format
+    """
+
+    left_states = _tag_states(left_bin_matrix, 0)
+    right_states = _tag_states(right_bin_matrix, 1, len(left_states))
+
+    finals_of_left = _indicator_of_states(
+        left_bin_matrix, left_bin_matrix.final_states
+    ).transpose()
+    starts_of_right = _indicator_of_states(
+        right_bin_matrix, right_bin_matrix.starting_states
+    )
+
+    matrix = {}
+    for mark in left_bin_matrix.matrix.keys() | right_bin_matrix.matrix.keys():
+        right_matrix = _matrix_of_mark(right_bin_matrix, mark)
+        matrix[mark] = vstack(
+            (
+                hstack(
+                    (
+                        _matrix_of_mark(left_bin_matrix, mark),
+                        boolean_matmul(
+                            finals_of_left,
+                            boolean_matmul(starts_of_right, right_matrix),
+                        ),
+                    )
+                ),
+                hstack(
+                    (
+                        csr_matrix((len(right_states), len(left_states)), dtype=bool),
+                        right_matrix,
+                    )
+                ),
+            ),
+            format="csr",
         )
 
-    return result_matrix
+    final_states = {right_states[state][0] for state in right_bin_matrix.final_states}
+    if right_bin_matrix.starting_states & right_bin_matrix.final_states:
+        final_states |= {
+            left_states[state][0] for state in left_bin_matrix.final_states
+        }
+
+    return BinaryMatrix(
+        {left_states[state][0] for state in left_bin_matrix.starting_states},
+        final_states,
+        dict(left_states.values()) | dict(right_states.values()),
+        matrix,
+    )
+
+
+def star_of_binary_matrix(bin_matrix: BinaryMatrix) -> BinaryMatrix:
+
+    """
+    Calculates Kleene star of automaton represented as binary matrix without
+    epsilon transitions: new starting state that is finale gets transitions
+    of old starting states and finale states get them too
+
+    Args:
+        bin_matrix: namedtuple with necessary information
+
+    Returns:
+        Binary matrix where states are pairs of 0 and values of old states
+        and new starting state is pair (1, 0), matrixes are in csr format
+    """
+
+    states = _tag_states(bin_matrix, 0)
+    new_state = State((1, 0))
+    size = len(states)
+
+    finals = _indicator_of_states(bin_matrix, bin_matrix.final_states).transpose()
+    starts = _indicator_of_states(bin_matrix, bin_matrix.starting_states)
+
+    matrix = {}
+    for mark in bin_matrix.matrix.keys():
+        old_matrix = _matrix_of_mark(bin_matrix, mark)
+        from_starts = boolean_matmul(starts, old_matrix)
+        matrix[mark] = vstack(
+            (
+                hstack(
+                    (
+                        old_matrix + boolean_matmul(finals, from_starts),
+                        csr_matrix((size, 1), dtype=bool),
+                    )
+                ),
+                hstack((from_starts, csr_matrix((1, 1), dtype=bool))),
+            ),
+            format="csr",
+        )
+
+    return BinaryMatrix(
+        {new_state},
+        {states[state][0] for state in bin_matrix.final_states} | {new_state},
+        dict(states.values()) | {new_state: size},
+        matrix,
+    )
+
+
+def reverse_binary_matrix(bin_matrix: BinaryMatrix) -> BinaryMatrix:
+
+    """
+    Reverses automaton represented by binary matrix: matrixes are transposed
+    and starting states are swapped with finale ones
+
+    Args:
+        bin_matrix: namedtuple with necessary information
+
+    Returns:
+        Binary matrix of reversed automaton with matrixes in csr format
+    """
+
+    return BinaryMatrix(
+        bin_matrix.final_states,
+        bin_matrix.starting_states,
+        bin_matrix.indexes,
+        {
+            mark: csr_matrix(matrix).transpose().tocsr()
+            for mark, matrix in bin_matrix.matrix.items()
+        },
+    )
+
+
+def restrict_binary_matrix_to_states(
+    bin_matrix: BinaryMatrix, states: set
+) -> BinaryMatrix:
+
+    """
+    Removes transitions from and to states that are not given,
+    indexes of states are kept
+
+    Args:
+        bin_matrix: namedtuple with necessary information
+        states: states that are kept
+
+    Returns:
+        Binary matrix of restricted automaton with matrixes in csr format
+    """
+
+    mask = zeros(len(bin_matrix.indexes), dtype=bool)
+    for state in states:
+        mask[bin_matrix.indexes[state]] = True
+    mask = diags(mask, format="csr", dtype=bool)
+
+    return BinaryMatrix(
+        bin_matrix.starting_states & states,
+        bin_matrix.final_states & states,
+        bin_matrix.indexes,
+        {
+            mark: csr_matrix(mask @ csr_matrix(matrix, dtype=bool) @ mask)
+            for mark, matrix in bin_matrix.matrix.items()
+        },
+    )
 
 
 def init_front(
@@ -300,26 +844,159 @@ def sort_left_part_of_front(
 ) -> csr_array:
 
     """
-    Transport rows for each left part of front to get single matrixes
+    Transport rows for each left part of front to get single matrixes:
+    right part of row j of each block is union of right parts of rows of block
+    which left part has column j, it is boolean product of transport matrix
+    and right part of front
 
     Args:
         size_of_left_part: size of left part of front
         front: front
 
     Returns:
-        Sorted front
+        Sorted front, dense if front is dense
+    """
+
+    if isinstance(front, ndarray):
+        return _sort_left_part_of_dense_front(size_of_left_part, front)
+
+    front = csr_matrix(front, dtype=bool)
+    rows, columns = front.nonzero()
+    is_left = columns < size_of_left_part
+    rows, columns = rows[is_left], columns[is_left]
+
+    transport = csr_matrix(
+        (
+            ones(len(rows), dtype=bool),
+            (rows // size_of_left_part * size_of_left_part + columns, rows),
+        ),
+        shape=(front.shape[0], front.shape[0]),
+    )
+    right_part = boolean_matmul(transport, front[:, size_of_left_part:])
+
+    reached_rows = nonzero(diff(right_part.indptr))[0]
+    left_part = csr_matrix(
+        (
+            ones(len(reached_rows), dtype=bool),
+            (reached_rows, reached_rows % size_of_left_part),
+        ),
+        shape=(front.shape[0], size_of_left_part),
+    )
+
+    return hstack((left_part, right_part), format="csr")
+
+
+def _sort_left_part_of_dense_front(size_of_left_part: int, front: ndarray) -> ndarray:
+
+    """
+    Sorts dense front by products of left and right parts of its blocks:
+    right part of row j of block is union of right parts of rows of block
+    which left part has column j
+    """
+
+    count_of_blocks = front.shape[0] // size_of_left_part
+    size_of_right_part = front.shape[1] - size_of_left_part
+
+    left_parts = (
+        front[:, :size_of_left_part]
+        .reshape(count_of_blocks, size_of_left_part, size_of_left_part)
+        .astype(float32)
+    )
+    right_parts = (
+        front[:, size_of_left_part:]
+        .reshape(count_of_blocks, size_of_left_part, size_of_right_part)
+        .astype(float32)
+    )
+    right_parts = (matmul(left_parts.transpose(0, 2, 1), right_parts) > 0).reshape(
+        front.shape[0], size_of_right_part
+    )
+
+    new_front = zeros(front.shape, dtype=bool)
+    new_front[:, size_of_left_part:] = right_parts
+    rows = right_parts.any(axis=1).nonzero()[0]
+    new_front[rows, rows % size_of_left_part] = True
+
+    return new_front
+
+
+def bfs_with_witness(
+    bin_matrix: BinaryMatrix,
+    starting_indexes: ndarray,
+    marks: list = None,
+    max_length: int = None,
+) -> Witness:
+
+    """
+    Breadth-first search over automaton represented by binary matrix that records
+    for each reached state its parent and mark of transition from it. Starting states
+    are reached only by nonempty paths as in transitive closure
+
+    Args:
+        bin_matrix: namedtuple with necessary information
+        starting_indexes: indexes of states that search starts from
+        marks: order of marks to be used in witness, keys of matrix if None
+        max_length: maximal length of paths, unbounded if None
+
+    Returns:
+        Witness - namedtuple that contains list of marks, arrays of parents,
+        indexes of marks of transitions from parents and lengths of shortest
+        paths, -1 for states that are not reached
+    """
+
+    marks = list(bin_matrix.matrix.keys()) if marks is None else marks
+    matrixes = [bin_matrix.matrix[mark].tocsr() for mark in marks]
+    count_of_states = len(bin_matrix.indexes)
+
+    parents = full(count_of_states, -1, dtype=int64)
+    marks_of_parents = full(count_of_states, -1, dtype=int32)
+    distances = full(count_of_states, -1, dtype=int32)
+
+    front = unique(starting_indexes).astype(int64)
+    distance = 0
+
+    while front.size and matrixes and (max_length is None or distance < max_length):
+        distance += 1
+        states, states_parents, states_marks = [], [], []
+
+        for index_of_mark, matrix in enumerate(matrixes):
+            reached = matrix[front].tocoo()
+            states.append(reached.col)
+            states_parents.append(front[reached.row])
+            states_marks.append(full(reached.nnz, index_of_mark, dtype=int32))
+
+        states = concatenate(states)
+        not_visited = distances[states] == -1
+        states, first_occurrences = unique(states[not_visited], return_index=True)
+
+        parents[states] = concatenate(states_parents)[not_visited][first_occurrences]
+        marks_of_parents[states] = concatenate(states_marks)[not_visited][
+            first_occurrences
+        ]
+        distances[states] = distance
+        front = states.astype(int64)
+
+    return Witness(marks, parents, marks_of_parents, distances)
+
+
+def restore_path(witness: Witness, index: int) -> list:
+
+    """
+    Restores shortest path to state from witness of breadth-first search
+
+    Args:
+        witness: witness recorded by bfs_with_witness
+        index: index of reached state
+
+    Returns:
+        List of transitions of path represented as triples of
+        index of state from, mark and index of state to
     """
 
-    new_front = lil_array(front.shape)
+    path = []
 
-    for i, j in zip(*front.nonzero()):
-        if j < size_of_left_part:
-            non_zero_row_right_of_row = front[[i]].tolil()[[0], size_of_left_part:]
-            if non_zero_row_right_of_row.nnz > 0:
-                row_shift = i // size_of_left_part
-                new_front[row_shift + j, j] = 1
-                new_front[
-                    [row_shift + j], size_of_left_part:
-                ] += non_zero_row_right_of_row
+    for _ in range(witness.distances[index]):
+        parent = int(witness.parents[index])
+        path.append((parent, witness.marks[witness.marks_of_parents[index]], index))
+        index = parent
 
-    return new_front.tocsr()
+    return path[::-1]
@@ -0,0 +1,103 @@
+from networkx import MultiDiGraph
+from numpy import ones
+from pyformlang.cfg import CFG, Terminal
+from scipy.sparse import csr_matrix, identity
+
+from project.utils.grammar_utils import contex_free_to_weak_chomsky_form
+from project.utils.semiring_utils import masked_boolean_matmul
+
+
+class ContexFreeRequestExepction(Exception):
+    def __init__(self, msg: str):
+        self.message = msg
+
+
+def matrix_contex_free_request(
+    graph: MultiDiGraph,
+    grammar: str | CFG,
+    starting_vertices: set = None,
+    final_vertices: set = None,
+    starting_nonterminal: str = "S",
+) -> set:
+
+    """
+    From given starting and finale vertices finds pairs that are connected by path
+    which labels form word derivable from starting nonterminal of grammar.
+    Grammar is converted to weak Chomsky form, each nonterminal gets boolean
+    matrix of pairs of vertices and products of matrixes of bodies are added
+    to matrixes of heads until no new pairs are found
+
+    Args:
+        graph: graph to find paths
+        grammar: text of contex free grammar or contex free grammar
+        starting_vertices: set of starting vertices, all vertices if None
+        final_vertices: set of finale vertices, all vertices if None
+        starting_nonterminal: starting nonterminal if grammar is given as text
+
+    Returns:
+        Set of pairs of vertices that connected by satisfying path
+    """
+
+    weak_chomsky_form = contex_free_to_weak_chomsky_form(grammar, starting_nonterminal)
+
+    vertices = list(graph.nodes)
+    indexes = {vertex: index for index, vertex in enumerate(vertices)}
+    size = len(vertices)
+
+    nodes = set(vertices)
+    if starting_vertices and not set(starting_vertices).issubset(nodes):
+        raise ContexFreeRequestExepction("Starting nodes are not subset of graph")
+    if final_vertices and not set(final_vertices).issubset(nodes):
+        raise ContexFreeRequestExepction("Finale nodes are not subset of graph")
+
+    edges = {}
+    for vertex_from, vertex_to, label in graph.edges.data("label"):
+        if label is not None:
+            rows, columns = edges.setdefault(label, ([], []))
+            rows.append(indexes[vertex_from])
+            columns.append(indexes[vertex_to])
+
+    matrixes = {}
+    binary_productions = []
+    for production in weak_chomsky_form.productions:
+        matrix = matrixes.setdefault(
+            production.head, csr_matrix((size, size), dtype=bool)
+        )
+        if not production.body:
+            matrixes[production.head] = matrix + identity(
+                size, dtype=bool, format="csr"
+            )
+        elif len(production.body) == 1 and isinstance(production.body[0], Terminal):
+            rows, columns = edges.get(production.body[0].value, ([], []))
+            matrixes[production.head] = matrix + csr_matrix(
+                (ones(len(rows), dtype=bool), (rows, columns)), shape=(size, size)
+            )
+        else:
+            binary_productions.append((production.head, *production.body))
+
+    is_changed = True
+    while is_changed:
+        is_changed = False
+        for head, left, right in binary_productions:
+            if left not in matrixes or right not in matrixes:
+                continue
+            new_pairs = masked_boolean_matmul(
+                matrixes[left], matrixes[right], matrixes[head]
+            )
+            if new_pairs.nnz:
+                matrixes[head] = matrixes[head] + new_pairs
+                is_changed = True
+
+    if weak_chomsky_form.start_symbol not in matrixes:
+        return set()
+
+    starting_vertices = set(starting_vertices) if starting_vertices else nodes
+    final_vertices = set(final_vertices) if final_vertices else nodes
+
+    rows, columns = matrixes[weak_chomsky_form.start_symbol].nonzero()
+
+    return {
+        (vertices[row], vertices[column])
+        for row, column in zip(rows.tolist(), columns.tolist())
+        if vertices[row] in starting_vertices and vertices[column] in final_vertices
+    }
@@ -0,0 +1,595 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from numpy import (
+    arange,
+    array,
+    concatenate,
+    int64,
+    load,
+    ndarray,
+    ones,
+    savez_compressed,
+    unique,
+)
+from scipy.sparse import csr_matrix, vstack
+
+from project.utils.bin_matrix_utils import BinaryMatrix
+from project.utils.semiring_utils import boolean_matmul, masked_boolean_matmul
+
+MIN_STATES_FOR_PROCESS_POOL = 4096
+BLOCKS_PER_WORKER = 4
+BYTES_PER_PAIR = 16
+
+
+def adjacency_of_binary_matrix(bin_matrix: BinaryMatrix) -> csr_matrix:
+
+    """
+    Unites matrixes of all marks into one boolean adjacency matrix
+
+    Args:
+        bin_matrix: namedtuple with necessary information
+
+    Returns:
+        Adjacency matrix in csr format with sorted indices
+    """
+
+    size = len(bin_matrix.indexes)
+    adjacency = csr_matrix((size, size), dtype=bool)
+
+    for matrix in bin_matrix.matrix.values():
+        adjacency = adjacency + csr_matrix(matrix, dtype=bool)
+
+    adjacency.sort_indices()
+
+    return adjacency
+
+
+class KroneckerProduct:
+
+    """
+    Boolean adjacency matrix of intersection of two automata whose rows
+    are built only when they are needed, so the product is never kept
+    in memory. State of product with index i is pair of state i // size
+    of left automaton and state i % size of right one, where size is
+    count of states of right automaton, as in
+    intersect_of_automata_by_binary_matixes
+    """
+
+    def __init__(self, left_bin_matrix: BinaryMatrix, right_bin_matrix: BinaryMatrix):
+        self.left_size = len(left_bin_matrix.indexes)
+        self.right_size = len(right_bin_matrix.indexes)
+        size = self.left_size * self.right_size
+        self.shape = (size, size)
+        self.pairs = [
+            (
+                csr_matrix(left_bin_matrix.matrix[mark], dtype=bool),
+                csr_matrix(right_bin_matrix.matrix[mark], dtype=bool),
+            )
+            for mark in left_bin_matrix.matrix.keys() & right_bin_matrix.matrix.keys()
+        ]
+
+    def rows(self, rows: ndarray) -> csr_matrix:
+
+        """
+        Builds given rows of product
+        """
+
+        count_of_rows = len(rows)
+
+        return self.multiply(
+            csr_matrix(
+                (ones(count_of_rows, dtype=bool), (arange(count_of_rows), rows)),
+                shape=(count_of_rows, self.shape[0]),
+            )
+        )
+
+    def multiply(self, front: csr_matrix) -> csr_matrix:
+
+        """
+        Multiplies rows of front by product without building it, row of front
+        is matrix F of pairs of states and F is multiplied by matrix of right
+        automaton on the right and by matrix of left one on the left
+
+        Args:
+            front: boolean matrix whose rows are sets of states of product
+
+        Returns:
+            Boolean product of front and adjacency matrix of product in csr format
+        """
+
+        front = front.tocoo()
+        count_of_rows = front.shape[0]
+        left_states, right_states = (
+            front.col // self.right_size,
+            front.col % self.right_size,
+        )
+        result = csr_matrix((count_of_rows, self.shape[1]), dtype=bool)
+
+        for left_matrix, right_matrix in self.pairs:
+            step = boolean_matmul(
+                csr_matrix(
+                    (
+                        ones(front.nnz, dtype=bool),
+                        (
+                            front.row.astype(int64) * self.left_size + left_states,
+                            right_states,
+                        ),
+                    ),
+                    shape=(count_of_rows * self.left_size, self.right_size),
+                ),
+                right_matrix,
+            ).tocoo()
+
+            rows, step_left_states = (
+                step.row // self.left_size,
+                step.row % self.left_size,
+            )
+            step = boolean_matmul(
+                csr_matrix(
+                    (
+                        ones(step.nnz, dtype=bool),
+                        (
+                            rows.astype(int64) * self.right_size + step.col,
+                            step_left_states,
+                        ),
+                    ),
+                    shape=(count_of_rows * self.right_size, self.left_size),
+                ),
+                left_matrix,
+            ).tocoo()
+
+            result = result + csr_matrix(
+                (
+                    ones(step.nnz, dtype=bool),
+                    (
+                        step.row // self.right_size,
+                        step.col.astype(int64) * self.right_size
+                        + step.row % self.right_size,
+                    ),
+                ),
+                shape=result.shape,
+            )
+
+        return result
+
+
+def _rows_of_relation(relation, rows: ndarray) -> csr_matrix:
+    if isinstance(relation, KroneckerProduct):
+        return relation.rows(rows)
+    return relation[rows]
+
+
+def _expand_front(front: csr_matrix, relation, reached: csr_matrix) -> csr_matrix:
+    if isinstance(relation, KroneckerProduct):
+        return relation.multiply(front) > reached
+    return masked_boolean_matmul(front, relation, reached)
+
+
+def closure_of_rows(adjacency: csr_matrix, first_row: int, last_row: int) -> csr_matrix:
+
+    """
+    Calculates rows of transitive closure by expanding fronts of rows
+    against base relation until no new pairs are found
+
+    Args:
+        adjacency: base relation
+        first_row: first row of block
+        last_row: row after last row of block
+
+    Returns:
+        Block of rows of transitive closure
+    """
+
+    reached = adjacency[first_row:last_row]
+    front = reached
+
+    while front.nnz:
+        front = masked_boolean_matmul(front, adjacency, reached)
+        reached = reached + front
+
+    reached.sort_indices()
+
+    return reached
+
+
+def _share_array(array: ndarray) -> (SharedMemory, tuple):
+
+    """
+    Copies array to new block of shared memory
+
+    Returns:
+        Block of shared memory and description of array to attach it
+    """
+
+    memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+    ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[:] = array
+
+    return memory, (memory.name, array.shape, array.dtype.str)
+
+
+def _attach_array(description: tuple) -> (SharedMemory, ndarray):
+
+    """
+    Attaches array that is placed in shared memory by parent process,
+    which is responsible for unlinking it. Workers share resource tracker
+    with parent, so attached blocks are not unregistered there
+    """
+
+    name, shape, dtype = description
+
+    try:
+        memory = SharedMemory(name=name, track=False)
+    except TypeError:
+        memory = SharedMemory(name=name)
+
+    return memory, ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _closure_of_shared_rows(
+    indptr_description: tuple,
+    indices_description: tuple,
+    size: int,
+    first_row: int,
+    last_row: int,
+) -> (ndarray, ndarray):
+
+    """
+    Calculates block of rows of transitive closure in worker process
+    against base relation placed in shared memory
+
+    Returns:
+        Arrays indptr and indices of block
+    """
+
+    indptr_memory, indptr = _attach_array(indptr_description)
+    indices_memory, indices = _attach_array(indices_description)
+
+    try:
+        adjacency = csr_matrix(
+            (ones(len(indices), dtype=bool), indices, indptr), shape=(size, size)
+        )
+        block = closure_of_rows(adjacency, first_row, last_row)
+        del adjacency
+    finally:
+        indptr_memory.close()
+        indices_memory.close()
+
+    return block.indptr, block.indices
+
+
+def parallel_transitive_closure(
+    bin_matrix: BinaryMatrix, workers: int = None, count_of_blocks: int = None
+) -> csr_matrix:
+
+    """
+    Calculates transitive closure of graph that is represented by binary matrix
+    on worker processes. Rows are split into blocks, base relation is placed
+    in shared memory once and each worker iterates its blocks to fixpoint
+
+    Args:
+        bin_matrix: namedtuple with necessary information
+        workers: count of worker processes, all cores if None
+        count_of_blocks: count of blocks of rows, several per worker if None
+
+    Returns:
+        Transitive closure of graph as boolean matrix in csr format
+    """
+
+    adjacency = adjacency_of_binary_matrix(bin_matrix)
+    size = adjacency.shape[0]
+    workers = cpu_count() if workers is None else workers
+
+    if count_of_blocks is None:
+        count_of_blocks = workers * BLOCKS_PER_WORKER
+    count_of_blocks = max(1, min(count_of_blocks, size))
+    bounds = [size * i // count_of_blocks for i in range(count_of_blocks + 1)]
+
+    if workers <= 1 or size < MIN_STATES_FOR_PROCESS_POOL:
+        blocks = [
+            closure_of_rows(adjacency, first_row, last_row)
+            for first_row, last_row in zip(bounds, bounds[1:])
+        ]
+        return vstack(blocks, format="csr")
+
+    indptr_memory, indptr_description = _share_array(adjacency.indptr)
+    indices_memory, indices_description = _share_array(adjacency.indices)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            blocks = list(
+                executor.map(
+                    _closure_of_shared_rows,
+                    [indptr_description] * count_of_blocks,
+                    [indices_description] * count_of_blocks,
+                    [size] * count_of_blocks,
+                    bounds[:-1],
+                    bounds[1:],
+                )
+            )
+    finally:
+        for memory in (indptr_memory, indices_memory):
+            memory.close()
+            memory.unlink()
+
+    return vstack(
+        [
+            csr_matrix(
+                (ones(len(indices), dtype=bool), indices, indptr),
+                shape=(last_row - first_row, size),
+            )
+            for (indptr, indices), first_row, last_row in zip(
+                blocks, bounds, bounds[1:]
+            )
+        ],
+        format="csr",
+    )
+
+
+class ClosureBlocks:
+
+    """
+    Rows of transitive closure stored by blocks, blocks are kept in memory
+    while they fit into budget and are spilled to disk as compressed
+    arrays of indices otherwise. Spilled blocks are loaded one at a time
+    """
+
+    def __init__(self, shape: tuple, directory: str | Path = None):
+        self.shape = shape
+        self.nnz = 0
+        self.nnz_in_memory = 0
+        self._blocks = []
+        self._directory = directory
+        self._temporary_directory = None
+
+    @property
+    def spilled(self) -> bool:
+        return any(isinstance(block, Path) for _, block in self._blocks)
+
+    def add(self, rows: ndarray, block: csr_matrix, budget_of_pairs: int):
+
+        """
+        Stores block of closure, all blocks in memory are spilled
+        when they do not fit into budget together with new one
+
+        Args:
+            rows: source rows of block
+            block: rows of closure
+            budget_of_pairs: count of pairs that can be kept in memory
+        """
+
+        self.nnz += block.nnz
+        self.nnz_in_memory += block.nnz
+        self._blocks.append((rows, block))
+
+        if self.nnz_in_memory > budget_of_pairs:
+            self.spill()
+
+    def spill(self):
+
+        """
+        Saves all blocks that are kept in memory to disk
+        """
+
+        if self._directory is None:
+            self._temporary_directory = self._temporary_directory or (
+                TemporaryDirectory(prefix="closure_")
+            )
+            directory = Path(self._temporary_directory.name)
+        else:
+            directory = Path(self._directory)
+            directory.mkdir(parents=True, exist_ok=True)
+
+        for number, (rows, block) in enumerate(self._blocks):
+            if isinstance(block, Path):
+                continue
+            path = directory / f"block_{id(self)}_{number}.npz"
+            savez_compressed(
+                path, rows=rows, indptr=block.indptr, indices=block.indices
+            )
+            self._blocks[number] = (rows, path)
+
+        self.nnz_in_memory = 0
+
+    def __iter__(self):
+
+        """
+        Iterates over pairs of source rows and blocks of closure
+        """
+
+        for rows, block in self._blocks:
+            if isinstance(block, Path):
+                with load(block, allow_pickle=False) as arrays:
+                    indices = arrays["indices"]
+                    block = csr_matrix(
+                        (ones(len(indices), dtype=bool), indices, arrays["indptr"]),
+                        shape=(len(rows), self.shape[1]),
+                    )
+            yield rows, block
+
+    def nonzero(self):
+
+        """
+        Iterates over pairs of connected states block by block
+        """
+
+        for rows, block in self:
+            block_rows, columns = block.nonzero()
+            yield from zip(rows[block_rows].tolist(), columns.tolist())
+
+    def to_csr(self) -> csr_matrix:
+
+        """
+        Loads whole closure to memory, rows that are not computed are empty
+        """
+
+        result_rows, result_columns = [], []
+        for rows, block in self:
+            block_rows, columns = block.nonzero()
+            result_rows.append(rows[block_rows])
+            result_columns.append(columns)
+
+        if not result_rows:
+            return csr_matrix(self.shape, dtype=bool)
+
+        columns = concatenate(result_columns)
+        return csr_matrix(
+            (ones(len(columns), dtype=bool), (concatenate(result_rows), columns)),
+            shape=self.shape,
+        )
+
+    def close(self):
+
+        """
+        Removes spilled blocks
+        """
+
+        for rows, block in self._blocks:
+            if isinstance(block, Path):
+                block.unlink(missing_ok=True)
+        self._blocks = []
+        if self._temporary_directory is not None:
+            self._temporary_directory.cleanup()
+            self._temporary_directory = None
+
+    def __enter__(self) -> "ClosureBlocks":
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def _closure_of_block(
+    relation, rows: ndarray, budget_of_pairs: int = None
+) -> csr_matrix | None:
+
+    """
+    Calculates rows of transitive closure by expanding fronts
+
+    Args:
+        relation: base relation as boolean matrix xor KroneckerProduct
+        rows: source rows
+        budget_of_pairs: maximal count of pairs of block, unbounded if None
+
+    Returns:
+        Block of closure xor None if it does not fit into budget
+    """
+
+    reached = _rows_of_relation(relation, rows)
+    front = reached
+
+    while front.nnz:
+        if budget_of_pairs is not None and reached.nnz > budget_of_pairs:
+            return None
+        front = _expand_front(front, relation, reached)
+        reached = reached + front
+
+    if budget_of_pairs is not None and reached.nnz > budget_of_pairs:
+        return None
+
+    reached.sort_indices()
+
+    return reached
+
+
+def transitive_closure_of_rows(bin_matrix: BinaryMatrix, rows) -> csr_matrix:
+
+    """
+    Calculates only given rows of transitive closure by expanding their fronts,
+    so states that are not reachable from them are never touched
+
+    Args:
+        bin_matrix: namedtuple with necessary information
+        rows: indexes of source states
+
+    Returns:
+        Block of closure where rows go in sorted order of given indexes
+    """
+
+    rows = unique(array(list(rows), dtype=int64))
+
+    return _closure_of_block(adjacency_of_binary_matrix(bin_matrix), rows)
+
+
+def iter_budgeted_closure(relation, memory_budget: int, rows=None):
+
+    """
+    Calculates rows of transitive closure by blocks within memory budget and
+    yields blocks one at a time, so caller can drop each block after use.
+    Size of block is predicted by density of previous blocks and block is
+    split in half when it grows beyond half of budget. Single row is computed
+    even if it does not fit into budget
+
+    Args:
+        relation: base relation as boolean matrix xor KroneckerProduct, whose
+            rows are built for each block, so it is not kept in memory
+        memory_budget: count of bytes for pairs of closure
+        rows: source rows to be computed, all rows if None
+
+    Yields:
+        Pairs of array of source rows and block of closure in csr format
+    """
+
+    rows = (
+        arange(relation.shape[0])
+        if rows is None
+        else unique(array(list(rows), dtype=int64))
+    )
+    budget_of_block = max(1, memory_budget // BYTES_PER_PAIR // 2)
+    count_of_rows = min(len(rows), budget_of_block)
+    start = 0
+
+    while start < len(rows):
+        rows_of_block = rows[start : start + count_of_rows]
+        block = _closure_of_block(
+            relation, rows_of_block, budget_of_block if count_of_rows > 1 else None
+        )
+        if block is None:
+            count_of_rows = max(1, count_of_rows // 2)
+            continue
+
+        yield rows_of_block, block
+        start += len(rows_of_block)
+
+        density = max(block.nnz / len(rows_of_block), 1)
+        count_of_rows = max(1, int(budget_of_block / density))
+
+
+def budgeted_transitive_closure(
+    bin_matrix: BinaryMatrix | KroneckerProduct,
+    memory_budget: int,
+    rows=None,
+    directory: str | Path = None,
+) -> ClosureBlocks:
+
+    """
+    Calculates rows of transitive closure within memory budget by
+    iter_budgeted_closure, completed blocks are spilled to disk
+    when they do not fit into budget
+
+    Args:
+        bin_matrix: namedtuple with necessary information xor KroneckerProduct
+        memory_budget: count of bytes for pairs of closure
+        rows: source rows to be computed, all rows if None
+        directory: directory for spilled blocks, temporary one if None
+
+    Returns:
+        ClosureBlocks with computed rows of closure
+    """
+
+    relation = (
+        bin_matrix
+        if isinstance(bin_matrix, KroneckerProduct)
+        else adjacency_of_binary_matrix(bin_matrix)
+    )
+
+    result = ClosureBlocks(relation.shape, directory)
+    budget_of_pairs = max(1, memory_budget // BYTES_PER_PAIR)
+
+    for rows_of_block, block in iter_budgeted_closure(relation, memory_budget, rows):
+        result.add(rows_of_block, block, budget_of_pairs)
+
+    return result
@@ -0,0 +1,415 @@
+import re
+from array import array
+
+from networkx import MultiDiGraph
+from numpy import frombuffer, int32, int64
+
+from project.utils.edge_arrays_utils import EdgeArrays
+
+KEYWORDS = {"strict", "graph", "digraph", "node", "edge", "subgraph"}
+
+_ID = r'[^\W\d]\w*|-?(?:\.\d+|\d+(?:\.\d*)?)|"(?:[^"\\]|\\[\s\S])*"'
+_BARE_ID = re.compile(r"[^\W\d]\w*|-?(?:\.\d+|\d+(?:\.\d*)?)")
+
+# statements that take whole line and are the most common in big files,
+# attributes in them have no quotes, so they are split without tokenizer
+_EDGE_LINE = re.compile(
+    rf"\s*({_ID})\s*(?:->|--)\s*({_ID})\s*(?:\[([^\]\"<]*)\])?\s*;\s*$"
+)
+_NODE_LINE = re.compile(rf"\s*({_ID})\s*(?:\[([^\]\"<]*)\])?\s*;\s*$")
+_ATTRIBUTE = re.compile(r"([^=,;\s]+)\s*=\s*([^,;\s]+)")
+_ATTRIBUTES = re.compile(r"\s*(?:[^=,;\s]+\s*=\s*[^,;\s]+\s*[,;]?\s*)*")
+
+# escapes of quoted ID that are removed by reading, other escapes
+# like \l of graphviz are kept as they are
+_ESCAPE = re.compile(r'\\([\\"\n])')
+
+_TOKEN = re.compile(
+    rf"\s*(?:(//|#)|(/\*)|({_ID})|(->|--|[{{}}\[\]=,;:])|(\S))",
+)
+
+# tokens after which the fast path is not allowed because statement goes on
+_CONTINUING_TOKENS = {"->", "--", "=", ",", "[", ":"}
+
+
+class DotExepction(Exception):
+    def __init__(self, msg: str):
+        self.message = msg
+
+
+def _unquote(value: str) -> str:
+    if value.startswith('"'):
+        return _ESCAPE.sub(
+            lambda match: "" if match[1] == "\n" else match[1], value[1:-1]
+        )
+    return value
+
+
+def _quote(value) -> str:
+
+    """
+    Quotes ID of DOT if it is not a bare name xor numeral, backslashes
+    and quotes are escaped, so _unquote gives the same value back
+    """
+
+    value = str(value)
+    if _BARE_ID.fullmatch(value) and value.lower() not in KEYWORDS:
+        return value
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _fast_attributes(text: str) -> dict:
+    if text is None:
+        return {}
+    if _ATTRIBUTES.fullmatch(text) is None:
+        raise DotExepction(f"Attributes [{text.strip()}] can not be parsed")
+    return dict(_ATTRIBUTE.findall(text))
+
+
+def _tokens_of_lines(lines):
+
+    """
+    Splits lines of DOT file into tokens, comments are skipped and strings
+    may take several lines. Line that is the whole node or edge statement
+    is yielded as one token ("node", name, attributes) xor
+    ("edge", name, name, attributes) if it starts new statement
+
+    Args:
+        lines: iterable of lines
+
+    Yields:
+        Tuples where the first item is kind of token: "id", "keyword",
+        punctuation itself, "node" or "edge"
+    """
+
+    in_comment = False
+    previous = "{"
+    pending = ""
+
+    for number, line in enumerate(lines, 1):
+        if pending:
+            line = pending + line
+            pending = ""
+
+        if not in_comment and previous not in _CONTINUING_TOKENS:
+            match = _EDGE_LINE.match(line)
+            if match is not None:
+                previous = ";"
+                yield ("edge", match.group(1), match.group(2), match.group(3))
+                continue
+            match = _NODE_LINE.match(line)
+            if match is not None and match.group(1).lower() not in KEYWORDS:
+                previous = ";"
+                yield ("node", match.group(1), match.group(2))
+                continue
+
+        position = 0
+        while position < len(line):
+            if in_comment:
+                end = line.find("*/", position)
+                if end < 0:
+                    break
+                in_comment = False
+                position = end + 2
+                continue
+
+            match = _TOKEN.match(line, position)
+            if match is None:
+                break
+
+            line_comment, block_comment, identifier, punctuation, other = match.groups()
+            if line_comment is not None:
+                if line_comment == "#" and line[:position].strip():
+                    raise DotExepction(f"Line {number}: unexpected symbol #")
+                break
+            if block_comment is not None:
+                in_comment = True
+                position = match.end()
+                continue
+            if identifier is not None:
+                if identifier.lower() in KEYWORDS:
+                    previous = identifier.lower()
+                    yield ("keyword", previous)
+                else:
+                    previous = "id"
+                    yield ("id", identifier)
+            elif punctuation is not None:
+                previous = punctuation
+                yield (punctuation,)
+            elif other == '"':
+                pending = line[match.start(5) :]
+                break
+            elif other == "<":
+                raise DotExepction(f"Line {number}: HTML strings are not supported")
+            else:
+                raise DotExepction(f"Line {number}: unexpected symbol {other}")
+            position = match.end()
+
+    if pending:
+        raise DotExepction("String is not closed")
+    if in_comment:
+        raise DotExepction("Comment is not closed")
+
+
+class _GraphBuilder:
+
+    """
+    Collects statements of DOT file into MultiDiGraph in the same way as
+    networkx.drawing.nx_pydot.read_dot does: names are strings and
+    attribute "key" of edge becomes key of edge
+    """
+
+    def __init__(self):
+        self.graph = MultiDiGraph()
+
+    def set_name(self, name: str):
+        self.graph.name = name
+
+    def add_defaults(self, kind: str, attributes: dict):
+        self.graph.graph.setdefault(kind, {}).update(attributes)
+
+    def add_node(self, name: str, attributes: dict):
+        self.graph.add_node(name, **attributes)
+
+    def add_edge(self, vertex_from: str, vertex_to: str, attributes: dict):
+        key = attributes.pop("key", None)
+        self.graph.add_edge(vertex_from, vertex_to, key=key, **attributes)
+
+    def result(self) -> MultiDiGraph:
+        return self.graph
+
+
+class _EdgeArraysBuilder:
+
+    """
+    Collects statements of DOT file into EdgeArrays, only "label" attribute
+    of edges is kept, all other attributes are skipped
+    """
+
+    def __init__(self):
+        self.indexes = {}
+        self.marks = {}
+        self.sources = array("q")
+        self.targets = array("q")
+        self.labels = array("i")
+
+    def set_name(self, name: str):
+        pass
+
+    def add_defaults(self, kind: str, attributes: dict):
+        pass
+
+    def add_node(self, name: str, attributes: dict):
+        self.indexes.setdefault(name, len(self.indexes))
+
+    def add_edge(self, vertex_from: str, vertex_to: str, attributes: dict):
+        indexes = self.indexes
+        self.sources.append(indexes.setdefault(vertex_from, len(indexes)))
+        self.targets.append(indexes.setdefault(vertex_to, len(indexes)))
+        label = attributes.get("label")
+        self.labels.append(
+            -1 if label is None else self.marks.setdefault(label, len(self.marks))
+        )
+
+    def result(self) -> EdgeArrays:
+        return EdgeArrays(
+            list(self.indexes),
+            list(self.marks),
+            frombuffer(self.sources, dtype=int64).copy(),
+            frombuffer(self.targets, dtype=int64).copy(),
+            frombuffer(self.labels, dtype=int32).copy(),
+        )
+
+
+class _Parser:
+
+    """
+    Parser of subset of DOT: one graph with node, edge, attribute and
+    ID = ID statements, edges may be chained like a -> b -> c,
+    subgraphs and ports are not supported
+    """
+
+    def __init__(self, tokens, builder):
+        self.tokens = tokens
+        self.builder = builder
+        self.current = next(tokens, ("end",))
+
+    def error(self, expected: str):
+        found = "end of file" if self.current[0] == "end" else self.current[-1]
+        raise DotExepction(f"Expected {expected}, but found {found}")
+
+    def advance(self) -> tuple:
+        token = self.current
+        self.current = next(self.tokens, ("end",))
+        return token
+
+    def accept(self, kind: str, value=None) -> bool:
+        if self.current[0] == kind and (value is None or self.current[1] == value):
+            self.advance()
+            return True
+        return False
+
+    def expect_id(self) -> str:
+        if self.current[0] != "id":
+            self.error("ID")
+        return _unquote(self.advance()[1])
+
+    def graph(self):
+        self.accept("keyword", "strict")
+        if not (self.accept("keyword", "digraph") or self.accept("keyword", "graph")):
+            self.error("graph or digraph")
+        if self.current[0] == "id":
+            self.builder.set_name(self.expect_id())
+        if not self.accept("{"):
+            self.error("{")
+
+        while not self.accept("}"):
+            self.statement()
+            self.accept(";")
+
+        return self.builder.result()
+
+    def attributes(self) -> dict:
+        attributes = {}
+        while self.accept("["):
+            while not self.accept("]"):
+                name = self.expect_id()
+                if not self.accept("="):
+                    self.error("=")
+                attributes[name] = self.expect_id()
+                self.accept(",") or self.accept(";")
+        return attributes
+
+    def statement(self):
+        kind = self.current[0]
+        builder = self.builder
+
+        if kind == "edge":
+            _, vertex_from, vertex_to, attributes = self.advance()
+            builder.add_edge(
+                _unquote(vertex_from), _unquote(vertex_to), _fast_attributes(attributes)
+            )
+        elif kind == "node":
+            _, name, attributes = self.advance()
+            builder.add_node(_unquote(name), _fast_attributes(attributes))
+        elif kind == "keyword" and self.current[1] in ("graph", "node", "edge"):
+            builder.add_defaults(self.advance()[1], self.attributes())
+        elif kind == "id":
+            names = [self.expect_id()]
+            if self.current[0] == ":":
+                raise DotExepction("Ports are not supported")
+            while self.accept("->") or self.accept("--"):
+                names.append(self.expect_id())
+
+            if len(names) == 1 and self.accept("="):
+                builder.add_defaults("graph", {names[0]: self.expect_id()})
+                return
+
+            attributes = self.attributes()
+            if len(names) == 1:
+                builder.add_node(names[0], attributes)
+            for vertex_from, vertex_to in zip(names, names[1:]):
+                builder.add_edge(vertex_from, vertex_to, dict(attributes))
+        elif kind == "keyword" and self.current[1] == "subgraph" or kind == "{":
+            raise DotExepction("Subgraphs are not supported")
+        else:
+            self.error("statement")
+
+
+def read_dot(path: str, edge_arrays: bool = False):
+
+    """
+    Reads graph from DOT file line by line without pydot. Subset of DOT is
+    supported: one graph with node, edge and attribute statements, comments
+    and quoted strings, but without subgraphs, ports and HTML strings
+
+    Args:
+        path: path to DOT file
+        edge_arrays: if True EdgeArrays of graph are built instead of graph
+
+    Returns:
+        MultiDiGraph where names of vertices and attributes are strings
+        xor EdgeArrays where vertices go in order of appearance
+    """
+
+    builder = _EdgeArraysBuilder() if edge_arrays else _GraphBuilder()
+
+    with open(path, "r") as file:
+        return _Parser(_tokens_of_lines(file), builder).graph()
+
+
+def _line_of_attributes(attributes) -> str:
+    return ", ".join(f"{_quote(name)}={_quote(value)}" for name, value in attributes)
+
+
+def write_dot(graph, path: str):
+
+    """
+    Writes graph into DOT file line by line without pydot, the output is
+    the same as networkx.drawing.nx_pydot wrote
+
+    Args:
+        graph: MultiDiGraph xor EdgeArrays
+        path: path to be saved to
+    """
+
+    with open(path, "w") as file:
+        if isinstance(graph, EdgeArrays):
+            _write_edge_arrays(graph, file)
+        else:
+            _write_graph(graph, file)
+
+
+def _write_graph(graph: MultiDiGraph, file):
+    name = graph.graph.get("name", "")
+    kind = "digraph" if graph.is_directed() else "graph"
+    arrow = "->" if graph.is_directed() else "--"
+    if not graph.is_multigraph() and not any(u == v for u, v in graph.edges):
+        kind = "strict " + kind
+
+    file.write(f"{kind} {_quote(name) if name else ''} {{\n")
+    for default in ("graph", "node", "edge"):
+        if graph.graph.get(default):
+            attributes = _line_of_attributes(graph.graph[default].items())
+            file.write(f"{default} [{attributes}];\n")
+
+    for node, data in graph.nodes(data=True):
+        if data:
+            file.write(f"{_quote(node)} [{_line_of_attributes(data.items())}];\n")
+        else:
+            file.write(f"{_quote(node)};\n")
+
+    if graph.is_multigraph():
+        edges = (
+            (u, v, [("key", key), *data.items()])
+            for u, v, key, data in graph.edges(keys=True, data=True)
+        )
+    else:
+        edges = ((u, v, data.items()) for u, v, data in graph.edges(data=True))
+
+    for vertex_from, vertex_to, attributes in edges:
+        line = f"{_quote(vertex_from)} {arrow} {_quote(vertex_to)}"
+        if attributes:
+            line += f"  [{_line_of_attributes(attributes)}]"
+        file.write(line + ";\n")
+
+    file.write("}\n")
+
+
+def _write_edge_arrays(edge_arrays: EdgeArrays, file):
+    vertices = [_quote(vertex) for vertex in edge_arrays.vertices]
+    marks = [_quote(mark) for mark in edge_arrays.marks]
+
+    file.write("digraph  {\n")
+    file.writelines(f"{vertex};\n" for vertex in vertices)
+    file.writelines(
+        f"{vertices[source]} -> {vertices[target]}  [label={marks[label]}];\n"
+        if label >= 0
+        else f"{vertices[source]} -> {vertices[target]};\n"
+        for source, target, label in zip(
+            edge_arrays.sources.tolist(),
+            edge_arrays.targets.tolist(),
+            edge_arrays.labels.tolist(),
+        )
+    )
+    file.write("}\n")
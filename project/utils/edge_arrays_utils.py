@@ -0,0 +1,136 @@
+from collections import namedtuple
+
+from networkx import MultiDiGraph
+from numpy import argsort, array, int32, int64, ones
+from pyformlang.finite_automaton import State, Symbol
+from scipy.sparse import csr_matrix
+
+from project.utils.bin_matrix_utils import BinaryMatrix
+
+# names of vertices, labels of edges and arrays of sources, targets and
+# indexes of labels of edges, -1 is index of edges without label
+EdgeArrays = namedtuple(
+    "EdgeArrays", ["vertices", "marks", "sources", "targets", "labels"]
+)
+
+
+def edge_arrays_of_graph(graph: MultiDiGraph) -> EdgeArrays:
+
+    """
+    Converts graph to edge arrays, vertices go in order of graph
+
+    Args:
+        graph: graph to be converted
+
+    Returns:
+        EdgeArrays of graph
+    """
+
+    vertices = list(graph.nodes)
+    indexes = {vertex: index for index, vertex in enumerate(vertices)}
+    marks = {}
+    sources, targets, labels = [], [], []
+
+    for vertex_from, vertex_to, label in graph.edges.data("label"):
+        sources.append(indexes[vertex_from])
+        targets.append(indexes[vertex_to])
+        labels.append(-1 if label is None else marks.setdefault(label, len(marks)))
+
+    return EdgeArrays(
+        vertices,
+        list(marks),
+        array(sources, dtype=int64),
+        array(targets, dtype=int64),
+        array(labels, dtype=int32),
+    )
+
+
+def graph_of_edge_arrays(edge_arrays: EdgeArrays) -> MultiDiGraph:
+
+    """
+    Converts edge arrays to graph where edges have "label" attribute
+
+    Args:
+        edge_arrays: edge arrays to be converted
+
+    Returns:
+        Graph with the same vertices and edges
+    """
+
+    graph = MultiDiGraph()
+    vertices = edge_arrays.vertices
+    marks = edge_arrays.marks
+
+    graph.add_nodes_from(vertices)
+    graph.add_edges_from(
+        (vertices[source], vertices[target], {"label": marks[label]})
+        if label >= 0
+        else (vertices[source], vertices[target], {})
+        for source, target, label in zip(
+            edge_arrays.sources.tolist(),
+            edge_arrays.targets.tolist(),
+            edge_arrays.labels.tolist(),
+        )
+    )
+
+    return graph
+
+
+def matrixes_of_edge_arrays(edge_arrays: EdgeArrays) -> dict:
+
+    """
+    Builds boolean adjacency matrix of each label, edges without label
+    are skipped
+
+    Args:
+        edge_arrays: edge arrays of graph
+
+    Returns:
+        Dictionary where labels matched with matrixes in csr format
+    """
+
+    size = len(edge_arrays.vertices)
+    labels = edge_arrays.labels
+    order = argsort(labels, kind="stable")
+    bounds = labels[order].searchsorted(range(len(edge_arrays.marks) + 1))
+
+    matrixes = {}
+    for number, mark in enumerate(edge_arrays.marks):
+        edges = order[bounds[number] : bounds[number + 1]]
+        matrixes[mark] = csr_matrix(
+            (
+                ones(len(edges), dtype=bool),
+                (edge_arrays.sources[edges], edge_arrays.targets[edges]),
+            ),
+            shape=(size, size),
+        )
+
+    return matrixes
+
+
+def decompose_edge_arrays(edge_arrays: EdgeArrays) -> BinaryMatrix:
+
+    """
+    Builds decomposition of graph given as edge arrays without networkx
+    and pyformlang automata, the same as decompose_graph builds
+
+    Args:
+        edge_arrays: edge arrays of graph
+
+    Returns:
+        BinaryMatrix of graph where all vertices are starting and finale
+    """
+
+    indexes = {
+        State(vertex): index for index, vertex in enumerate(edge_arrays.vertices)
+    }
+
+    return BinaryMatrix(
+        set(indexes),
+        set(indexes),
+        indexes,
+        {
+            Symbol(mark): matrix
+            for mark, matrix in matrixes_of_edge_arrays(edge_arrays).items()
+        },
+    )
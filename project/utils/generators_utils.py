@@ -0,0 +1,190 @@
+from typing import Sequence
+
+from numpy import arange, concatenate, full, int32, int64, ndarray, random, unique
+
+from project.utils.edge_arrays_utils import EdgeArrays
+
+DEFAULT_EXPONENT_OF_POWER_LAW = 2.5
+
+
+class GeneratorExepction(Exception):
+    def __init__(self, msg: str):
+        self.message = msg
+
+
+def _labels(count_of_edges: int, mark: int) -> ndarray:
+    return full(count_of_edges, mark, dtype=int32)
+
+
+def gen_two_cycles_edge_arrays(
+    fst_num_nodes: int, snd_num_nodes: int, marks: Sequence[str] = ("a", "b")
+) -> EdgeArrays:
+
+    """
+    Creates two cycled graph connected by one node, vertices and edges go
+    in the same order as in labeled_two_cycles_graph of cfpq_data
+
+    Args:
+        fst_num_nodes: amount of nodes in the first cycle without a common node
+        snd_num_nodes: amount of nodes in the second cycle without a common node
+        marks: labels of edges of the first and the second cycles
+
+    Returns:
+        EdgeArrays of graph, vertices are integers and 0 is the common node
+    """
+
+    if fst_num_nodes < 1 or snd_num_nodes < 1:
+        raise GeneratorExepction("Cycles must have at least one node")
+
+    # indexes of vertices are 0..fst_num_nodes - 1 for 1..fst_num_nodes,
+    # fst_num_nodes for 0 and the rest for the second cycle
+    common = fst_num_nodes
+    fst_cycle = arange(fst_num_nodes + 1, dtype=int64)
+    snd_cycle = concatenate(
+        ([common], arange(common + 1, common + snd_num_nodes + 1, dtype=int64))
+    )
+
+    # edges from vertices of the first cycle and from the common node go first
+    sources = concatenate((fst_cycle, snd_cycle))
+    targets = concatenate((fst_cycle[1:], [0], snd_cycle[1:], [common]))
+
+    return EdgeArrays(
+        [
+            *range(1, fst_num_nodes + 1),
+            0,
+            *range(common + 1, common + snd_num_nodes + 1),
+        ],
+        list(marks[:2]),
+        sources,
+        targets,
+        concatenate((_labels(fst_num_nodes + 1, 0), _labels(snd_num_nodes + 1, 1))),
+    )
+
+
+def gen_random_edge_arrays(
+    count_of_vertices: int,
+    probability: float,
+    marks: Sequence[str] = ("a", "b"),
+    seed: int = None,
+) -> EdgeArrays:
+
+    """
+    Creates random directed graph of Erdős–Rényi model where each edge
+    without loops exists with the given probability and has random label.
+    Edges are sampled without building matrix of all pairs, so millions
+    of edges are generated in seconds
+
+    Args:
+        count_of_vertices: count of vertices
+        probability: probability of each edge
+        marks: labels of edges
+        seed: seed of random generator
+
+    Returns:
+        EdgeArrays of graph, vertices are 0..count_of_vertices - 1 and
+        edges are sorted by sources
+    """
+
+    if not 0 <= probability <= 1:
+        raise GeneratorExepction("Probability must be from 0 to 1")
+
+    generator = random.default_rng(seed)
+    count_of_pairs = count_of_vertices * (count_of_vertices - 1)
+    count_of_edges = generator.binomial(count_of_pairs, probability)
+
+    pairs = generator.choice(count_of_pairs, count_of_edges, replace=False)
+    pairs.sort()
+    # pair p is edge from p // (n - 1) to p % (n - 1), where the loop
+    # of vertex is skipped by shifting next targets
+    count_of_targets = max(count_of_vertices - 1, 1)
+    sources, targets = pairs // count_of_targets, pairs % count_of_targets
+    targets += targets >= sources
+
+    return EdgeArrays(
+        range(count_of_vertices),
+        list(marks),
+        sources.astype(int64),
+        targets.astype(int64),
+        generator.integers(len(marks), size=count_of_edges, dtype=int32),
+    )
+
+
+def gen_power_law_edge_arrays(
+    count_of_vertices: int,
+    count_of_edges: int,
+    marks: Sequence[str] = ("a", "b"),
+    exponent: float = DEFAULT_EXPONENT_OF_POWER_LAW,
+    seed: int = None,
+) -> EdgeArrays:
+
+    """
+    Creates random directed graph with power-law distribution of degrees
+    by Chung–Lu model: ends of edges are chosen with probabilities
+    proportional to weights (i + 1) ^ (-1 / (exponent - 1)), so vertices
+    with small numbers are hubs. Equal edges with equal labels are kept once
+
+    Args:
+        count_of_vertices: count of vertices
+        count_of_edges: count of sampled edges
+        marks: labels of edges
+        exponent: exponent of power law, greater than 1
+        seed: seed of random generator
+
+    Returns:
+        EdgeArrays of graph with at most count_of_edges edges, vertices are
+        0..count_of_vertices - 1 and edges are sorted by sources
+    """
+
+    if exponent <= 1:
+        raise GeneratorExepction("Exponent of power law must be greater than 1")
+
+    generator = random.default_rng(seed)
+    weights = arange(1, count_of_vertices + 1, dtype=float) ** (-1 / (exponent - 1))
+    weights /= weights.sum()
+
+    sources = generator.choice(count_of_vertices, count_of_edges, p=weights)
+    targets = generator.choice(count_of_vertices, count_of_edges, p=weights)
+    labels = generator.integers(len(marks), size=count_of_edges)
+
+    edges = unique((sources * count_of_vertices + targets) * len(marks) + labels)
+    labels = edges % len(marks)
+    edges //= len(marks)
+
+    return EdgeArrays(
+        range(count_of_vertices),
+        list(marks),
+        (edges // count_of_vertices).astype(int64),
+        (edges % count_of_vertices).astype(int64),
+        labels.astype(int32),
+    )
+
+
+def gen_grid_edge_arrays(
+    count_of_rows: int, count_of_columns: int, marks: Sequence[str] = ("a", "b")
+) -> EdgeArrays:
+
+    """
+    Creates grid where each vertex has edge to the right neighbour labeled
+    by the first mark and edge to the lower neighbour labeled by the second
+
+    Args:
+        count_of_rows: count of rows of grid
+        count_of_columns: count of columns of grid
+        marks: labels of horizontal and vertical edges
+
+    Returns:
+        EdgeArrays of graph, vertex in row r and column c is
+        r * count_of_columns + c
+    """
+
+    vertices = arange(count_of_rows * count_of_columns, dtype=int64)
+    horizontal = vertices[vertices % count_of_columns != count_of_columns - 1]
+    vertical = vertices[: (count_of_rows - 1) * count_of_columns]
+
+    return EdgeArrays(
+        range(len(vertices)),
+        list(marks[:2]),
+        concatenate((horizontal, vertical)),
+        concatenate((horizontal + 1, vertical + count_of_columns)),
+        concatenate((_labels(len(horizontal), 0), _labels(len(vertical), 1))),
+    )
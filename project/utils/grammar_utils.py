@@ -1,6 +1,44 @@
+from collections import OrderedDict
+from hashlib import sha256
 from pathlib import Path
 
-from pyformlang.cfg import CFG, Variable
+from pyformlang.cfg import CFG, Production, Terminal, Variable
+
+SIZE_OF_WEAK_CHOMSKY_FORMS_CACHE = 128
+
+_weak_chomsky_forms_cache: OrderedDict = OrderedDict()
+
+
+def contex_free_grammar_to_text(contex_free_grammar: CFG) -> str:
+
+    """
+    Builds canonical text representation of contex free grammar
+    that does not depend on the order of productions
+
+    Args:
+        contex_free_grammar: contex free grammar to be represented
+
+    Returns:
+        Text of grammar with sorted productions one per line
+    """
+
+    return "\n".join(
+        sorted(
+            production.head.to_text()
+            + " -> "
+            + " ".join(symbol.to_text() for symbol in production.body)
+            for production in contex_free_grammar.productions
+        )
+    )
+
+
+def clear_weak_chomsky_forms_cache():
+
+    """
+    Forgets all memoized weak Chomsky forms
+    """
+
+    _weak_chomsky_forms_cache.clear()
 
 
 def contex_free_to_weak_chomsky_form(
@@ -9,7 +47,8 @@ def contex_free_to_weak_chomsky_form(
 
     """
     Converts contex free grammar is reprsented as string or CFG
-    to equivalent weak Chomsky form
+    to equivalent weak Chomsky form. Results are memoized by hash
+    of grammar text, so repeated conversions of the same grammar are free
 
     Args:
         contex_free_grammar: contex free grammar to be converted
@@ -19,29 +58,310 @@ def contex_free_to_weak_chomsky_form(
         Equivalent grammar that represented in weak Chomsky form
     """
 
-    if not isinstance(contex_free_grammar, CFG):
-        contex_free_grammar = CFG.from_text(
-            contex_free_grammar, Variable(starting_nonterminal)
-        )
+    is_text = not isinstance(contex_free_grammar, CFG)
+
+    if is_text:
+        grammar_text = contex_free_grammar
+        starting_symbol = Variable(starting_nonterminal)
+    else:
+        grammar_text = contex_free_grammar_to_text(contex_free_grammar)
+        starting_symbol = contex_free_grammar.start_symbol
+
+    key = (
+        sha256(grammar_text.encode()).hexdigest(),
+        is_text,
+        None if starting_symbol is None else repr(starting_symbol.value),
+    )
+
+    if key in _weak_chomsky_forms_cache:
+        _weak_chomsky_forms_cache.move_to_end(key)
+        return _weak_chomsky_forms_cache[key]
+
+    if is_text:
+        contex_free_grammar = CFG.from_text(grammar_text, starting_symbol)
+
+    weak_chomsky_form = _build_weak_chomsky_form(contex_free_grammar)
 
-    contex_free_grammar = (
-        contex_free_grammar.remove_useless_symbols()
-        .eliminate_unit_productions()
-        .remove_useless_symbols()
+    _weak_chomsky_forms_cache[key] = weak_chomsky_form
+    if len(_weak_chomsky_forms_cache) > SIZE_OF_WEAK_CHOMSKY_FORMS_CACHE:
+        _weak_chomsky_forms_cache.popitem(last=False)
+
+    return weak_chomsky_form
+
+
+def _build_weak_chomsky_form(contex_free_grammar: CFG) -> CFG:
+
+    """
+    Converts contex free grammar to weak Chomsky form working
+    on integer-encoded symbols
+
+    Args:
+        contex_free_grammar: contex free grammar to be converted
+
+    Returns:
+        Equivalent grammar that represented in weak Chomsky form
+    """
+
+    starting_symbol = contex_free_grammar.start_symbol
+
+    symbols = sorted(
+        {
+            (isinstance(symbol, Terminal), str(symbol.value), symbol)
+            for production in contex_free_grammar.productions
+            for symbol in (production.head, *production.body)
+        }
+        | (
+            {(False, str(starting_symbol.value), starting_symbol)}
+            if starting_symbol is not None
+            else set()
+        ),
+        key=lambda item: item[:2],
     )
-    productions_to_decompose = (
-        contex_free_grammar._get_productions_with_only_single_terminals()
+    decoded = [symbol for _, _, symbol in symbols]
+    is_terminal = [terminal_flag for terminal_flag, _, _ in symbols]
+    encoded = {(flag, symbol.value): i for i, (flag, _, symbol) in enumerate(symbols)}
+
+    def encode(symbol) -> int:
+        return encoded[(isinstance(symbol, Terminal), symbol.value)]
+
+    start = None if starting_symbol is None else encode(starting_symbol)
+    productions = sorted(
+        {
+            (encode(production.head), tuple(map(encode, production.body)))
+            for production in contex_free_grammar.productions
+        }
     )
-    new_productions = contex_free_grammar._decompose_productions(
-        productions_to_decompose
+
+    productions = _remove_useless_productions(productions, is_terminal, start)
+    productions = _eliminate_unit_productions(productions, is_terminal)
+    productions = _remove_useless_productions(productions, is_terminal, start)
+
+    variables_names = {
+        decoded[symbol].value
+        for head, body in productions
+        for symbol in (head, *body)
+        if not is_terminal[symbol]
+    }
+
+    def new_variable(value: str) -> int:
+        key = (False, value)
+        if key not in encoded:
+            encoded[key] = len(decoded)
+            decoded.append(Variable(value))
+            is_terminal.append(False)
+        return encoded[key]
+
+    productions = _decompose_productions(
+        _replace_terminals_in_long_bodies(
+            productions, is_terminal, decoded, new_variable
+        ),
+        decoded,
+        variables_names,
+        new_variable,
     )
 
     return CFG(
-        start_symbol=contex_free_grammar._start_symbol,
-        productions=set(new_productions),
+        start_symbol=starting_symbol,
+        productions={
+            Production(decoded[head], [decoded[symbol] for symbol in body])
+            for head, body in productions
+        },
     )
 
 
+def _remove_useless_productions(
+    productions: list, is_terminal: list, start: int
+) -> list:
+
+    """
+    Removes productions with nongenerating or unreachable symbols,
+    both sets are computed by worklists
+
+    Args:
+        productions: integer-encoded productions as pairs of head and body
+        is_terminal: flags that tell which symbols are terminals
+        start: code of starting nonterminal
+
+    Returns:
+        Productions without useless symbols
+    """
+
+    generating = list(is_terminal)
+    remaining = [len(body) for _, body in productions]
+    impacts = [[] for _ in is_terminal]
+    worklist = [i for i, flag in enumerate(is_terminal) if flag]
+
+    for index, (head, body) in enumerate(productions):
+        for symbol in body:
+            impacts[symbol].append(index)
+        if not body and not generating[head]:
+            generating[head] = True
+            worklist.append(head)
+
+    while worklist:
+        symbol = worklist.pop()
+        for index in impacts[symbol]:
+            remaining[index] -= 1
+            head = productions[index][0]
+            if remaining[index] == 0 and not generating[head]:
+                generating[head] = True
+                worklist.append(head)
+
+    productions = [
+        (head, body)
+        for head, body in productions
+        if generating[head] and all(generating[symbol] for symbol in body)
+    ]
+
+    if start is None:
+        return []
+
+    bodies = [[] for _ in is_terminal]
+    for head, body in productions:
+        bodies[head].append(body)
+
+    reachable = [False] * len(is_terminal)
+    reachable[start] = True
+    worklist = [start]
+
+    while worklist:
+        for body in bodies[worklist.pop()]:
+            for symbol in body:
+                if not reachable[symbol]:
+                    reachable[symbol] = True
+                    worklist.append(symbol)
+
+    return [(head, body) for head, body in productions if reachable[head]]
+
+
+def _eliminate_unit_productions(productions: list, is_terminal: list) -> list:
+
+    """
+    Replaces unit productions by productions of nonterminals
+    that are reachable by chains of unit productions
+
+    Args:
+        productions: integer-encoded productions as pairs of head and body
+        is_terminal: flags that tell which symbols are terminals
+
+    Returns:
+        Productions without unit ones
+    """
+
+    units = [[] for _ in is_terminal]
+    non_unit_bodies = [[] for _ in is_terminal]
+
+    for head, body in productions:
+        if len(body) == 1 and not is_terminal[body[0]]:
+            units[head].append(body[0])
+        else:
+            non_unit_bodies[head].append(body)
+
+    result = set()
+    for variable in sorted({head for head, _ in productions}):
+        unit_pairs = {variable}
+        worklist = [variable]
+        while worklist:
+            for next_variable in units[worklist.pop()]:
+                if next_variable not in unit_pairs:
+                    unit_pairs.add(next_variable)
+                    worklist.append(next_variable)
+
+        for paired_variable in unit_pairs:
+            for body in non_unit_bodies[paired_variable]:
+                result.add((variable, body))
+
+    return sorted(result)
+
+
+def _replace_terminals_in_long_bodies(
+    productions: list, is_terminal: list, decoded: list, new_variable
+) -> list:
+
+    """
+    Replaces terminals in bodies longer than one with new nonterminals
+    that produce only that terminal
+
+    Args:
+        productions: integer-encoded productions as pairs of head and body
+        is_terminal: flags that tell which symbols are terminals
+        decoded: symbols matched with their codes
+        new_variable: function that gives code of nonterminal by its name
+
+    Returns:
+        Productions where terminals stay only in bodies of length one
+    """
+
+    result = []
+    used = {}
+
+    for head, body in productions:
+        if len(body) == 1:
+            result.append((head, body))
+            continue
+
+        new_body = []
+        for symbol in body:
+            if is_terminal[symbol]:
+                if symbol not in used:
+                    used[symbol] = new_variable(str(decoded[symbol].value) + "#CNF#")
+                symbol = used[symbol]
+            new_body.append(symbol)
+        result.append((head, tuple(new_body)))
+
+    for terminal, variable in used.items():
+        result.append((variable, (terminal,)))
+
+    return result
+
+
+def _decompose_productions(
+    productions: list, decoded: list, variables_names: set, new_variable
+) -> list:
+
+    """
+    Splits bodies longer than two into chains of productions
+    with new nonterminals, sharing common suffixes
+
+    Args:
+        productions: integer-encoded productions as pairs of head and body
+        decoded: symbols matched with their codes
+        variables_names: names of nonterminals that must not be reused
+        new_variable: function that gives code of nonterminal by its name
+
+    Returns:
+        Productions with bodies of length at most two
+    """
+
+    result = []
+    done = {}
+    counter = 0
+
+    for head, body in productions:
+        if len(body) <= 2:
+            result.append((head, body))
+            continue
+
+        for i in range(len(body) - 2):
+            suffix = body[i + 1 :]
+            if suffix in done:
+                result.append((head, (body[i], done[suffix])))
+                break
+
+            counter += 1
+            while "C#CNF#" + str(counter) in variables_names:
+                counter += 1
+            variable = new_variable("C#CNF#" + str(counter))
+
+            result.append((head, (body[i], variable)))
+            done[suffix] = variable
+            head = variable
+        else:
+            result.append((head, body[-2:]))
+
+    return result
+
+
 def read_contex_free_grammar_from_file(
     path_to_grammar: Path, starting_nonterminal: str = "S"
 ) -> CFG:
@@ -1,30 +1,23 @@
+from __future__ import annotations
+
 from collections import namedtuple
-from typing import Set, Tuple
-
-from cfpq_data import download, graph_from_csv, labeled_two_cycles_graph
-from networkx import MultiDiGraph, drawing
-from pyformlang.regular_expression import Regex
-from scipy.sparse import lil_array, lil_matrix
-
-from project.utils.automata_utils import (
-    gen_min_dfa_by_reg,
-    gen_nfa_by_graph,
-    intersect_of_automata_by_binary_matixes,
-)
-from project.utils.bin_matrix_utils import (
-    BinaryMatrix,
-    build_binary_matrix_by_nfa,
-    build_nfa_by_binary_matrix,
-    transitive_closure,
-    direct_sum,
-    init_front,
-    init_separeted_front,
-    sort_left_part_of_front,
-    intersect_of_automata_by_binary_matixes,
-)
+from itertools import islice
+from typing import TYPE_CHECKING, Set, Tuple
+
+from project.utils.stats_utils import finish_stats, start_stats
+
+if TYPE_CHECKING:
+    from networkx import MultiDiGraph
+    from pyformlang.regular_expression import Regex
+    from project.utils.bin_matrix_utils import BinaryMatrix
+    from project.utils.semiring_utils import Semiring
 
 Info = namedtuple("Info", ["num_of_nodes", "num_of_edges", "marks"])
 
+DIRECTIONS_OF_BFS = ("forward", "backward", "bidirectional")
+MIN_RATIO_FOR_BACKWARD_BFS = 4
+MIN_SOURCES_FOR_BIDIRECTIONAL_BFS = 32
+
 
 def get_graph(name: str) -> MultiDiGraph:
 
@@ -38,6 +31,8 @@ def get_graph(name: str) -> MultiDiGraph:
         Graph downloaded
     """
 
+    from cfpq_data import download, graph_from_csv
+
     graph_path = download(name)
     graph = graph_from_csv(graph_path)
 
@@ -73,12 +68,20 @@ def get_set_of_edges(graph: MultiDiGraph) -> Set[Tuple[any, any, any]]:
 
 
 def load_from_dot(path: str) -> MultiDiGraph:
-    rez = drawing.nx_pydot.read_dot(path)
 
-    if "\\n" in rez:
-        rez.remove_node("\\n")
+    """
+    Loads graph from DOT file, names of vertices and attributes are strings
+
+    Args:
+        path: path to DOT file
+
+    Returns:
+        Graph where attribute "key" of edges is key of edges
+    """
+
+    from project.utils.dot_utils import read_dot
 
-    return rez
+    return read_dot(path)
 
 
 def gen_labeled_two_cycles_graph(
@@ -94,10 +97,16 @@ def gen_labeled_two_cycles_graph(
         marks: Labels that will be used to mark the edges of the graph
 
     Returns:
-        A graph with two cycles connected by one node with labeled edges
+        A graph with two cycles connected by one node with labeled edges,
+        the same as labeled_two_cycles_graph of cfpq_data builds
     """
 
-    return labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, labels=marks)
+    from project.utils.edge_arrays_utils import graph_of_edge_arrays
+    from project.utils.generators_utils import gen_two_cycles_edge_arrays
+
+    return graph_of_edge_arrays(
+        gen_two_cycles_edge_arrays(fst_num_nodes, snd_num_nodes, marks)
+    )
 
 
 def save_as_dot(graph: MultiDiGraph, path: str):
@@ -106,15 +115,28 @@ def save_as_dot(graph: MultiDiGraph, path: str):
     Save graph in the DOT format into the path provided
 
     Args:
+        graph: graph to be saved
         path: path to be saved to
     """
 
-    drawing.nx_pydot.to_pydot(graph).write_raw(path)
+    from project.utils.dot_utils import write_dot
+
+    write_dot(graph, path)
 
 
 def regular_request(
-    graph: MultiDiGraph, starting_vertices: set, final_vertices: set, reg: Regex
-) -> set:
+    graph: MultiDiGraph,
+    starting_vertices: set,
+    final_vertices: set,
+    reg: Regex,
+    witness: bool = False,
+    max_length: int = None,
+    threads: int = None,
+    workers: int = None,
+    stats: bool = False,
+    memory_budget: int = None,
+    limit: int = None,
+) -> set | dict | tuple:
 
     """
     From given starting and finale vertices finds pairs that are connected by path satisfying regular expression in given graph
@@ -124,22 +146,326 @@ def regular_request(
         starting_vertices: set of starting vertices
         final_vertices: set of finale vertices
         reg: regular expresiion that paths must satisfy
+        witness: flag that represented whether shortest satisfying paths are required
+        max_length: maximal length of satisfying paths, unbounded if None
+        threads: count of threads for products of marks, serial if None
+        workers: count of processes for transitive closure, single process if None
+        stats: flag that represented whether QueryStats of phases are required
+        memory_budget: count of bytes for transitive closure, if it is given pairs
+            are found by iter_budgeted_regular_request, unbounded if None
+        limit: maximal count of pairs, if it is given pairs are searched by bfs
+            from each starting vertex instead of transitive closure and search
+            stops as soon as they are found, unbounded if None
+
+    Raises:
+        ValueError: if memory_budget or workers are given together with each other
+        or with witness, max_length or limit, or threads are given together with
+        witness or memory_budget, these searches do not use them
 
     Returns:
-        Set of pair of vertices that connected by satisfying path
+        Set of pair of vertices that connected by satisfying path xor dictionary
+        where such pairs matched with shortest satisfying paths if witness is required
+        or with lengths of shortest satisfying paths if max_length is given,
+        if stats are required result is paired with QueryStats
     """
 
+    from project.utils.automata_utils import (
+        gen_min_dfa_by_reg,
+        gen_nfa_by_graph,
+        marks_of_automaton,
+    )
+    from project.utils.bin_matrix_utils import (
+        bounded_transitive_closure,
+        build_binary_matrix_by_nfa,
+        intersect_of_automata_by_binary_matixes,
+        transitive_closure,
+    )
+    from project.utils.closure_utils import parallel_transitive_closure
+
+    if memory_budget is not None and workers is not None:
+        raise ValueError("memory_budget and workers can not be used together")
+    if (memory_budget is not None or workers is not None) and (
+        witness or max_length is not None or limit is not None
+    ):
+        raise ValueError(
+            "memory_budget and workers can not be used with witness, max_length or limit"
+        )
+    if threads is not None and (witness or memory_budget is not None):
+        raise ValueError("threads can not be used with witness or memory_budget")
+
+    query_stats = start_stats("regular_request", stats)
+
+    if memory_budget is not None:
+        with query_stats.phase("budgeted_closure"):
+            result = set(
+                iter_budgeted_regular_request(
+                    graph, starting_vertices, final_vertices, reg, memory_budget
+                )
+            )
+        return finish_stats(result, query_stats, stats)
+
+    if witness:
+        with query_stats.phase("witness_search"):
+            result = _witness_request(
+                graph, reg, starting_vertices, final_vertices, True, max_length, limit
+            )
+        return finish_stats(result, query_stats, stats)
+
+    if limit is not None:
+        with query_stats.phase("bfs"):
+            reached = islice(
+                iter_bfs_regular_request(
+                    graph,
+                    reg,
+                    starting_vertices,
+                    final_vertices,
+                    True,
+                    max_length,
+                    threads,
+                ),
+                limit,
+            )
+            result = set(reached) if max_length is None else dict(reached)
+        return finish_stats(result, query_stats, stats)
+
+    with query_stats.phase("gen_min_dfa_by_reg"):
+        dfa_of_regular_request = gen_min_dfa_by_reg(reg)
+    with query_stats.phase("build_binary_matrix_by_nfa"):
+        binary_matrix_of_regular_request = build_binary_matrix_by_nfa(
+            dfa_of_regular_request
+        )
+    with query_stats.phase("gen_nfa_by_graph"):
+        nfa_of_graph = gen_nfa_by_graph(
+            graph,
+            starting_vertices,
+            final_vertices,
+            marks_of_automaton(dfa_of_regular_request),
+        )
+    with query_stats.phase("build_binary_matrix_by_nfa"):
+        binary_matrix_of_graph = build_binary_matrix_by_nfa(nfa_of_graph)
+
+    with query_stats.phase("kronecker_product"):
+        intersect = intersect_of_automata_by_binary_matixes(
+            binary_matrix_of_graph, binary_matrix_of_regular_request, threads
+        )
+
+    with query_stats.phase("transitive_closure"):
+        if max_length is None and workers is None:
+            tran_closure = transitive_closure(
+                intersect,
+                lambda nnz: query_stats.record_iteration("transitive_closure", nnz),
+            )
+        elif max_length is None:
+            tran_closure = parallel_transitive_closure(intersect, workers)
+            query_stats.record_iteration("transitive_closure", tran_closure.nnz)
+        else:
+            tran_closure, distances = bounded_transitive_closure(
+                intersect,
+                max_length,
+                lambda nnz: query_stats.record_iteration("transitive_closure", nnz),
+            )
+
+    with query_stats.phase("result_extraction"):
+        result = set() if max_length is None else dict()
+        indexes = {i: st for st, i in binary_matrix_of_graph.indexes.items()}
+
+        lenght_of_reg_request_matrix = len(binary_matrix_of_regular_request.indexes)
+        for state_from, state_to in zip(*tran_closure.nonzero()):
+            if (
+                state_from in intersect.starting_states
+                and state_to in intersect.final_states
+            ):
+                pair = (
+                    indexes[state_from // lenght_of_reg_request_matrix],
+                    indexes[state_to // lenght_of_reg_request_matrix],
+                )
+                if max_length is None:
+                    result.add(pair)
+                else:
+                    distance = int(distances[state_from, state_to])
+                    result[pair] = min(result.get(pair, distance), distance)
+
+    return finish_stats(result, query_stats, stats)
+
+
+def iter_budgeted_regular_request(
+    graph: MultiDiGraph,
+    starting_vertices: set,
+    final_vertices: set,
+    reg: Regex,
+    memory_budget: int,
+):
+
+    """
+    Finds the same pairs as regular_request within memory budget. Rows of
+    product of graph and request are built by KroneckerProduct only for
+    blocks of starting states, closure is computed by iter_budgeted_closure
+    and pairs of each block are yielded before the next block is computed,
+    so neither product nor closure nor result is kept in memory
+
+    Args:
+        graph: graph to find paths
+        starting_vertices: set of starting vertices
+        final_vertices: set of finale vertices
+        reg: regular expresiion that paths must satisfy
+        memory_budget: count of bytes for pairs of closure
+
+    Returns:
+        Generator of pairs of vertices that connected by satisfying path,
+        each pair is yielded once because automaton of request is deterministic
+    """
+
+    from numpy import arange, isin, stack, unique
+    from project.utils.automata_utils import (
+        gen_min_dfa_by_reg,
+        gen_nfa_by_graph,
+        marks_of_automaton,
+    )
+    from project.utils.bin_matrix_utils import build_binary_matrix_by_nfa
+    from project.utils.closure_utils import KroneckerProduct, iter_budgeted_closure
+
+    dfa_of_regular_request = gen_min_dfa_by_reg(reg)
     binary_matrix_of_regular_request = build_binary_matrix_by_nfa(
-        gen_min_dfa_by_reg(reg)
+        dfa_of_regular_request
     )
     binary_matrix_of_graph = build_binary_matrix_by_nfa(
-        gen_nfa_by_graph(graph, starting_vertices, final_vertices)
+        gen_nfa_by_graph(
+            graph,
+            starting_vertices,
+            final_vertices,
+            marks_of_automaton(dfa_of_regular_request),
+        )
     )
 
-    intersect = intersect_of_automata_by_binary_matixes(
-        binary_matrix_of_graph, binary_matrix_of_regular_request
+    size_of_request = len(binary_matrix_of_regular_request.indexes)
+    states = {index: state for state, index in binary_matrix_of_graph.indexes.items()}
+    final_of_graph, final_of_request = (
+        isin(
+            arange(len(binary_matrix.indexes)),
+            [binary_matrix.indexes[state] for state in binary_matrix.final_states],
+        )
+        for binary_matrix in (binary_matrix_of_graph, binary_matrix_of_regular_request)
     )
+    rows = [
+        binary_matrix_of_graph.indexes[state_of_graph] * size_of_request
+        + binary_matrix_of_regular_request.indexes[state_of_request]
+        for state_of_graph in binary_matrix_of_graph.starting_states
+        for state_of_request in binary_matrix_of_regular_request.starting_states
+    ]
+
+    for rows_of_block, block in iter_budgeted_closure(
+        KroneckerProduct(binary_matrix_of_graph, binary_matrix_of_regular_request),
+        memory_budget,
+        rows,
+    ):
+        block_rows, columns = block.nonzero()
+        is_final = (
+            final_of_graph[columns // size_of_request]
+            & final_of_request[columns % size_of_request]
+        )
+        pairs = unique(
+            stack(
+                (
+                    rows_of_block[block_rows[is_final]] // size_of_request,
+                    columns[is_final] // size_of_request,
+                ),
+                axis=1,
+            ),
+            axis=0,
+        )
+        for index_from, index_to in pairs.tolist():
+            yield states[index_from], states[index_to]
+
+
+def decompose_graph(graph: MultiDiGraph) -> BinaryMatrix:
+
+    """
+    Builds decomposition of binary matrix of whole graph where all vertices
+    are starting and finale, so it can be reused by different requests
+
+    Args:
+        graph: graph to be decomposed
+
+    Returns:
+        BinaryMatrix of graph with matrixes in csr format
+    """
+
+    from project.utils.automata_utils import gen_nfa_by_graph
+    from project.utils.bin_matrix_utils import BinaryMatrix, build_binary_matrix_by_nfa
+
+    binary_matrix = build_binary_matrix_by_nfa(gen_nfa_by_graph(graph))
+
+    return BinaryMatrix(
+        binary_matrix.starting_states,
+        binary_matrix.final_states,
+        binary_matrix.indexes,
+        {mark: matrix.tocsr() for mark, matrix in binary_matrix.matrix.items()},
+    )
+
+
+def regular_request_by_binary_matrix(
+    binary_matrix_of_graph: BinaryMatrix,
+    starting_vertices: set,
+    final_vertices: set,
+    reg: Regex,
+) -> set:
 
+    """
+    Same as regular_request but works on prebuilt decomposition of graph,
+    vertices that are not in graph are ignored
+
+    Args:
+        binary_matrix_of_graph: decomposition of graph built by decompose_graph
+        starting_vertices: set of starting vertices, all vertices if empty or None
+        final_vertices: set of finale vertices, all vertices if empty or None
+        reg: regular expresiion that paths must satisfy
+
+    Returns:
+        Set of pair of vertices that connected by satisfying path
+    """
+
+    from project.utils.automata_utils import gen_min_dfa_by_reg
+    from project.utils.bin_matrix_utils import build_binary_matrix_by_nfa
+
+    return regular_request_by_binary_matrixes(
+        binary_matrix_of_graph,
+        build_binary_matrix_by_nfa(gen_min_dfa_by_reg(reg)),
+        starting_vertices,
+        final_vertices,
+    )
+
+
+def regular_request_by_binary_matrixes(
+    binary_matrix_of_graph: BinaryMatrix,
+    binary_matrix_of_regular_request: BinaryMatrix,
+    starting_vertices: set = None,
+    final_vertices: set = None,
+    threads: int = None,
+) -> set:
+
+    """
+    Finds pairs of vertices connected by path accepted by automaton
+    of regular request, both graph and request are prebuilt
+
+    Args:
+        binary_matrix_of_graph: decomposition of graph
+        binary_matrix_of_regular_request: decomposition of automaton of request
+        starting_vertices: set of starting vertices, all vertices if empty or None
+        final_vertices: set of finale vertices, all vertices if empty or None
+        threads: count of threads for products of marks, serial if None
+
+    Returns:
+        Set of pair of vertices that connected by satisfying path
+    """
+
+    from project.utils.bin_matrix_utils import (
+        intersect_of_automata_by_binary_matixes,
+        transitive_closure,
+    )
+
+    intersect = intersect_of_automata_by_binary_matixes(
+        binary_matrix_of_graph, binary_matrix_of_regular_request, threads
+    )
     tran_closure = transitive_closure(intersect)
 
     result = set()
@@ -151,14 +477,122 @@ def regular_request(
             state_from in intersect.starting_states
             and state_to in intersect.final_states
         ):
-            result.add(
-                (
+            vertex_from = indexes[state_from // lenght_of_reg_request_matrix]
+            vertex_to = indexes[state_to // lenght_of_reg_request_matrix]
+            if (not starting_vertices or vertex_from in starting_vertices) and (
+                not final_vertices or vertex_to in final_vertices
+            ):
+                result.add((vertex_from, vertex_to))
+
+    return result
+
+
+def semiring_regular_request(
+    graph: MultiDiGraph,
+    starting_vertices: set,
+    final_vertices: set,
+    reg: Regex,
+    semiring: Semiring,
+    max_length: int = None,
+    stats: bool = False,
+) -> dict | tuple:
+
+    """
+    From given starting and finale vertices finds pairs that are connected by path satisfying
+    regular expression in given graph and sums paths between them over semiring: lengths of
+    shortest paths over MIN_PLUS_SEMIRING or counts of paths up to cap over counting_semiring.
+    Parallel edges with the same label are taken as one edge
+
+    Args:
+        graph: graph to find paths
+        starting_vertices: set of starting vertices
+        final_vertices: set of finale vertices
+        reg: regular expresiion that paths must satisfy
+        semiring: semiring of values
+        max_length: maximal length of satisfying paths, unbounded if None
+        stats: flag that represented whether QueryStats of phases are required
+
+    Returns:
+        Dictionary where pairs of vertices that connected by satisfying path
+        matched with values over semiring, if stats are required
+        it is paired with QueryStats
+    """
+
+    from project.utils.automata_utils import (
+        gen_min_dfa_by_reg,
+        gen_nfa_by_graph,
+        marks_of_automaton,
+    )
+    from project.utils.bin_matrix_utils import (
+        build_binary_matrix_by_nfa,
+        semiring_intersect_of_binary_matixes,
+    )
+    from project.utils.semiring_utils import semiring_closure
+
+    query_stats = start_stats("semiring_regular_request", stats)
+
+    with query_stats.phase("gen_min_dfa_by_reg"):
+        dfa_of_regular_request = gen_min_dfa_by_reg(reg)
+    with query_stats.phase("build_binary_matrix_by_nfa"):
+        binary_matrix_of_regular_request = build_binary_matrix_by_nfa(
+            dfa_of_regular_request
+        )
+    with query_stats.phase("gen_nfa_by_graph"):
+        nfa_of_graph = gen_nfa_by_graph(
+            graph,
+            starting_vertices,
+            final_vertices,
+            marks_of_automaton(dfa_of_regular_request),
+        )
+    with query_stats.phase("build_binary_matrix_by_nfa"):
+        binary_matrix_of_graph = build_binary_matrix_by_nfa(nfa_of_graph)
+
+    with query_stats.phase("kronecker_product"):
+        adjacency = semiring_intersect_of_binary_matixes(
+            binary_matrix_of_graph, binary_matrix_of_regular_request, semiring
+        )
+    with query_stats.phase("transitive_closure"):
+        closure = semiring_closure(
+            adjacency,
+            semiring,
+            max_length,
+            lambda nnz: query_stats.record_iteration("transitive_closure", nnz),
+        ).tocoo()
+
+    with query_stats.phase("result_extraction"):
+        lenght_of_reg_request_matrix = len(binary_matrix_of_regular_request.indexes)
+        starting_states = {
+            binary_matrix_of_graph.indexes[state] * lenght_of_reg_request_matrix
+            + binary_matrix_of_regular_request.indexes[request_state]
+            for state in binary_matrix_of_graph.starting_states
+            for request_state in binary_matrix_of_regular_request.starting_states
+        }
+        final_states = {
+            binary_matrix_of_graph.indexes[state] * lenght_of_reg_request_matrix
+            + binary_matrix_of_regular_request.indexes[request_state]
+            for state in binary_matrix_of_graph.final_states
+            for request_state in binary_matrix_of_regular_request.final_states
+        }
+
+        result = dict()
+        indexes = {i: st for st, i in binary_matrix_of_graph.indexes.items()}
+
+        for state_from, state_to, value in zip(closure.row, closure.col, closure.data):
+            if state_from in starting_states and state_to in final_states:
+                pair = (
                     indexes[state_from // lenght_of_reg_request_matrix],
                     indexes[state_to // lenght_of_reg_request_matrix],
                 )
-            )
+                value = value.item()
+                result[pair] = (
+                    semiring.add(result[pair], value).item()
+                    if pair in result
+                    else value
+                )
+                if semiring.cap is not None:
+                    result[pair] = min(result[pair], semiring.cap)
 
-    return result
+    return finish_stats(result, query_stats, stats)
 
 
 def bfs_regular_request(
@@ -167,7 +601,13 @@ def bfs_regular_request(
     starting_vertices: set = None,
     final_vertices: set = None,
     separated_flag: bool = False,
-) -> set:
+    witness: bool = False,
+    max_length: int = None,
+    threads: int = None,
+    stats: bool = False,
+    direction: str = None,
+    limit: int = None,
+) -> set | dict | tuple:
 
     """
     From given final vertices finds ones that are reachable from given statring vertices by path
@@ -179,24 +619,494 @@ def bfs_regular_request(
         starting_vertices: set of starting vertices
         final_vertices: set of finale vertices
         separeted_flag: flag that represented what kind of result is required
+        witness: flag that represented whether shortest satisfying paths are required
+        max_length: maximal length of satisfying paths, search stops after
+        this count of front expansions, unbounded if None
+        threads: count of threads for marks, serial if None
+        stats: flag that represented whether QueryStats of phases are required
+        direction: "forward", "backward" or "bidirectional" direction of search,
+            it is chosen by sizes of sets of starting and finale vertices if None
+        limit: maximal count of results, search stops as soon as they are found,
+            unbounded if None
+
+    Raises:
+        ValueError: if threads or direction are given together with witness,
+        search of paths does not use them
 
     Returns:
-        Set of vertices that are reachable xor set of sets of vertices that are reachable
+        Set of vertices that are reachable xor set of sets of vertices that are reachable,
+        if witness is required they are matched with shortest satisfying paths in dictionary,
+        if max_length is given they are matched with lengths of shortest satisfying paths,
+        if stats are required result is paired with QueryStats
     """
 
-    binary_matrix_of_graph = build_binary_matrix_by_nfa(
-        gen_nfa_by_graph(graph, starting_vertices, final_vertices)
+    if witness and (threads is not None or direction is not None):
+        raise ValueError("threads and direction can not be used with witness")
+
+    query_stats = start_stats("bfs_regular_request", stats)
+
+    if witness:
+        with query_stats.phase("witness_search"):
+            result = _witness_request(
+                graph,
+                reg,
+                starting_vertices,
+                final_vertices,
+                separated_flag,
+                max_length,
+                limit,
+            )
+        return finish_stats(result, query_stats, stats)
+
+    binary_matrix_of_request, binary_matrix_of_graph = _binary_matrixes_of_bfs(
+        graph, reg, starting_vertices, final_vertices, query_stats
+    )
+
+    if direction is None:
+        direction = choose_direction_of_bfs(
+            len(binary_matrix_of_graph.starting_states),
+            len(binary_matrix_of_graph.final_states),
+            separated_flag,
+        )
+
+    with query_stats.phase("bfs"):
+        reached = bfs_by_direction(
+            binary_matrix_of_request,
+            binary_matrix_of_graph,
+            direction,
+            separated_flag,
+            max_length,
+            threads,
+            lambda nnz: query_stats.record_iteration("bfs", nnz),
+            streaming=limit is not None,
+        )
+        if limit is not None:
+            reached = islice(_first_reached(reached), limit)
+        reached = list(reached)
+
+    with query_stats.phase("result_extraction"):
+        result = set() if max_length is None else dict()
+
+        for key, distance in reached:
+            if max_length is None:
+                result.add(key)
+            else:
+                result[key] = min(result.get(key, distance), distance)
+
+    return finish_stats(result, query_stats, stats)
+
+
+def _binary_matrixes_of_bfs(
+    graph: MultiDiGraph,
+    reg: Regex,
+    starting_vertices: set,
+    final_vertices: set,
+    query_stats,
+) -> (BinaryMatrix, BinaryMatrix):
+
+    """
+    Builds decompositions of minimal automaton of request and graph for bfs
+    """
+
+    from project.utils.automata_utils import (
+        gen_min_dfa_by_reg,
+        gen_nfa_by_graph,
+        marks_of_automaton,
+    )
+    from project.utils.bin_matrix_utils import build_binary_matrix_by_nfa
+
+    with query_stats.phase("gen_min_dfa_by_reg"):
+        dfa_of_request = gen_min_dfa_by_reg(reg)
+    with query_stats.phase("gen_nfa_by_graph"):
+        nfa_of_graph = gen_nfa_by_graph(
+            graph,
+            starting_vertices,
+            final_vertices,
+            marks_of_automaton(dfa_of_request),
+        )
+    with query_stats.phase("build_binary_matrix_by_nfa"):
+        binary_matrix_of_graph = build_binary_matrix_by_nfa(nfa_of_graph)
+        binary_matrix_of_request = build_binary_matrix_by_nfa(dfa_of_request)
+
+    return binary_matrix_of_request, binary_matrix_of_graph
+
+
+def _first_reached(reached):
+
+    """
+    Skips keys that are already yielded, keys are reached in order of
+    lengths of paths, so the first distance of key is the shortest one
+    """
+
+    yielded = set()
+    for key, distance in reached:
+        if key not in yielded:
+            yielded.add(key)
+            yield key, distance
+
+
+def iter_bfs_regular_request(
+    graph: MultiDiGraph,
+    reg: Regex,
+    starting_vertices: set = None,
+    final_vertices: set = None,
+    separated_flag: bool = False,
+    max_length: int = None,
+    threads: int = None,
+    direction: str = None,
+):
+
+    """
+    Finds the same keys as bfs_regular_request, but yields each of them as soon
+    as front expansion reaches it, so search stops when consumer stops
+
+    Args:
+        graph: graph to find paths
+        reg: regular expresiion that paths must satisfy
+        starting_vertices: set of starting vertices
+        final_vertices: set of finale vertices
+        separeted_flag: flag that represented what kind of result is required
+        max_length: maximal length of satisfying paths, unbounded if None
+        threads: count of threads for marks, serial if None
+        direction: "forward", "backward" or "bidirectional" direction of search,
+            it is chosen by sizes of sets of starting and finale vertices if None
+
+    Returns:
+        Generator of reached vertices xor pairs of starting and reached vertices,
+        they are paired with lengths of shortest satisfying paths if max_length is given
+    """
+
+    binary_matrix_of_request, binary_matrix_of_graph = _binary_matrixes_of_bfs(
+        graph,
+        reg,
+        starting_vertices,
+        final_vertices,
+        start_stats("iter_bfs_regular_request", False),
+    )
+
+    if direction is None:
+        direction = choose_direction_of_bfs(
+            len(binary_matrix_of_graph.starting_states),
+            len(binary_matrix_of_graph.final_states),
+            separated_flag,
+        )
+
+    for key, distance in _first_reached(
+        bfs_by_direction(
+            binary_matrix_of_request,
+            binary_matrix_of_graph,
+            direction,
+            separated_flag,
+            max_length,
+            threads,
+            streaming=True,
+        )
+    ):
+        yield key if max_length is None else (key, distance)
+
+
+def exists(
+    graph: MultiDiGraph,
+    vertex_from,
+    vertex_to,
+    reg: Regex,
+    max_length: int = None,
+) -> bool:
+
+    """
+    Checks whether one vertex is connected with another by path satisfying
+    regular expression, search stops after the first expansion that reaches it
+
+    Args:
+        graph: graph to find paths
+        vertex_from: starting vertex
+        vertex_to: finale vertex
+        reg: regular expresiion that paths must satisfy
+        max_length: maximal length of satisfying paths, unbounded if None
+
+    Returns:
+        True if satisfying path exists xor False, that is also the case
+        if some of vertices is not in graph
+    """
+
+    if vertex_from not in graph or vertex_to not in graph:
+        return False
+
+    for _ in iter_bfs_regular_request(
+        graph, reg, {vertex_from}, {vertex_to}, max_length=max_length
+    ):
+        return True
+
+    return False
+
+
+def exists_by_binary_matrixes(
+    binary_matrix_of_graph: BinaryMatrix,
+    binary_matrix_of_request: BinaryMatrix,
+    vertex_from,
+    vertex_to,
+    max_length: int = None,
+    threads: int = None,
+) -> bool:
+
+    """
+    Checks whether one vertex is connected with another by path accepted by
+    automaton of request, both graph and request are prebuilt, so only bfs
+    is done and it stops after the first expansion that reaches the vertex
+
+    Args:
+        binary_matrix_of_graph: decomposition of graph
+        binary_matrix_of_request: decomposition of deterministic automaton of request
+        vertex_from: starting vertex
+        vertex_to: finale vertex
+        max_length: maximal length of satisfying paths, unbounded if None
+        threads: count of threads for fronts of marks, serial if None
+
+    Returns:
+        True if satisfying path exists xor False
+    """
+
+    from pyformlang.finite_automaton import State
+
+    vertex_from, vertex_to = State(vertex_from), State(vertex_to)
+    if (
+        vertex_from not in binary_matrix_of_graph.indexes
+        or vertex_to not in binary_matrix_of_graph.indexes
+    ):
+        return False
+
+    for _ in bfs_by_direction(
+        binary_matrix_of_request,
+        binary_matrix_of_graph._replace(
+            starting_states={vertex_from}, final_states={vertex_to}
+        ),
+        max_length=max_length,
+        threads=threads,
+        streaming=True,
+    ):
+        return True
+
+    return False
+
+
+def choose_direction_of_bfs(
+    count_of_starting_vertices: int,
+    count_of_final_vertices: int,
+    separated_flag: bool = False,
+) -> str:
+
+    """
+    Chooses direction of bfs by sizes of sets of starting and finale vertices.
+    Backward search runs separate front for each finale vertex, so without
+    separation it is chosen only if finale vertices are much fewer than
+    starting ones. Bidirectional search is chosen if both sets are large
+
+    Returns:
+        "forward", "backward" xor "bidirectional"
+    """
+
+    if separated_flag:
+        if (
+            min(count_of_starting_vertices, count_of_final_vertices)
+            >= MIN_SOURCES_FOR_BIDIRECTIONAL_BFS
+        ):
+            return "bidirectional"
+        if count_of_final_vertices < count_of_starting_vertices:
+            return "backward"
+    elif (
+        count_of_final_vertices * MIN_RATIO_FOR_BACKWARD_BFS
+        <= count_of_starting_vertices
+    ):
+        return "backward"
+
+    return "forward"
+
+
+def _reached_vertices(
+    binary_matrix_of_request: BinaryMatrix,
+    binary_matrix_of_graph: BinaryMatrix,
+    max_length: int = None,
+    threads: int = None,
+) -> set:
+
+    """
+    Finds vertices of graph that are starting or reachable from starting ones
+    by path that is prefix of word of request
+    """
+
+    reached = set(binary_matrix_of_graph.starting_states)
+    for _, vertex, _ in bfs_by_binary_matrixes(
+        binary_matrix_of_request._replace(
+            final_states=set(binary_matrix_of_request.indexes)
+        ),
+        binary_matrix_of_graph._replace(
+            final_states=set(binary_matrix_of_graph.indexes)
+        ),
+        max_length=max_length,
+        threads=threads,
+    ):
+        reached.add(vertex)
+
+    return reached
+
+
+def bfs_by_direction(
+    binary_matrix_of_request: BinaryMatrix,
+    binary_matrix_of_graph: BinaryMatrix,
+    direction: str = "forward",
+    separated_flag: bool = False,
+    max_length: int = None,
+    threads: int = None,
+    on_iteration=None,
+    streaming: bool = False,
+):
+
+    """
+    Runs bfs in given direction and yields keys of bfs_regular_request.
+    Backward search runs over reversed automata from each finale vertex
+    separately, bidirectional search at first removes vertices that are
+    not reachable from starting vertices or finale ones are not reachable
+    from them and then searches from the smaller set
+
+    Args:
+        binary_matrix_of_request: decomposition of deterministic automaton of request
+        binary_matrix_of_graph: decomposition of graph
+        direction: "forward", "backward" or "bidirectional"
+        separeted_flag: flag that represented whether starting vertices are separated
+        max_length: maximal length of paths, unbounded if None
+        threads: count of threads for fronts of marks, serial if None
+        on_iteration: function that is called with count of visited states
+        after each expansion
+        streaming: flag that represented whether keys are yielded after each
+        expansion as soon as they are reached
+
+    Returns:
+        Generator of pairs of reached vertex xor pair of starting and reached
+        vertices and length of shortest path if max_length is given xor None
+    """
+
+    from project.utils.bin_matrix_utils import (
+        restrict_binary_matrix_to_states,
+        reverse_binary_matrix,
+    )
+
+    if direction not in DIRECTIONS_OF_BFS:
+        raise ValueError(f"Unknown direction of bfs {direction}")
+
+    if direction == "bidirectional":
+        states = _reached_vertices(
+            binary_matrix_of_request, binary_matrix_of_graph, max_length, threads
+        ) & _reached_vertices(
+            reverse_binary_matrix(binary_matrix_of_request),
+            reverse_binary_matrix(binary_matrix_of_graph),
+            max_length,
+            threads,
+        )
+        binary_matrix_of_graph = restrict_binary_matrix_to_states(
+            binary_matrix_of_graph, states
+        )
+        direction = (
+            "backward"
+            if len(binary_matrix_of_graph.final_states)
+            < len(binary_matrix_of_graph.starting_states)
+            else "forward"
+        )
+
+    if direction == "forward":
+        request_final_states_indexes = {
+            binary_matrix_of_request.indexes[state]
+            for state in binary_matrix_of_request.final_states
+        }
+        for request_index, key, distance in bfs_by_binary_matrixes(
+            binary_matrix_of_request,
+            binary_matrix_of_graph,
+            separated_flag,
+            max_length,
+            threads,
+            on_iteration,
+            streaming=streaming,
+        ):
+            if request_index in request_final_states_indexes:
+                yield key, distance
+        return
+
+    reversed_request = reverse_binary_matrix(binary_matrix_of_request)
+    request_starting_states_indexes = {
+        binary_matrix_of_request.indexes[state]
+        for state in binary_matrix_of_request.starting_states
+    }
+    for request_index, (final_vertex, vertex), distance in bfs_by_binary_matrixes(
+        reversed_request,
+        reverse_binary_matrix(binary_matrix_of_graph),
+        True,
+        max_length,
+        threads,
+        on_iteration,
+        streaming=streaming,
+    ):
+        if request_index in request_starting_states_indexes:
+            yield (vertex, final_vertex) if separated_flag else final_vertex, distance
+
+
+def bfs_by_binary_matrixes(
+    binary_matrix_of_request: BinaryMatrix,
+    binary_matrix_of_graph: BinaryMatrix,
+    separated_flag: bool = False,
+    max_length: int = None,
+    threads: int = None,
+    on_iteration=None,
+    dense_threshold: float = None,
+    streaming: bool = False,
+):
+
+    """
+    Runs bfs over prebuilt decompositions of deterministic automaton of request
+    and graph and yields every visited pair of state of request and
+    finale vertex of graph
+
+    Args:
+        binary_matrix_of_request: decomposition of deterministic automaton of request
+        binary_matrix_of_graph: decomposition of graph
+        separeted_flag: flag that represented whether starting vertices are separated
+        max_length: maximal length of paths, unbounded if None
+        threads: count of threads for fronts of marks, serial if None,
+        with threads all marks multiply the same front and results are summed
+        on_iteration: function that is called with count of visited states
+        after each expansion
+        dense_threshold: density from which visited states are dense array,
+        DENSITY_OF_DENSE_MATRIXES if None
+        streaming: flag that represented whether newly visited pairs are yielded
+        after each expansion, so search goes on only while they are consumed,
+        otherwise all pairs are yielded after the search
+
+    Returns:
+        Generator of triples of index of state of request, reached vertex
+        xor pair of starting and reached vertices and length of shortest path
+        if max_length is given xor None
+    """
+
+    from numpy import int32, ndarray
+    from scipy.sparse import csr_matrix, lil_array, lil_matrix
+    from project.utils.bin_matrix_utils import (
+        adapt_format,
+        count_of_nonzero,
+        direct_sum,
+        init_front,
+        init_separeted_front,
+        map_by_marks,
+        multiply_front,
+        sort_left_part_of_front,
+        unite_fronts,
     )
-    binary_matrix_of_request = build_binary_matrix_by_nfa(gen_min_dfa_by_reg(reg))
 
     size_of_graph = len(binary_matrix_of_graph.indexes)
     size_of_request = len(binary_matrix_of_request.indexes)
 
     if not size_of_graph:
-        return set()
+        return
 
     direct_sum_of_matrixes = direct_sum(
-        binary_matrix_of_request, binary_matrix_of_graph
+        binary_matrix_of_request, binary_matrix_of_graph, threads
     )
     indexes_of_graph_starting_states = []
 
@@ -225,46 +1135,199 @@ def bfs_regular_request(
             ),
         )
 
-    visited_states = lil_matrix(front.shape)
+    graph_indexes = {
+        index: state for state, index in binary_matrix_of_graph.indexes.items()
+    }
+    graph_final_states_indexes = {
+        index
+        for state, index in binary_matrix_of_graph.indexes.items()
+        if state in binary_matrix_of_graph.final_states
+    }
+
+    def reached_pairs(states):
+        for i, j in zip(*states.nonzero()):
+            if j >= size_of_request:
+                graph_index = j - size_of_request
+                if graph_index in graph_final_states_indexes:
+                    key = (
+                        graph_indexes[graph_index]
+                        if not separated_flag
+                        else (
+                            indexes_of_graph_starting_states[i // size_of_request],
+                            graph_indexes[graph_index],
+                        )
+                    )
+                    yield (
+                        i % size_of_request,
+                        key,
+                        None if max_length is None else int(distances_of_states[i, j]),
+                    )
+
+    visited_states = csr_matrix(front.shape, dtype=bool)
+    distances_of_states = lil_matrix(front.shape, dtype=int32)
+    count_of_expansions = 0
 
-    while True:
+    while max_length is None or count_of_expansions < max_length:
+        count_of_expansions += 1
+        visited_states = adapt_format(visited_states, dense_threshold)
         tmp_visited_states = visited_states.copy()
 
-        for matrix in direct_sum_of_matrixes.values():
-            new_front = visited_states @ matrix if front is None else front @ matrix
-            visited_states += sort_left_part_of_front(size_of_request, new_front)
+        if threads is not None and threads > 1:
+            source = front if front is not None else tmp_visited_states
+            for new_front in map_by_marks(
+                lambda mark: sort_left_part_of_front(
+                    size_of_request,
+                    multiply_front(source, direct_sum_of_matrixes[mark]),
+                ),
+                direct_sum_of_matrixes.keys(),
+                threads,
+            ).values():
+                visited_states = unite_fronts(visited_states, new_front)
+        else:
+            for matrix in direct_sum_of_matrixes.values():
+                if front is not None:
+                    new_front = multiply_front(front, matrix)
+                elif max_length is None:
+                    new_front = multiply_front(visited_states, matrix)
+                else:
+                    new_front = multiply_front(tmp_visited_states, matrix)
+                visited_states = unite_fronts(
+                    visited_states, sort_left_part_of_front(size_of_request, new_front)
+                )
 
         front = None
 
-        if visited_states.nnz == tmp_visited_states.nnz:
+        if max_length is not None:
+            if isinstance(visited_states, ndarray):
+                if not isinstance(distances_of_states, ndarray):
+                    distances_of_states = distances_of_states.toarray()
+                distances_of_states[
+                    visited_states & ~tmp_visited_states
+                ] = count_of_expansions
+            else:
+                distances_of_states += (
+                    csr_matrix(visited_states, dtype=bool)
+                    > csr_matrix(tmp_visited_states, dtype=bool)
+                ).astype(int32) * count_of_expansions
+
+        count_of_visited_states = count_of_nonzero(visited_states)
+        if on_iteration is not None:
+            on_iteration(count_of_visited_states)
+
+        if count_of_visited_states == count_of_nonzero(tmp_visited_states):
             break
 
-    result = set()
+        if streaming:
+            if isinstance(visited_states, ndarray):
+                yield from reached_pairs(visited_states & ~tmp_visited_states)
+            else:
+                yield from reached_pairs(
+                    csr_matrix(visited_states, dtype=bool)
+                    > csr_matrix(tmp_visited_states, dtype=bool)
+                )
+
+    if not streaming:
+        yield from reached_pairs(visited_states)
+
+
+def _witness_request(
+    graph: MultiDiGraph,
+    reg: Regex,
+    starting_vertices: set,
+    final_vertices: set,
+    separated_flag: bool,
+    max_length: int = None,
+    limit: int = None,
+) -> dict:
+
+    """
+    Finds shortest paths satisfying regular expression by breadth-first search
+    over intersection of graph and regular expression that records parents
+
+    Args:
+        graph: graph to find paths
+        reg: regular expresiion that paths must satisfy
+        starting_vertices: set of starting vertices
+        final_vertices: set of finale vertices
+        separeted_flag: flag that represented whether paths are searched
+        from each starting vertex separetely
+        max_length: maximal length of paths, unbounded if None
+        limit: maximal count of keys, search from next starting vertices
+        stops as soon as they are found, unbounded if None
+
+    Returns:
+        Dictionary where pairs of vertices xor final vertices are matched with
+        shortest satisfying paths represented as lists of labeled edges
+    """
+
+    from numpy import array
+    from project.utils.automata_utils import (
+        gen_min_dfa_by_reg,
+        gen_nfa_by_graph,
+        marks_of_automaton,
+    )
+    from project.utils.bin_matrix_utils import (
+        bfs_with_witness,
+        build_binary_matrix_by_nfa,
+        intersect_of_automata_by_binary_matixes,
+        restore_path,
+    )
+
+    if limit is not None and limit <= 0:
+        return {}
+
+    dfa_of_request = gen_min_dfa_by_reg(reg)
+    binary_matrix_of_request = build_binary_matrix_by_nfa(dfa_of_request)
+    binary_matrix_of_graph = build_binary_matrix_by_nfa(
+        gen_nfa_by_graph(
+            graph,
+            starting_vertices,
+            final_vertices,
+            marks_of_automaton(dfa_of_request),
+        )
+    )
+
+    intersect = intersect_of_automata_by_binary_matixes(
+        binary_matrix_of_graph, binary_matrix_of_request
+    )
+
+    size_of_request = len(binary_matrix_of_request.indexes)
     graph_indexes = {
-        index: state for state, index in binary_matrix_of_graph.indexes.items()
-    }
-    request_final_states_indexes = {
-        index
-        for state, index in binary_matrix_of_request.indexes.items()
-        if state in binary_matrix_of_request.final_states
-    }
-    graph_final_states_indexes = {
-        index
-        for state, index in binary_matrix_of_graph.indexes.items()
-        if state in binary_matrix_of_graph.final_states
+        index: state.value for state, index in binary_matrix_of_graph.indexes.items()
     }
 
-    for i, j in zip(*visited_states.nonzero()):
-        if j >= size_of_request and i % size_of_request in request_final_states_indexes:
-            graph_index = j - size_of_request
-            if graph_index in graph_final_states_indexes:
-                result.add(
-                    graph_indexes[graph_index]
-                    if not separated_flag
-                    else (
-                        indexes_of_graph_starting_states[i // size_of_request],
-                        graph_indexes[graph_index],
+    sources = {}
+    for index in intersect.starting_states:
+        vertex = graph_indexes[index // size_of_request] if separated_flag else None
+        sources.setdefault(vertex, []).append(index)
+
+    result = {}
+    for vertex, starting_indexes in sources.items():
+        witness = bfs_with_witness(
+            intersect, array(starting_indexes), max_length=max_length
+        )
+
+        for index in intersect.final_states:
+            distance = witness.distances[index]
+            if distance <= 0:
+                continue
+
+            final_vertex = graph_indexes[index // size_of_request]
+            key = (vertex, final_vertex) if separated_flag else final_vertex
+
+            if key not in result and limit is not None and len(result) >= limit:
+                continue
+            if key not in result or len(result[key]) > distance:
+                result[key] = [
+                    (
+                        graph_indexes[state_from // size_of_request],
+                        mark.value,
+                        graph_indexes[state_to // size_of_request],
                     )
-                )
+                    for state_from, mark, state_to in restore_path(witness, index)
+                ]
+
+        if limit is not None and len(result) >= limit:
+            break
 
     return result
@@ -0,0 +1,453 @@
+from numpy import ones
+from pyformlang.finite_automaton import State, Symbol
+from pyformlang.regular_expression import Regex
+from scipy.sparse import csr_matrix
+
+from project.utils.bin_matrix_utils import BinaryMatrix
+
+SPECIAL_SYMBOLS_OF_REGEX = {
+    ".": "concatenation",
+    "|": "union",
+    "+": "union",
+    "*": "star",
+    "$": "epsilon",
+    "(": "(",
+    ")": ")",
+}
+PRIORITIES_OF_OPERATORS = {"union": 1, "concatenation": 2}
+
+
+class RegexExepction(Exception):
+    def __init__(self, msg: str):
+        self.message = msg
+
+
+def tokenize_regex(text: str) -> list:
+
+    """
+    Splits text of regular expression into tokens the same way as pyformlang:
+    symbols are separated by spaces and special symbols, escaped special symbols
+    are parts of symbols and leading backslash of symbol is removed
+
+    Args:
+        text: text of regular expression
+
+    Returns:
+        List of pairs of kind of token and value of symbol xor None
+    """
+
+    tokens = []
+    word = []
+
+    def flush():
+        if word:
+            value = "".join(word)
+            if value == "epsilon":
+                tokens.append(("epsilon", None))
+            else:
+                tokens.append(("symbol", value[1:] if value[0] == "\\" else value))
+            word.clear()
+
+    escaped = False
+    for char in text:
+        if escaped:
+            word.append(char)
+            escaped = False
+        elif char == "\\":
+            word.append(char)
+            escaped = True
+        elif char.isspace():
+            flush()
+        elif char in SPECIAL_SYMBOLS_OF_REGEX:
+            flush()
+            tokens.append((SPECIAL_SYMBOLS_OF_REGEX[char], None))
+        else:
+            word.append(char)
+    flush()
+
+    return tokens
+
+
+def parse_regex(text: str) -> list:
+
+    """
+    Parses text of regular expression into postfix notation without recursion,
+    so unions of thousands of alternatives are parsed. Star binds stronger
+    than concatenation, concatenation binds stronger than union
+
+    Args:
+        text: text of regular expression
+
+    Returns:
+        List of pairs of kind of node and value of symbol xor None in postfix order,
+        empty regular expression is represented by single "empty" node
+    """
+
+    tokens = tokenize_regex(text)
+    if not tokens:
+        return [("empty", None)]
+
+    with_concatenations = []
+    for kind, value in tokens:
+        if (
+            with_concatenations
+            and with_concatenations[-1][0] in ("symbol", "epsilon", "star", ")")
+            and kind in ("symbol", "epsilon", "(")
+        ):
+            with_concatenations.append(("concatenation", None))
+        with_concatenations.append((kind, value))
+
+    postfix = []
+    operators = []
+    count_of_operands = 0
+
+    for kind, value in with_concatenations:
+        if kind in ("symbol", "epsilon"):
+            postfix.append((kind, value))
+            count_of_operands += 1
+        elif kind == "star":
+            if not count_of_operands:
+                raise RegexExepction(f"Star without operand in {text}")
+            postfix.append((kind, None))
+        elif kind == "(":
+            operators.append(kind)
+        elif kind == ")":
+            while operators and operators[-1] != "(":
+                postfix.append((operators.pop(), None))
+                count_of_operands -= 1
+            if not operators:
+                raise RegexExepction(f"Wrong parenthesis in {text}")
+            operators.pop()
+        else:
+            while (
+                operators
+                and operators[-1] != "("
+                and PRIORITIES_OF_OPERATORS[operators[-1]]
+                >= PRIORITIES_OF_OPERATORS[kind]
+            ):
+                postfix.append((operators.pop(), None))
+                count_of_operands -= 1
+            operators.append(kind)
+
+    while operators:
+        operator = operators.pop()
+        if operator == "(":
+            raise RegexExepction(f"Wrong parenthesis in {text}")
+        postfix.append((operator, None))
+        count_of_operands -= 1
+
+    if count_of_operands != 1:
+        raise RegexExepction(f"Regex is misformed: {text}")
+
+    return postfix
+
+
+def postfix_of_regex(reg: Regex) -> list:
+
+    """
+    Converts tree of regular expression of pyformlang into postfix notation
+    without recursion
+
+    Args:
+        reg: regular expression
+
+    Returns:
+        List of pairs of kind of node and value of symbol xor None in postfix order
+    """
+
+    kinds = {
+        "Symbol": "symbol",
+        "Epsilon": "epsilon",
+        "Empty": "empty",
+        "Concatenation": "concatenation",
+        "Union": "union",
+        "KleeneStar": "star",
+    }
+
+    postfix = []
+    stack = [(reg, False)]
+
+    while stack:
+        node, is_visited = stack.pop()
+        kind = kinds[type(node.head).__name__]
+        if kind in ("symbol", "epsilon", "empty"):
+            postfix.append((kind, node.head.value if kind == "symbol" else None))
+        elif is_visited:
+            postfix.append((kind, None))
+        else:
+            stack.append((node, True))
+            stack.extend((son, False) for son in reversed(node.sons))
+
+    return postfix
+
+
+def glushkov_automaton(postfix: list) -> (list, list, set, bool):
+
+    """
+    Builds Glushkov automaton of regular expression: its states are initial
+    state 0 and positions of symbols, transitions lead to positions
+    that can follow and have no epsilon transitions
+
+    Args:
+        postfix: regular expression in postfix notation
+
+    Returns:
+        Symbols of positions starting from 1, sets of positions that can follow
+        each position where position 0 is initial state, set of last positions
+        and flag that represented whether empty word is accepted
+    """
+
+    symbols = [None]
+    follow = [set()]
+    stack = []
+
+    for kind, value in postfix:
+        if kind == "symbol":
+            position = len(symbols)
+            symbols.append(value)
+            follow.append(set())
+            stack.append((False, {position}, {position}))
+        elif kind == "epsilon":
+            stack.append((True, set(), set()))
+        elif kind == "empty":
+            stack.append((False, set(), set()))
+        elif kind == "star":
+            nullable, first, last = stack.pop()
+            for position in last:
+                follow[position] |= first
+            stack.append((True, first, last))
+        else:
+            right_nullable, right_first, right_last = stack.pop()
+            left_nullable, left_first, left_last = stack.pop()
+            if kind == "union":
+                stack.append(
+                    (
+                        left_nullable or right_nullable,
+                        left_first | right_first,
+                        left_last | right_last,
+                    )
+                )
+            else:
+                for position in left_last:
+                    follow[position] |= right_first
+                stack.append(
+                    (
+                        left_nullable and right_nullable,
+                        left_first | right_first if left_nullable else left_first,
+                        left_last | right_last if right_nullable else right_last,
+                    )
+                )
+
+    nullable, first, last = stack.pop()
+    follow[0] = first
+
+    return symbols, follow, last, nullable
+
+
+def determinize_glushkov_automaton(
+    symbols: list, follow: list, last: set, nullable: bool
+) -> (list, list):
+
+    """
+    Determinizes Glushkov automaton by subset construction, only states
+    from which some finale state is reachable are kept
+
+    Returns:
+        List of transitions of states as dictionaries from symbols to states
+        and list of flags that represented whether states are finale,
+        initial state is 0 and it is the only state if language is empty
+    """
+
+    moves = []
+    for positions in follow:
+        by_symbols = {}
+        for position in positions:
+            by_symbols.setdefault(symbols[position], set()).add(position)
+        moves.append(by_symbols)
+
+    starting_state = frozenset([0])
+    states = {starting_state: 0}
+    worklist = [starting_state]
+    delta = [{}]
+
+    while worklist:
+        state = worklist.pop()
+        next_states = {}
+        for position in state:
+            for symbol, positions in moves[position].items():
+                next_states.setdefault(symbol, set()).update(positions)
+        for symbol, positions in next_states.items():
+            next_state = frozenset(positions)
+            if next_state not in states:
+                states[next_state] = len(states)
+                delta.append({})
+                worklist.append(next_state)
+            delta[states[state]][symbol] = states[next_state]
+
+    finals = [False] * len(states)
+    for state, index in states.items():
+        finals[index] = bool(state & last) or (nullable and 0 in state)
+
+    return _trim(delta, finals)
+
+
+def _trim(delta: list, finals: list) -> (list, list):
+
+    """
+    Removes states from which no finale state is reachable and renumbers
+    others keeping initial state 0, which is kept anyway
+    """
+
+    reversed_delta = [[] for _ in delta]
+    for state, transitions in enumerate(delta):
+        for next_state in transitions.values():
+            reversed_delta[next_state].append(state)
+
+    useful = [False] * len(delta)
+    worklist = [state for state, is_final in enumerate(finals) if is_final]
+    for state in worklist:
+        useful[state] = True
+    while worklist:
+        for previous_state in reversed_delta[worklist.pop()]:
+            if not useful[previous_state]:
+                useful[previous_state] = True
+                worklist.append(previous_state)
+
+    if not useful[0]:
+        return [{}], [False]
+
+    numbers = {}
+    for state in range(len(delta)):
+        if useful[state]:
+            numbers[state] = len(numbers)
+
+    return (
+        [
+            {
+                symbol: numbers[next_state]
+                for symbol, next_state in transitions.items()
+                if useful[next_state]
+            }
+            for state, transitions in enumerate(delta)
+            if useful[state]
+        ],
+        [is_final for state, is_final in enumerate(finals) if useful[state]],
+    )
+
+
+def refine_partition(delta: list, tags: list, marks: list) -> list:
+
+    """
+    Merges equivalent states of deterministic automaton, states are
+    equivalent if they have the same tags and equivalent transitions
+
+    Args:
+        delta: transitions of states as dictionaries from marks to states
+        tags: tags of states
+        marks: marks of automaton
+
+    Returns:
+        List where states matched with numbers of their blocks
+    """
+
+    numbers_of_tags = {}
+    blocks = [numbers_of_tags.setdefault(tag, len(numbers_of_tags)) for tag in tags]
+    count_of_blocks = len(numbers_of_tags)
+
+    while True:
+        signatures = {}
+        new_blocks = [
+            signatures.setdefault(
+                (
+                    blocks[state],
+                    tuple(
+                        blocks[delta[state][mark]] if mark in delta[state] else -1
+                        for mark in marks
+                    ),
+                ),
+                len(signatures),
+            )
+            for state in range(len(blocks))
+        ]
+        if len(signatures) == count_of_blocks:
+            return new_blocks
+        blocks, count_of_blocks = new_blocks, len(signatures)
+
+
+def build_binary_matrix_by_reg(reg: str | Regex, minimize: bool = True) -> BinaryMatrix:
+
+    """
+    Builds binary matrix of deterministic automaton of regular expression
+    directly: Glushkov automaton without epsilon transitions is determinized
+    by subset construction and optionally minimized by refinement of partition.
+    Texts are parsed without pyformlang, so huge regular expressions are supported
+
+    Args:
+        reg: text of regular expression or regular expression
+        minimize: flag that represented whether automaton must be minimal
+
+    Returns:
+        Binary matrix of deterministic automaton where states are State
+        of their indexes and initial state has index 0, matrixes are
+        in csr format
+    """
+
+    return build_binary_matrix_by_postfix(
+        postfix_of_regex(reg) if isinstance(reg, Regex) else parse_regex(reg),
+        minimize,
+    )
+
+
+def build_binary_matrix_by_postfix(
+    postfix: list, minimize: bool = True
+) -> BinaryMatrix:
+
+    """
+    Builds binary matrix of deterministic automaton of regular expression
+    given in postfix notation, the same way as build_binary_matrix_by_reg
+
+    Args:
+        postfix: regular expression in postfix notation
+        minimize: flag that represented whether automaton must be minimal
+
+    Returns:
+        Binary matrix of deterministic automaton where states are State
+        of their indexes and initial state has index 0
+    """
+
+    delta, finals = determinize_glushkov_automaton(*glushkov_automaton(postfix))
+
+    if minimize:
+        marks = sorted({symbol for transitions in delta for symbol in transitions})
+        blocks = refine_partition(delta, finals, marks)
+        minimal_delta = [None] * (max(blocks) + 1)
+        minimal_finals = [False] * len(minimal_delta)
+        for state, block in enumerate(blocks):
+            minimal_finals[block] = finals[state]
+            if minimal_delta[block] is None:
+                minimal_delta[block] = {
+                    symbol: blocks[next_state]
+                    for symbol, next_state in delta[state].items()
+                }
+        delta, finals = minimal_delta, minimal_finals
+
+    count_of_states = len(delta)
+    edges = {}
+    for state, transitions in enumerate(delta):
+        for symbol, next_state in transitions.items():
+            edges.setdefault(symbol, ([], []))
+            edges[symbol][0].append(state)
+            edges[symbol][1].append(next_state)
+
+    return BinaryMatrix(
+        {State(0)},
+        {State(state) for state in range(count_of_states) if finals[state]},
+        {State(state): state for state in range(count_of_states)},
+        {
+            Symbol(symbol): csr_matrix(
+                (ones(len(rows), dtype=bool), (rows, columns)),
+                shape=(count_of_states, count_of_states),
+            )
+            for symbol, (rows, columns) in edges.items()
+        },
+    )
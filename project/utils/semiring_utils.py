@@ -0,0 +1,420 @@
+from collections import namedtuple
+
+from numpy import (
+    add,
+    arange,
+    bincount,
+    bool_,
+    concatenate,
+    cumsum,
+    diff,
+    full,
+    int64,
+    lexsort,
+    logical_and,
+    logical_or,
+    minimum,
+    multiply,
+    ndarray,
+    nonzero,
+    repeat,
+    tile,
+    zeros,
+)
+from scipy.sparse import csr_matrix, identity
+
+Semiring = namedtuple(
+    "Semiring",
+    ["name", "add", "multiply", "one", "edge_value", "dtype", "cap", "idempotent"],
+)
+
+BOOLEAN_SEMIRING = Semiring(
+    "boolean", logical_or, logical_and, True, True, bool_, None, True
+)
+MIN_PLUS_SEMIRING = Semiring("min_plus", minimum, add, 0, 1, int64, None, True)
+
+
+def counting_semiring(cap: int) -> Semiring:
+
+    """
+    Creates semiring that counts paths, counts greater than cap are cut to cap
+
+    Args:
+        cap: maximal count of paths that is distinguished
+
+    Returns:
+        Semiring of bounded counting
+    """
+
+    return Semiring("counting", add, multiply, 1, 1, int64, cap, False)
+
+
+def _cut(values, semiring: Semiring):
+
+    """
+    Cuts values to cap of semiring if it has one
+    """
+
+    return values if semiring.cap is None else minimum(values, semiring.cap)
+
+
+def lift_to_semiring(matrix, semiring: Semiring, value=None) -> csr_matrix:
+
+    """
+    Converts boolean matrix to matrix over semiring
+    where each edge has weight of single edge
+
+    Args:
+        matrix: boolean sparse matrix
+        semiring: semiring to convert to
+        value: weight of each edge, edge_value of semiring if None
+
+    Returns:
+        Matrix over semiring in csr format
+    """
+
+    matrix = csr_matrix(matrix, dtype=bool)
+    matrix.sum_duplicates()
+    matrix.eliminate_zeros()
+
+    if value is None:
+        value = semiring.edge_value
+
+    return csr_matrix(
+        (
+            full(matrix.nnz, value, dtype=semiring.dtype),
+            matrix.indices.copy(),
+            matrix.indptr.copy(),
+        ),
+        shape=matrix.shape,
+    )
+
+
+def _reduce_duplicates(
+    rows, columns, values, shape: tuple, semiring: Semiring
+) -> csr_matrix:
+
+    """
+    Builds csr matrix from coordinates, duplicated entries are reduced
+    by addition of semiring, explicit values are kept as they are
+
+    Args:
+        rows: rows of entries
+        columns: columns of entries
+        values: values of entries
+        shape: shape of matrix
+        semiring: semiring of values
+
+    Returns:
+        Matrix over semiring in csr format
+    """
+
+    if not len(values):
+        return csr_matrix(shape, dtype=semiring.dtype)
+
+    order = lexsort((columns, rows))
+    rows, columns, values = rows[order], columns[order], values[order]
+
+    starts = concatenate(
+        ([0], nonzero((diff(rows) != 0) | (diff(columns) != 0))[0] + 1)
+    )
+    values = _cut(semiring.add.reduceat(values, starts), semiring)
+    rows, columns = rows[starts], columns[starts]
+
+    indptr = zeros(shape[0] + 1, dtype=int64)
+    indptr[1:] = cumsum(bincount(rows, minlength=shape[0]))
+
+    return csr_matrix((values.astype(semiring.dtype), columns, indptr), shape=shape)
+
+
+def semiring_matmul(
+    left_matrix: csr_matrix, right_matrix: csr_matrix, semiring: Semiring
+) -> csr_matrix:
+
+    """
+    Multiplies sparse matrixes over semiring by expanding all products
+    of entries, sorting them by position and reducing them by addition
+
+    Args:
+        left_matrix: left matrix over semiring
+        right_matrix: right matrix over semiring
+        semiring: semiring of values
+
+    Returns:
+        Product of matrixes over semiring in csr format
+    """
+
+    left_matrix = csr_matrix(left_matrix)
+    right_matrix = csr_matrix(right_matrix)
+    shape = (left_matrix.shape[0], right_matrix.shape[1])
+
+    left_rows = repeat(arange(left_matrix.shape[0]), diff(left_matrix.indptr))
+    lengths = diff(right_matrix.indptr)[left_matrix.indices]
+
+    rows = repeat(left_rows, lengths)
+    left_values = repeat(left_matrix.data, lengths)
+
+    offsets = arange(lengths.sum()) - repeat(cumsum(lengths) - lengths, lengths)
+    positions = repeat(right_matrix.indptr[left_matrix.indices], lengths) + offsets
+
+    values = _cut(
+        semiring.multiply(left_values, right_matrix.data[positions]), semiring
+    )
+
+    return _reduce_duplicates(
+        rows, right_matrix.indices[positions], values, shape, semiring
+    )
+
+
+def boolean_matmul(left_matrix, right_matrix) -> csr_matrix:
+
+    """
+    Multiplies sparse matrixes over boolean semiring. Matrixes are multiplied
+    in bool dtype, where compiled product of scipy adds by disjunction, so values
+    do not grow and result has no explicit zeros, its nnz is count of pairs
+
+    Args:
+        left_matrix: left sparse matrix
+        right_matrix: right sparse matrix
+
+    Returns:
+        Boolean product of matrixes in csr format
+    """
+
+    return csr_matrix(left_matrix, dtype=bool) @ csr_matrix(right_matrix, dtype=bool)
+
+
+def masked_boolean_matmul(left_matrix, right_matrix, mask) -> csr_matrix:
+
+    """
+    Multiplies sparse matrixes over boolean semiring and keeps only pairs
+    that are not in mask, so fixpoint loops get new pairs at once. Pairs are
+    looked up in dense mask by indices of product and sparse mask is dropped
+    by compiled comparison of boolean matrixes, which merges their rows
+
+    Args:
+        left_matrix: left sparse matrix
+        right_matrix: right sparse matrix
+        mask: sparse matrix xor dense boolean array of pairs to be dropped
+
+    Returns:
+        Boolean product of matrixes without pairs of mask in csr format
+    """
+
+    product = boolean_matmul(left_matrix, right_matrix)
+
+    if not isinstance(mask, ndarray):
+        return product > csr_matrix(mask, dtype=bool)
+
+    rows = repeat(arange(product.shape[0]), diff(product.indptr))
+    is_new = ~mask[rows, product.indices]
+
+    indptr = zeros(product.shape[0] + 1, dtype=int64)
+    indptr[1:] = cumsum(bincount(rows[is_new], minlength=product.shape[0]))
+
+    return csr_matrix(
+        (product.data[is_new], product.indices[is_new], indptr), shape=product.shape
+    )
+
+
+def semiring_add(
+    left_matrix: csr_matrix, right_matrix: csr_matrix, semiring: Semiring
+) -> csr_matrix:
+
+    """
+    Adds sparse matrixes over semiring elementwise
+
+    Args:
+        left_matrix: left matrix over semiring
+        right_matrix: right matrix over semiring
+        semiring: semiring of values
+
+    Returns:
+        Sum of matrixes over semiring in csr format
+    """
+
+    left_matrix = left_matrix.tocoo()
+    right_matrix = right_matrix.tocoo()
+
+    return _reduce_duplicates(
+        concatenate((left_matrix.row, right_matrix.row)),
+        concatenate((left_matrix.col, right_matrix.col)),
+        concatenate((left_matrix.data, right_matrix.data)),
+        left_matrix.shape,
+        semiring,
+    )
+
+
+def semiring_kron(
+    left_matrix: csr_matrix, right_matrix: csr_matrix, semiring: Semiring
+) -> csr_matrix:
+
+    """
+    Kronecker product of sparse matrixes over semiring
+
+    Args:
+        left_matrix: left matrix over semiring
+        right_matrix: right matrix over semiring
+        semiring: semiring of values
+
+    Returns:
+        Kronecker product of matrixes over semiring in csr format
+    """
+
+    left_matrix = left_matrix.tocoo()
+    right_matrix = right_matrix.tocoo()
+    count_of_right_entries = right_matrix.nnz
+
+    rows = (
+        repeat(left_matrix.row.astype(int64), count_of_right_entries)
+        * right_matrix.shape[0]
+    ) + tile(right_matrix.row, left_matrix.nnz).astype(int64)
+    columns = (
+        repeat(left_matrix.col.astype(int64), count_of_right_entries)
+        * right_matrix.shape[1]
+    ) + tile(right_matrix.col, left_matrix.nnz).astype(int64)
+    values = _cut(
+        semiring.multiply(
+            repeat(left_matrix.data, count_of_right_entries),
+            tile(right_matrix.data, left_matrix.nnz),
+        ),
+        semiring,
+    )
+
+    return _reduce_duplicates(
+        rows,
+        columns,
+        values,
+        (
+            left_matrix.shape[0] * right_matrix.shape[0],
+            left_matrix.shape[1] * right_matrix.shape[1],
+        ),
+        semiring,
+    )
+
+
+def semiring_closure(
+    adjacency: csr_matrix,
+    semiring: Semiring,
+    max_length: int = None,
+    on_iteration=None,
+) -> csr_matrix:
+
+    """
+    Calculates closure of adjacency matrix over semiring, that is sum of its
+    powers from the first one. Idempotent semirings without bound of length
+    use squaring R = R + R * R, semirings with cap without bound of length
+    are calculated by _capped_closure, otherwise every path must be counted
+    once so R = A + R * A is iterated until fixpoint or given length
+
+    Args:
+        adjacency: adjacency matrix over semiring
+        semiring: semiring of values
+        max_length: maximal length of paths, unbounded if None
+        on_iteration: function that is called with count of nonzero elements
+        after each iteration
+
+    Returns:
+        Closure of adjacency matrix over semiring
+    """
+
+    adjacency = csr_matrix(adjacency)
+    closure = adjacency
+    length = 1
+
+    if max_length is not None and max_length < 1:
+        return csr_matrix(adjacency.shape, dtype=semiring.dtype)
+
+    if not semiring.idempotent and semiring.cap is not None and max_length is None:
+        return _capped_closure(adjacency, semiring, on_iteration)
+
+    while max_length is None or length < max_length:
+        if semiring.idempotent and max_length is None:
+            next_closure = semiring_add(
+                closure, semiring_matmul(closure, closure, semiring), semiring
+            )
+        else:
+            length += 1
+            next_closure = semiring_add(
+                adjacency, semiring_matmul(closure, adjacency, semiring), semiring
+            )
+
+        if on_iteration is not None:
+            on_iteration(next_closure.nnz)
+
+        if _are_equal(closure, next_closure):
+            break
+
+        closure = next_closure
+
+    return closure
+
+
+def _capped_closure(
+    adjacency: csr_matrix, semiring: Semiring, on_iteration=None
+) -> csr_matrix:
+
+    """
+    Calculates closure over non-idempotent semiring with cap without iterating
+    up to cap. Pairs connected by path through a cycle have infinitely many
+    paths, so they get cap at once. Other paths go through vertices out of
+    cycles only, their closure is calculated by doubling S_2k = S_k + A^k * S_k
+    until power A^k is zero, that takes logarithm of the longest path steps
+    """
+
+    size = adjacency.shape[0]
+    reachability = csr_matrix(adjacency, dtype=bool)
+    reachability.eliminate_zeros()
+
+    while True:
+        next_reachability = reachability + boolean_matmul(reachability, reachability)
+
+        if on_iteration is not None:
+            on_iteration(next_reachability.nnz)
+
+        if next_reachability.nnz == reachability.nnz:
+            break
+
+        reachability = next_reachability
+
+    is_cyclic = reachability.diagonal()
+    cyclic = nonzero(is_cyclic)[0]
+    reachability = reachability + identity(size, dtype=bool, format="csr")
+    through_cycles = boolean_matmul(reachability[:, cyclic], reachability[cyclic])
+
+    adjacency = adjacency.tocoo()
+    is_acyclic = ~is_cyclic[adjacency.row] & ~is_cyclic[adjacency.col]
+    power = closure = _reduce_duplicates(
+        adjacency.row[is_acyclic],
+        adjacency.col[is_acyclic],
+        adjacency.data[is_acyclic],
+        adjacency.shape,
+        semiring,
+    )
+
+    while power.nnz:
+        closure = semiring_add(
+            closure, semiring_matmul(power, closure, semiring), semiring
+        )
+        power = semiring_matmul(power, power, semiring)
+
+        if on_iteration is not None:
+            on_iteration(closure.nnz)
+
+    return semiring_add(
+        closure, lift_to_semiring(through_cycles, semiring, semiring.cap), semiring
+    )
+
+
+def _are_equal(left_matrix: csr_matrix, right_matrix: csr_matrix) -> bool:
+
+    """
+    Compares matrixes that are built by _reduce_duplicates entry by entry
+    """
+
+    return (
+        left_matrix.nnz == right_matrix.nnz
+        and (left_matrix.indptr == right_matrix.indptr).all()
+        and (left_matrix.indices == right_matrix.indices).all()
+        and (left_matrix.data == right_matrix.data).all()
+    )
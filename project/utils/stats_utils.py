@@ -0,0 +1,177 @@
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+_stats_hooks = []
+
+
+def add_stats_hook(hook):
+
+    """
+    Registers function that is called with QueryStats of each finished query,
+    while any hook is registered stats are collected for all queries
+
+    Args:
+        hook: function of QueryStats
+    """
+
+    _stats_hooks.append(hook)
+
+
+def remove_stats_hook(hook):
+
+    """
+    Unregisters function that is registered by add_stats_hook
+    """
+
+    _stats_hooks.remove(hook)
+
+
+class PhaseStats:
+
+    """
+    Statistics of single phase of query: wall time in seconds, count of
+    iterations, count of nonzero elements after each iteration and peak of
+    allocated bytes, which is measured only if tracemalloc is tracing
+    """
+
+    __slots__ = ("wall_time", "iterations", "nnz", "peak_allocation")
+
+    def __init__(self):
+        self.wall_time = 0.0
+        self.iterations = 0
+        self.nnz = []
+        self.peak_allocation = None
+
+    def as_dict(self) -> dict:
+        return {
+            "wall_time": self.wall_time,
+            "iterations": self.iterations,
+            "nnz": list(self.nnz),
+            "peak_allocation": self.peak_allocation,
+        }
+
+
+class QueryStats:
+
+    """
+    Statistics of query collected by phases in order they are started
+    """
+
+    def __init__(self, query: str):
+        self.query = query
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name: str):
+
+        """
+        Measures block of code as phase with given name, repeated phases
+        with the same name are accumulated
+        """
+
+        phase_stats = self.phases.setdefault(name, PhaseStats())
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            allocated, _ = tracemalloc.get_traced_memory()
+
+        start = perf_counter()
+        try:
+            yield phase_stats
+        finally:
+            phase_stats.wall_time += perf_counter() - start
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                phase_stats.peak_allocation = max(
+                    phase_stats.peak_allocation or 0, peak - allocated
+                )
+
+    def record_iteration(self, name: str, nnz: int):
+
+        """
+        Records iteration of phase with given name and count of nonzero elements
+        """
+
+        phase_stats = self.phases.setdefault(name, PhaseStats())
+        phase_stats.iterations += 1
+        phase_stats.nnz.append(int(nnz))
+
+    @property
+    def wall_time(self) -> float:
+        return sum(phase_stats.wall_time for phase_stats in self.phases.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "query": self.query,
+            "wall_time": self.wall_time,
+            "phases": {
+                name: phase_stats.as_dict() for name, phase_stats in self.phases.items()
+            },
+        }
+
+    def finish(self):
+
+        """
+        Passes stats to registered hooks
+        """
+
+        for hook in list(_stats_hooks):
+            hook(self)
+
+
+class _DisabledStats:
+
+    """
+    Stats that record nothing, used when stats are not required
+    """
+
+    def phase(self, name: str):
+        return nullcontext()
+
+    def record_iteration(self, name: str, nnz: int):
+        pass
+
+    def finish(self):
+        pass
+
+
+DISABLED_STATS = _DisabledStats()
+
+
+def start_stats(query: str, required: bool) -> QueryStats | _DisabledStats:
+
+    """
+    Creates stats of query if they are required or some hook is registered
+
+    Args:
+        query: name of query function
+        required: flag that represented whether caller requires stats
+
+    Returns:
+        QueryStats xor stats that record nothing
+    """
+
+    if required or _stats_hooks:
+        return QueryStats(query)
+
+    return DISABLED_STATS
+
+
+def finish_stats(result, query_stats: QueryStats | _DisabledStats, required: bool):
+
+    """
+    Finishes stats of query and attaches them to result if they are required
+
+    Args:
+        result: result of query
+        query_stats: stats of query
+        required: flag that represented whether caller requires stats
+
+    Returns:
+        Pair of result and QueryStats if stats are required xor result
+    """
+
+    query_stats.finish()
+
+    return (result, query_stats) if required else result
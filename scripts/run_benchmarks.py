@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+import shared
+
+
+def main():
+    shared.configure_python_path()
+
+    names = sys.argv[1:]
+    for benchmark in sorted(shared.BENCHMARKS.glob("benchmark_*.py")):
+        if names and not any(name in benchmark.stem for name in names):
+            continue
+        print("Run benchmark: ", benchmark.stem, flush=True)
+        subprocess.check_call(["python", str(benchmark)])
+
+
+if __name__ == "__main__":
+    main()
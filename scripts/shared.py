@@ -4,6 +4,7 @@ import pathlib
 ROOT = pathlib.Path(__file__).parent.parent
 DOCS = ROOT / "docs"
 TESTS = ROOT / "tests"
+BENCHMARKS = ROOT / "benchmarks"
 
 
 def configure_python_path():
@@ -34,6 +34,67 @@ transitive_closure_test = [
     ([(0, "a", 1), (1, "b", 0)], [0], [1, 2], [[1, 1, 0], [1, 1, 0], [0, 0, 0]]),
 ]
 
+# edges, regular_expression, starting_states, finale_states, cap, max_length, expected_counts
+counting_paths_test = [
+    (
+        [(0, "a", 1), (1, "a", 2), (0, "a", 2), (2, "b", 0)],
+        "a*",
+        {0},
+        {2},
+        10,
+        None,
+        {(0, 2): 2},
+    ),
+    (
+        [(0, "a", 1), (1, "a", 2), (0, "a", 2), (2, "b", 0)],
+        "(a|b)*",
+        {0},
+        {0, 2},
+        100,
+        3,
+        {(0, 0): 2, (0, 2): 3},
+    ),
+    (
+        [(0, "a", 1), (1, "a", 2), (0, "a", 2), (2, "b", 0)],
+        "(a|b)*",
+        {0},
+        {0, 1, 2},
+        5,
+        None,
+        {(0, 0): 5, (0, 1): 5, (0, 2): 5},
+    ),
+]
+
+# count_of_states, count_of_transitions of random automata
+parallel_closure_test = [(5, 8), (60, 40), (60, 90), (200, 250)]
+
+# query functions matched with phases of their stats
+stats_phases_test = {
+    "regular_request": [
+        "gen_min_dfa_by_reg",
+        "build_binary_matrix_by_nfa",
+        "gen_nfa_by_graph",
+        "kronecker_product",
+        "transitive_closure",
+        "result_extraction",
+    ],
+    "bfs_regular_request": [
+        "gen_min_dfa_by_reg",
+        "gen_nfa_by_graph",
+        "build_binary_matrix_by_nfa",
+        "bfs",
+        "result_extraction",
+    ],
+    "semiring_regular_request": [
+        "gen_min_dfa_by_reg",
+        "build_binary_matrix_by_nfa",
+        "gen_nfa_by_graph",
+        "kronecker_product",
+        "transitive_closure",
+        "result_extraction",
+    ],
+}
+
 # first_cycle, second_cycle, (first_cycle_mark, second_cycle_mark), regular_expression, starting_states, finale_states, expected_output
 regular_request_test = [
     (
@@ -100,6 +161,37 @@ regular_request_test = [
 ]
 
 # name_of_graph, regular_expression, starting_states, finale_states, separated_variant_expected_output, non_separated_variant_expected_output
+# regular_expressions of batch that are evaluated against the same graph
+batch_regular_request_test = [
+    "a*|b",
+    "x*|y",
+    "a*|y",
+    "b",
+    "a b",
+    "a* b*",
+    "(a|b)*",
+    "b a*",
+    "a a a",
+    "b* a",
+    "a*|b",
+]
+
+# regular_expressions that are compiled directly and by pyformlang
+regex_compiler_test = [
+    "$",
+    "epsilon",
+    "a.b",
+    "a+b",
+    "(a|$) b*",
+    "((a b)* c)*",
+    "a b* c | d",
+    "a** b",
+    "(a|b)(c|d)",
+    "abc|ab c",
+    "a | b c | d*",
+    "(a|b c)* | d",
+]
+
 bfs_regular_request_test = [
     ("first.dot", "a*", {"1"}, {}, set(), set()),
     ("second.dot", "a*", {"1"}, {"1"}, {("1", "1")}, {"1"}),
@@ -170,9 +262,219 @@ common_starting_symbol = "S"
 
 extended_grammars = [
     ("S -> a", ["S"], ["a"], {"S": "a"}),
-    ("S -> a b S", ["S"], ["a", "b"], {"S": "a b"}),
-    ("S -> a N\nN -> b", ["S", "N"], ["a", "b"], {"S": "a", "N": "b"}),
-    ("S -> epsilon", ["S"], [], {"S": ""}),
-    ("S -> endpoint", ["S"], [], {"S": ""}),
+    ("S -> a b S", ["S"], ["a", "b"], {"S": "a b S"}),
+    ("S -> a N\nN -> b", ["S", "N"], ["a", "b"], {"S": "a N", "N": "b"}),
+    ("S -> epsilon", ["S"], [], {"S": "$"}),
+    ("S -> endpoint", ["S"], [], {"S": "$"}),
     ("S -> [a b]", ["S"], ["a", "b"], {"S": "[a b]"}),
+    (
+        "S -> foo S bar | epsilon\nS -> baz?",
+        ["S"],
+        ["foo", "bar", "baz"],
+        {"S": "foo S bar | epsilon | baz | epsilon"},
+    ),
+    (
+        "S -> a*? [ b c ]? ( d + e? )??",
+        ["S"],
+        ["a", "b", "c", "d", "e"],
+        {"S": "a* ( b c | epsilon ) ( d | e | epsilon )"},
+    ),
+    (
+        "Expr -> Term ( plus Term )*\nTerm -> num | lparen Expr rparen",
+        ["Expr", "Term"],
+        ["plus", "num", "lparen", "rparen"],
+        {"Expr": "Term ( plus Term )*", "Term": "num | lparen Expr rparen"},
+    ),
+]
+
+# name_of_file, starting_symbol, expected_nonterminals, expected_terminals
+names_of_extended_grammar_files = [
+    ("extended.grammar", "S", ["S", "N"], ["foo", "bar"]),
+]
+
+# grammar, starting_symbol, nullable, generating, reachable, first, follow, relevant_labels
+grammars_for_analysis = [
+    (
+        "S -> A b | c\nA -> a A | epsilon\nD -> d S\nE -> E e",
+        "S",
+        {"A"},
+        {"S", "A", "D"},
+        {"S", "A"},
+        {"S": {"a", "b", "c"}, "A": {"a"}, "D": {"d"}, "E": set()},
+        {"S": set(), "A": {"b"}, "D": set(), "E": set()},
+        {"a", "b", "c"},
+    ),
+    (
+        "S -> a S b | S S | epsilon",
+        "S",
+        {"S"},
+        {"S"},
+        {"S"},
+        {"S": {"a"}},
+        {"S": {"a", "b"}},
+        {"a", "b"},
+    ),
+    (
+        "S -> E\nE -> e E",
+        "S",
+        set(),
+        set(),
+        set(),
+        {"S": set(), "E": set()},
+        {"S": set(), "E": set()},
+        set(),
+    ),
+]
+
+# extended_grammar, starting_symbol, nullable, reachable, relevant_labels
+extended_grammars_for_analysis = [
+    (
+        "S -> ( a N )* c?\nN -> b | S\nM -> d",
+        "S",
+        {"S", "N"},
+        {"S", "N"},
+        {"a", "b", "c"},
+    ),
+    ("S -> x ( N | y )\nN -> N z", "S", set(), {"S"}, {"x", "y"}),
 ]
+
+# fst_num_nodes, snd_num_nodes, marks, grammar, starting_vertices, final_vertices, expected_set
+contex_free_request_test = [
+    (
+        2,
+        1,
+        ("a", "b"),
+        "S -> a S b | a b",
+        None,
+        None,
+        {(0, 0), (0, 3), (1, 0), (1, 3), (2, 0), (2, 3)},
+    ),
+    (2, 1, ("a", "b"), "S -> a S b | a b", {0}, {0}, {(0, 0)}),
+    (2, 1, ("a", "b"), "S -> A B\nA -> a\nB -> b", {1, 2}, None, {(2, 3)}),
+    (2, 1, ("a", "b"), "S -> S S | $", {3}, None, {(3, 3)}),
+    (2, 1, ("a", "b"), "S -> c", None, None, set()),
+    (3, 2, ("a", "b"), "S -> a S b | a b", {0}, None, {(0, 0), (0, 4), (0, 5)}),
+]
+
+# program, printed lines
+query_programs_test = [
+    ("print 1", ["1"]),
+    ('print "a\\"b"', ['"a\\"b"']),
+    ("print (1, true)", ["(1, true)"]),
+    ("print {2, 1, 2}", ["{1, 2}"]),
+    ("let s = {0..2}\nprint map(fun x -> (x, x), s)", ["{(0, 0), (1, 1), (2, 2)}"]),
+    ("print {1..3} & {2..5}\nprint {1} | {2}", ["{2, 3}", "{1, 2}"]),
+    ("print not 1 in {1} or 2 == 2 and 1 != 1", ["false"]),
+    ('print "a" . ("b" | "c")*', ['("a" . ("b" | "c")*)']),
+    (
+        'let g = load("tests/results/graphs/sample_graph.dot")\n'
+        "print get_vertices(g)\nprint get_labels(g)",
+        ["{0, 1, 2, 3, 4}", '{"a", "b"}'],
+    ),
+    (
+        'let g = load("tests/results/graphs/sample_graph.dot")\n' "print get_edges(g)",
+        [
+            '{(0, "a", 1), (0, "b", 3), (1, "a", 2), (2, "a", 0), (3, "b", 4), (4, "b", 0)}'
+        ],
+    ),
+    (
+        'let g = load("tests/results/graphs/sample_graph.dot")\n'
+        'let r = set_start({3}, g) & "b" . "b"\n'
+        "print map(fun ((u, _), (v, _)) -> (u, v), get_reachable(r))",
+        ["{(3, 0)}"],
+    ),
+    (
+        'let g = load("tests/results/graphs/sample_graph.dot")\n'
+        "print filter(fun v -> not v in {0}, get_vertices(g)) | {7}\n"
+        "print get_start(set_start({1, 9}, add_final({2}, g)))",
+        ["{1, 2, 3, 4, 7}", "{1}"],
+    ),
+    (
+        'let g = load("tests/results/graphs/sample_graph.dot")\n'
+        "let h = set_final({2}, set_start({0}, g))\n"
+        "print get_reachable(h . h)\nprint get_reachable(h*)",
+        ["{((0, 0), (1, 2))}", "{((1, 0), (0, 2))}"],
+    ),
+]
+
+# regular expression, equal expression of query language,
+# starting vertices, final vertices
+query_regular_requests_test = [
+    ("a*", '"a"*', {0}, set()),
+    ("a b", '"a" . "b"', {2}, set()),
+    ("(a | b)* b", '("a" | "b")* . "b"', {1, 3}, {0, 4}),
+    ("a* | b*", '"a"* | "b"*', set(), set()),
+    ("a b* a", '"a" . "b"* . "a"', set(), {2}),
+]
+
+# program, beginning of message of error
+query_errors_test = [
+    ("let x = ", "Line 1: expected expression"),
+    ("print (1, 2", "Line 1: expected )"),
+    ('print "a', "Line 1: string is not closed"),
+    ("print 1 $ 2", "Line 1: unexpected symbol $"),
+    ("print x", "Line 1: variable x is not defined"),
+    ("\nprint get_reachable(1)", "Line 2: get_reachable expects automaton"),
+    ('print {1} & "a"', "Line 1: intersect expects automaton, but got set"),
+    ("print map(fun (x, y) -> x, {1})", "Line 1: 1 does not match pattern"),
+    ("print filter(fun x -> x, {1})", "Line 1: filter expects bool, but got int"),
+    ("print set_start(1)", "Line 1: set_start expects 2 arguments"),
+    ('print get_vertices(load("no such graph.dot"))', "Line 1: graph no such"),
+]
+
+# text of DOT file, expected vertices, expected edges with keys and attributes
+dot_texts_test = [
+    ("digraph {\n}\n", [], []),
+    (
+        "digraph  {\n1;\n2;\n1 -> 2  [key=0, label=a];\n2 -> 1 [key=0 label=b];\n}\n",
+        ["1", "2"],
+        [("1", "2", "0", {"label": "a"}), ("2", "1", "0", {"label": "b"})],
+    ),
+    (
+        "strict digraph g { a -> b -> c [label=x] }",
+        ["a", "b", "c"],
+        [("a", "b", 0, {"label": "x"}), ("b", "c", 0, {"label": "x"})],
+    ),
+    (
+        "digraph {\n// comment\n/* long\ncomment */ a; b /* c */ ;\n}",
+        ["a", "b"],
+        [],
+    ),
+    (
+        'digraph {\n"a b" -> "c\\"d" [label="x;y"];\n"e\nf";\n}',
+        ["a b", 'c"d', "e\nf"],
+        [("a b", 'c"d', 0, {"label": "x;y"})],
+    ),
+    (
+        'digraph {\n"a\\\\" -> "b\\\\\\"c" [label="x\\ly"];\n}',
+        ["a\\", 'b\\"c'],
+        [("a\\", 'b\\"c', 0, {"label": "x\\ly"})],
+    ),
+    (
+        "# preprocessor\nDiGraph {\n  rankdir = LR\n  node [shape=circle]\n"
+        "  a -> b [label=a]; a -> b [label=b]\n  b\n  -> a;\n}",
+        ["a", "b"],
+        [
+            ("a", "b", 0, {"label": "a"}),
+            ("a", "b", 1, {"label": "b"}),
+            ("b", "a", 0, {}),
+        ],
+    ),
+]
+
+# text of DOT file, beginning of message of error
+dot_errors_test = [
+    ("", "Expected graph or digraph"),
+    ("digraph {\na -> ;\n}", "Expected ID"),
+    ("digraph {\na [label];\n}", "Attributes [label] can not be parsed"),
+    ("digraph {\na [label]\n}", "Expected ="),
+    ("digraph {\nsubgraph s { a }\n}", "Subgraphs are not supported"),
+    ("digraph {\na:n -> b;\n}", "Ports are not supported"),
+    ('digraph {\na [label="x];\n}', "String is not closed"),
+    ("digraph {\n/* a;\n}", "Comment is not closed"),
+    ("digraph {\na -> b [label=<x>];\n}", "Line 2: HTML strings are not supported"),
+    ("digraph {\na $ b;\n}", "Line 2: unexpected symbol $"),
+]
+
+# counts of nodes in cycles
+two_cycles_edge_arrays_test = [(1, 1), (2, 2), (3, 5), (10, 1)]
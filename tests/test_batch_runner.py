@@ -0,0 +1,101 @@
+import pytest
+
+import io
+import json
+
+from pyformlang.regular_expression import Regex
+
+from project.server.batch_runner import (
+    clear_decompositions_cache,
+    evaluate_query,
+    run_batch,
+)
+from project.utils.graph_utils import (
+    gen_labeled_two_cycles_graph,
+    load_from_dot,
+    regular_request,
+    save_as_dot,
+)
+from common_info import regular_request_test
+
+
+def test_run_batch(tmp_path):
+
+    graphs = {}
+    lines = []
+    expected = {}
+
+    for i, (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_states,
+        final_states,
+        _,
+    ) in enumerate(regular_request_test):
+        name = f"{fst_num_nodes}_{snd_num_nodes}_{marks[0]}_{marks[1]}"
+        path = tmp_path / f"{name}.dot"
+        if name not in graphs:
+            save_as_dot(
+                gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks), path
+            )
+            graphs[name] = str(path)
+
+        lines.append(
+            json.dumps(
+                {
+                    "id": i,
+                    "graph": name,
+                    "regex": regex,
+                    "starting_vertices": list(starting_states),
+                    "final_vertices": list(final_states),
+                }
+            )
+        )
+        expected[i] = sorted(
+            [vertex_from.value, vertex_to.value]
+            for vertex_from, vertex_to in regular_request(
+                load_from_dot(path),
+                {str(vertex) for vertex in starting_states},
+                {str(vertex) for vertex in final_states},
+                Regex(regex),
+            )
+        )
+
+    lines += [
+        "",
+        "not json",
+        '{"graph": "missing.dot", "regex": "a"}',
+        json.dumps({"graph": name, "regex": "a*", "starting_vertices": 5}),
+        json.dumps({"graph": name, "regex": "a*", "final_vertices": {"a": 1}}),
+    ]
+
+    for workers, size_of_chunk in ((1, 1024), (1, 2), (2, 3)):
+        clear_decompositions_cache()
+        output = io.StringIO()
+        run_batch(iter(lines), output, graphs, workers, size_of_chunk)
+
+        responses = {}
+        for line in output.getvalue().splitlines():
+            response = json.loads(line)
+            responses[response["id"]] = response
+
+        assert len(responses) == len(expected) + 4
+        for i, result in expected.items():
+            assert sorted(responses[i]["result"]) == result
+        for number_of_line in range(len(lines) - 3, len(lines) + 1):
+            assert "error" in responses[number_of_line]
+
+
+def test_evaluate_query_with_broken_query(tmp_path):
+
+    path = str(tmp_path / "graph.dot")
+    save_as_dot(gen_labeled_two_cycles_graph(2, 2, ("a", "b")), path)
+
+    response = evaluate_query(
+        path, {"id": 1, "graph": path, "regex": "a*", "starting_vertices": 5}
+    )
+
+    assert response["id"] == 1
+    assert "error" in response and "result" not in response
@@ -0,0 +1,110 @@
+import pytest
+
+from pyformlang.regular_expression import Regex
+
+from project.utils.batch_utils import (
+    batch_regular_request,
+    build_tagged_automaton,
+    multi_bfs_regular_request,
+    clear_requests_cache,
+    compile_regular_request,
+    group_by_alphabets,
+)
+from project.utils.graph_utils import (
+    bfs_regular_request,
+    gen_labeled_two_cycles_graph,
+    regular_request,
+)
+from common_info import batch_regular_request_test
+
+
+def test_batch_regular_request():
+
+    graph = gen_labeled_two_cycles_graph(4, 3, ("a", "b"))
+
+    for workers in [1, 2]:
+        for starting_vertices, final_vertices in [(None, None), ({0, 1}, {2, 5})]:
+            results = batch_regular_request(
+                graph,
+                batch_regular_request_test,
+                starting_vertices,
+                final_vertices,
+                workers=workers,
+            )
+
+            assert results.keys() == set(batch_regular_request_test)
+            for regex, result in results.items():
+                assert result == regular_request(
+                    graph,
+                    starting_vertices or set(),
+                    final_vertices or set(),
+                    Regex(regex),
+                )
+
+
+def test_compiled_requests_are_cached():
+
+    clear_requests_cache()
+
+    for regex in batch_regular_request_test:
+        assert compile_regular_request(regex) is compile_regular_request(regex)
+
+
+def test_group_by_alphabets():
+
+    binary_matrixes = {
+        regex: compile_regular_request(regex) for regex in batch_regular_request_test
+    }
+
+    for count_of_groups in range(1, len(binary_matrixes) + 2):
+        groups = group_by_alphabets(binary_matrixes, count_of_groups)
+        requests = [request for group in groups for request in group]
+
+        assert sorted(requests) == sorted(binary_matrixes)
+        for group in groups:
+            for request in group:
+                for other_group in groups:
+                    if other_group is not group:
+                        assert all(
+                            binary_matrixes[request].matrix.keys()
+                            != binary_matrixes[other].matrix.keys()
+                            for other in other_group
+                        )
+
+
+def test_tagged_automaton_shares_prefixes():
+
+    binary_matrix, tags = build_tagged_automaton(
+        ["knows* worksAt", "knows* livesIn", "knows* worksAt"]
+    )
+
+    assert len(binary_matrix.indexes) == 3
+    assert sorted(map(sorted, tags.values())) == [
+        ["knows* livesIn"],
+        ["knows* worksAt"],
+    ]
+
+
+def test_multi_bfs_regular_request():
+
+    graph = gen_labeled_two_cycles_graph(4, 3, ("a", "b"))
+
+    for separated_flag in [True, False]:
+        for starting_vertices, final_vertices in [(None, None), ({0, 1}, {2, 5})]:
+            results = multi_bfs_regular_request(
+                graph,
+                batch_regular_request_test,
+                starting_vertices,
+                final_vertices,
+                separated_flag,
+            )
+
+            assert results.keys() == set(batch_regular_request_test)
+            for regex, result in results.items():
+                assert result == bfs_regular_request(
+                    graph,
+                    Regex(regex),
+                    starting_vertices,
+                    final_vertices,
+                    separated_flag,
+                )
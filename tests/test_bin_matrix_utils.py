@@ -1,18 +1,34 @@
 import pytest
 
+from random import Random
+from threading import active_count
 from typing import List
 
 from pyformlang.finite_automaton import NondeterministicFiniteAutomaton, State
-from scipy.sparse import dok_matrix
+from scipy.sparse import csr_matrix, dok_matrix, random as random_matrix
 
 from project.utils.automata_utils import intersect_of_automata
 from project.utils.bin_matrix_utils import (
+    adapt_format,
     build_binary_matrix_by_nfa,
     build_nfa_by_binary_matrix,
+    map_by_marks,
+    bounded_transitive_closure,
     transitive_closure,
+    semiring_transitive_closure,
+)
+from project.utils.semiring_utils import (
+    BOOLEAN_SEMIRING,
+    MIN_PLUS_SEMIRING,
+    boolean_matmul,
+    counting_semiring,
+    lift_to_semiring,
+    masked_boolean_matmul,
+    semiring_closure,
 )
 from common_info import (
     nondeterministic_automata_for_build_test,
+    parallel_closure_test,
     transitive_closure_test,
 )
 
@@ -103,3 +119,184 @@ def test_transitive_closure():
         expected_closure = dok_matrix(expected)
 
         assert geted_closure.toarray().data == expected_closure.toarray().data
+
+
+def test_bounded_transitive_closure():
+
+    for (
+        transitions_list,
+        starting_states,
+        final_states,
+        expected,
+    ) in transitive_closure_test:
+        nfa = build_nfa(transitions_list, starting_states, final_states)
+        binary_matrix = build_binary_matrix_by_nfa(nfa)
+        geted_closure, distances = bounded_transitive_closure(
+            binary_matrix, len(expected) + 1
+        )
+
+        assert (geted_closure != transitive_closure(binary_matrix)).nnz == 0
+        assert (distances > 0).toarray().tolist() == geted_closure.toarray().tolist()
+
+        geted_closure, distances = bounded_transitive_closure(binary_matrix, 1)
+        adjacency = sum(binary_matrix.matrix.values())
+
+        assert (geted_closure != adjacency).nnz == 0
+        assert distances.max() == 1
+
+
+def test_semiring_transitive_closure():
+
+    for (
+        transitions_list,
+        starting_states,
+        final_states,
+        expected,
+    ) in transitive_closure_test:
+        nfa = build_nfa(transitions_list, starting_states, final_states)
+        binary_matrix = build_binary_matrix_by_nfa(nfa)
+        closure = transitive_closure(binary_matrix)
+
+        geted_closure = semiring_transitive_closure(binary_matrix, BOOLEAN_SEMIRING)
+        assert (geted_closure != closure).nnz == 0
+
+        _, expected_distances = bounded_transitive_closure(
+            binary_matrix, len(expected) + 1
+        )
+        distances = semiring_transitive_closure(binary_matrix, MIN_PLUS_SEMIRING)
+        assert distances.toarray().tolist() == expected_distances.toarray().tolist()
+
+        counts = semiring_transitive_closure(binary_matrix, counting_semiring(3))
+        assert (counts > 0).toarray().tolist() == (closure > 0).toarray().tolist()
+        assert counts.max() <= 3
+
+        counts = semiring_transitive_closure(
+            binary_matrix, counting_semiring(100), max_length=1
+        )
+        adjacency = sum(binary_matrix.matrix.values())
+        assert counts.toarray().tolist() == (adjacency > 0).toarray().tolist()
+
+
+def test_closures_in_dense_and_sparse_formats():
+
+    for seed, (count_of_states, count_of_transitions) in enumerate(
+        parallel_closure_test
+    ):
+        random = Random(seed)
+        binary_matrix = build_binary_matrix_by_nfa(
+            build_nfa(
+                [
+                    (
+                        random.randrange(count_of_states),
+                        random.choice("ab"),
+                        random.randrange(count_of_states),
+                    )
+                    for _ in range(count_of_transitions)
+                ],
+                [0],
+                [0],
+            )
+        )
+
+        closures = [
+            transitive_closure(binary_matrix, dense_threshold=dense_threshold) > 0
+            for dense_threshold in [0.0, 0.3, 2.0]
+        ]
+        assert all((closure != closures[0]).nnz == 0 for closure in closures)
+
+        for max_length in [1, 3, count_of_states]:
+            closures = [
+                bounded_transitive_closure(
+                    binary_matrix, max_length, dense_threshold=dense_threshold
+                )
+                for dense_threshold in [0.0, 0.3, 2.0]
+            ]
+            for closure, distances in closures:
+                assert (closure != closures[0][0]).nnz == 0
+                assert (distances != closures[0][1]).nnz == 0
+
+
+def test_counting_closure_with_cycles():
+
+    cap = 3
+    for seed, (count_of_states, count_of_transitions) in enumerate(
+        parallel_closure_test
+    ):
+        adjacency = lift_to_semiring(
+            random_matrix(
+                count_of_states,
+                count_of_states,
+                count_of_transitions / count_of_states**2,
+                format="csr",
+                random_state=seed,
+            ),
+            counting_semiring(cap),
+        )
+
+        # paths out of cycles are shorter than count of states, pairs with
+        # path through a cycle get more than cap paths of such length
+        expected = semiring_closure(
+            adjacency, counting_semiring(cap), max_length=count_of_states * (cap + 1)
+        )
+        counts = semiring_closure(adjacency, counting_semiring(cap))
+        assert (counts != expected).nnz == 0
+
+    loop = lift_to_semiring(
+        csr_matrix([[True, True], [False, False]]), counting_semiring(10**9)
+    )
+    counts = semiring_closure(loop, counting_semiring(10**9))
+    assert counts.toarray().tolist() == [[10**9, 10**9], [0, 0]]
+
+
+def test_adapt_format():
+
+    matrix = dok_matrix((4, 4), dtype=bool)
+    matrix[0, 0] = matrix[1, 2] = True
+
+    dense = adapt_format(matrix.tocsr(), 0.1)
+    assert dense.tolist() == matrix.toarray().tolist()
+    assert adapt_format(dense, 0.2) is dense
+    assert (adapt_format(dense, 0.5) != matrix).nnz == 0
+    assert adapt_format(matrix, 0.5) is matrix
+
+
+def test_boolean_matmul():
+
+    for seed, (count_of_states, count_of_transitions) in enumerate(
+        parallel_closure_test
+    ):
+        density = count_of_transitions / count_of_states**2
+        left, right, mask = [
+            random_matrix(
+                count_of_states,
+                count_of_states,
+                density,
+                format="csr",
+                random_state=seed * 3 + i,
+            )
+            for i in range(3)
+        ]
+
+        product = boolean_matmul(left, right)
+        expected = (left @ right) != 0
+
+        assert product.dtype == bool
+        assert product.nnz == expected.count_nonzero()
+        assert (product != expected).nnz == 0
+
+        expected = expected > (mask != 0)
+        for mask in [mask, mask.toarray() != 0]:
+            masked_product = masked_boolean_matmul(left, right, mask)
+            assert masked_product.nnz == expected.count_nonzero()
+            assert (masked_product != expected).nnz == 0
+
+
+def test_map_by_marks_leaves_no_threads():
+
+    count_of_threads = active_count()
+
+    for threads in [None, 1, 2, 3, 8]:
+        assert map_by_marks(lambda mark: mark * 2, range(5), threads) == {
+            mark: mark * 2 for mark in range(5)
+        }
+        assert active_count() == count_of_threads
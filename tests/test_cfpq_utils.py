@@ -0,0 +1,50 @@
+import pytest
+
+from pyformlang.cfg import CFG, Variable
+
+from project.utils.cfpq_utils import (
+    ContexFreeRequestExepction,
+    matrix_contex_free_request,
+)
+from project.utils.graph_utils import gen_labeled_two_cycles_graph
+from common_info import contex_free_request_test
+
+
+def test_matrix_contex_free_request():
+
+    for (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        grammar,
+        starting_vertices,
+        final_vertices,
+        expected_set,
+    ) in contex_free_request_test:
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+
+        assert (
+            matrix_contex_free_request(
+                graph, grammar, starting_vertices, final_vertices
+            )
+            == expected_set
+        )
+        assert (
+            matrix_contex_free_request(
+                graph,
+                CFG.from_text(grammar, Variable("S")),
+                starting_vertices,
+                final_vertices,
+            )
+            == expected_set
+        )
+
+
+def test_raise_on_unknown_vertices():
+
+    graph = gen_labeled_two_cycles_graph(2, 1, ("a", "b"))
+
+    with pytest.raises(ContexFreeRequestExepction):
+        matrix_contex_free_request(graph, "S -> a", {42})
+    with pytest.raises(ContexFreeRequestExepction):
+        matrix_contex_free_request(graph, "S -> a", None, {42})
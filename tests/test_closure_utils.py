@@ -0,0 +1,166 @@
+import pytest
+
+from random import Random
+
+from pyformlang.finite_automaton import NondeterministicFiniteAutomaton
+from pyformlang.regular_expression import Regex
+
+import project.utils.closure_utils as closure_utils
+from project.utils.bin_matrix_utils import (
+    build_binary_matrix_by_nfa,
+    intersect_of_automata_by_binary_matixes,
+    transitive_closure,
+)
+from project.utils.closure_utils import (
+    KroneckerProduct,
+    adjacency_of_binary_matrix,
+    budgeted_transitive_closure,
+    parallel_transitive_closure,
+)
+from project.utils.graph_utils import (
+    gen_labeled_two_cycles_graph,
+    iter_budgeted_regular_request,
+    regular_request,
+)
+from common_info import (
+    batch_regular_request_test,
+    parallel_closure_test,
+    regular_request_test,
+)
+
+
+def gen_binary_matrix(count_of_states: int, count_of_transitions: int, seed: int):
+
+    random = Random(seed)
+    nfa = NondeterministicFiniteAutomaton()
+
+    for _ in range(count_of_transitions):
+        nfa.add_transition(
+            random.randrange(count_of_states),
+            random.choice("ab"),
+            random.randrange(count_of_states),
+        )
+
+    return build_binary_matrix_by_nfa(nfa)
+
+
+def test_parallel_transitive_closure(monkeypatch):
+
+    monkeypatch.setattr(closure_utils, "MIN_STATES_FOR_PROCESS_POOL", 0)
+
+    binary_matrixes = [
+        gen_binary_matrix(count_of_states, count_of_transitions, seed)
+        for seed, (count_of_states, count_of_transitions) in enumerate(
+            parallel_closure_test
+        )
+    ]
+
+    for binary_matrix in binary_matrixes:
+        expected = transitive_closure(binary_matrix) > 0
+        for workers in [1, 2]:
+            for count_of_blocks in [None, 1, 7]:
+                closure = parallel_transitive_closure(
+                    binary_matrix, workers, count_of_blocks
+                )
+                assert (closure != expected).nnz == 0
+
+
+def test_regular_request_with_workers(monkeypatch):
+
+    monkeypatch.setattr(closure_utils, "MIN_STATES_FOR_PROCESS_POOL", 0)
+    graph = gen_labeled_two_cycles_graph(4, 3, ("a", "b"))
+
+    for regex in batch_regular_request_test:
+        assert regular_request(
+            graph, set(), set(), Regex(regex), workers=2
+        ) == regular_request(graph, set(), set(), Regex(regex))
+
+
+def test_budgeted_transitive_closure(tmp_path):
+
+    binary_matrixes = [
+        gen_binary_matrix(count_of_states, count_of_transitions, seed)
+        for seed, (count_of_states, count_of_transitions) in enumerate(
+            parallel_closure_test
+        )
+    ]
+
+    for binary_matrix in binary_matrixes:
+        expected = transitive_closure(binary_matrix) > 0
+        for memory_budget in [1, 256, 4096, 10**9]:
+            with budgeted_transitive_closure(
+                binary_matrix, memory_budget, directory=tmp_path
+            ) as closure:
+                assert closure.nnz == expected.nnz
+                assert (closure.to_csr() != expected).nnz == 0
+                assert closure.spilled == (
+                    expected.nnz * closure_utils.BYTES_PER_PAIR > memory_budget
+                )
+            assert not list(tmp_path.iterdir())
+
+        rows = range(0, len(binary_matrix.indexes), 3)
+        with budgeted_transitive_closure(binary_matrix, 256, rows) as closure:
+            assert set(closure.nonzero()) == {
+                (row, column)
+                for row, column in zip(*expected.nonzero())
+                if row % 3 == 0
+            }
+
+
+def test_regular_request_with_memory_budget():
+
+    graph = gen_labeled_two_cycles_graph(4, 3, ("a", "b"))
+
+    for regex in batch_regular_request_test:
+        for memory_budget in [1, 1024]:
+            assert regular_request(
+                graph, set(), set(), Regex(regex), memory_budget=memory_budget
+            ) == regular_request(graph, set(), set(), Regex(regex))
+
+
+def test_kronecker_product_is_built_by_rows():
+
+    for seed, (count_of_states, count_of_transitions) in enumerate(
+        parallel_closure_test
+    ):
+        left = gen_binary_matrix(count_of_states, count_of_transitions, seed)
+        right = gen_binary_matrix(5, 8, seed + 1)
+        intersect = intersect_of_automata_by_binary_matixes(left, right)
+        expected = adjacency_of_binary_matrix(intersect)
+
+        product = KroneckerProduct(left, right)
+        rows = list(range(0, product.shape[0], 7))
+        assert product.shape == expected.shape
+        assert (product.rows(rows) != expected[rows]).nnz == 0
+
+        with budgeted_transitive_closure(product, 256, rows) as closure:
+            assert (
+                closure.to_csr()[rows] != (transitive_closure(intersect) > 0)[rows]
+            ).nnz == 0
+
+
+def test_iter_budgeted_regular_request():
+
+    for (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_vertices,
+        final_vertices,
+        expected_set,
+    ) in regular_request_test:
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+
+        for memory_budget in [1, 1024]:
+            pairs = list(
+                iter_budgeted_regular_request(
+                    graph,
+                    starting_vertices,
+                    final_vertices,
+                    Regex(regex),
+                    memory_budget,
+                )
+            )
+            assert len(pairs) == len(set(pairs))
+            assert set(pairs) == expected_set
@@ -0,0 +1,120 @@
+import pytest
+
+from filecmp import cmp
+
+from networkx import MultiDiGraph
+
+from project.utils.dot_utils import DotExepction, read_dot, write_dot
+from project.utils.edge_arrays_utils import edge_arrays_of_graph
+from project.utils.graph_utils import gen_labeled_two_cycles_graph
+from common_info import (
+    dot_errors_test,
+    dot_texts_test,
+    path_to_graphs,
+    path_to_results,
+)
+
+
+def test_read_dot(tmp_path):
+
+    path = tmp_path / "graph.dot"
+
+    for text, vertices, edges in dot_texts_test:
+        path.write_text(text)
+
+        graph = read_dot(path)
+        assert list(graph.nodes) == vertices
+        assert list(graph.edges(keys=True, data=True)) == edges
+
+        edge_arrays = read_dot(path, edge_arrays=True)
+        assert edge_arrays.vertices == vertices
+        assert [
+            (edge_arrays.vertices[source], edge_arrays.vertices[target])
+            for source, target in zip(edge_arrays.sources, edge_arrays.targets)
+        ] == [(vertex_from, vertex_to) for vertex_from, vertex_to, _, _ in edges]
+        assert [
+            edge_arrays.marks[label] if label >= 0 else None
+            for label in edge_arrays.labels
+        ] == [data.get("label") for _, _, _, data in edges]
+
+
+def test_read_dot_errors(tmp_path):
+
+    path = tmp_path / "graph.dot"
+
+    for text, message in dot_errors_test:
+        path.write_text(text)
+
+        with pytest.raises(DotExepction) as exception:
+            read_dot(path)
+        assert exception.value.message.startswith(message)
+
+
+def test_write_dot():
+
+    path_to_generated = path_to_results + "generated_graph.dot"
+    path_to_sample = path_to_graphs + "sample_graph.dot"
+
+    write_dot(read_dot(path_to_sample), path_to_generated)
+    assert cmp(path_to_generated, path_to_sample, shallow=False)
+
+    edge_arrays = read_dot(path_to_sample, edge_arrays=True)
+    write_dot(edge_arrays, path_to_generated)
+    loaded = read_dot(path_to_generated, edge_arrays=True)
+
+    assert loaded.vertices == edge_arrays.vertices
+    assert loaded.marks == edge_arrays.marks
+    for name in ("sources", "targets", "labels"):
+        assert (getattr(loaded, name) == getattr(edge_arrays, name)).all()
+
+
+def test_write_and_read_dot(tmp_path):
+
+    path = tmp_path / "graph.dot"
+
+    graph = MultiDiGraph(name="graph")
+    graph.add_node("node", shape="circle")
+    graph.add_edge("node", "a b", label='say "hi"')
+    graph.add_edge("node", "a b", label="$")
+    graph.add_edge(-1, 2.5)
+    graph.add_edge("a\\", 'b\\"', label="\\")
+    graph.graph["node"] = {"color": "red"}
+
+    write_dot(graph, path)
+    loaded = read_dot(path)
+
+    assert loaded.name == "graph"
+    assert loaded.graph["node"] == {"color": "red"}
+    assert list(loaded.nodes(data=True)) == [
+        ("node", {"shape": "circle"}),
+        ("a b", {}),
+        ("-1", {}),
+        ("2.5", {}),
+        ("a\\", {}),
+        ('b\\"', {}),
+    ]
+    assert list(loaded.edges(keys=True, data=True)) == [
+        ("node", "a b", "0", {"label": 'say "hi"'}),
+        ("node", "a b", "1", {"label": "$"}),
+        ("-1", "2.5", "0", {}),
+        ("a\\", 'b\\"', "0", {"label": "\\"}),
+    ]
+
+    graph = gen_labeled_two_cycles_graph(3, 4, ("a", "b"))
+    write_dot(edge_arrays_of_graph(graph), path)
+    edge_arrays = read_dot(path, edge_arrays=True)
+
+    assert edge_arrays.vertices == [str(vertex) for vertex in graph.nodes]
+    assert sorted(
+        (
+            edge_arrays.vertices[source],
+            edge_arrays.marks[label],
+            edge_arrays.vertices[target],
+        )
+        for source, target, label in zip(
+            edge_arrays.sources, edge_arrays.targets, edge_arrays.labels
+        )
+    ) == sorted(
+        (str(vertex_from), label, str(vertex_to))
+        for vertex_from, vertex_to, label in graph.edges.data("label")
+    )
@@ -0,0 +1,57 @@
+from pyformlang.regular_expression import Regex
+
+from project.utils.edge_arrays_utils import (
+    decompose_edge_arrays,
+    edge_arrays_of_graph,
+    graph_of_edge_arrays,
+)
+from project.utils.graph_utils import (
+    decompose_graph,
+    gen_labeled_two_cycles_graph,
+    get_set_of_edges,
+    regular_request,
+    regular_request_by_binary_matrixes,
+)
+from project.utils.regex_utils import build_binary_matrix_by_reg
+from common_info import regular_request_test
+
+
+def test_edge_arrays_of_graph():
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+    graph.add_edge(0, 1)
+
+    edge_arrays = edge_arrays_of_graph(graph)
+
+    assert edge_arrays.vertices == list(graph.nodes)
+    assert edge_arrays.marks == ["a", "b"]
+    assert list(edge_arrays.labels).count(-1) == 1
+    assert get_set_of_edges(graph_of_edge_arrays(edge_arrays)) == get_set_of_edges(
+        graph
+    )
+
+
+def test_decompose_edge_arrays():
+
+    for (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_vertices,
+        final_vertices,
+        expected_set,
+    ) in regular_request_test:
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+        decomposition = decompose_edge_arrays(edge_arrays_of_graph(graph))
+        expected_decomposition = decompose_graph(graph)
+
+        assert set(decomposition.indexes) == set(expected_decomposition.indexes)
+        assert set(decomposition.matrix) == set(expected_decomposition.matrix)
+
+        assert regular_request_by_binary_matrixes(
+            decomposition,
+            build_binary_matrix_by_reg(Regex(regex)),
+            starting_vertices,
+            final_vertices,
+        ) == regular_request(graph, starting_vertices, final_vertices, Regex(regex))
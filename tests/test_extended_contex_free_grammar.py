@@ -4,6 +4,8 @@ from pyformlang.cfg import Variable
 from pyformlang.regular_expression import Regex
 
 from project.grammar.extended_contex_free_grammar import (
+    ExtendedContexFreeGrammarExepction,
+    LazyRegex,
     extend_contex_free_grammar,
     extended_contex_free_grammar_from_string,
     extended_contex_free_grammar_from_file,
@@ -12,6 +14,7 @@ from project.utils.grammar_utils import read_contex_free_grammar_from_file
 from common_info import (
     path_to_grammars,
     names_of_grammar_files,
+    names_of_extended_grammar_files,
     extended_grammars,
     common_starting_symbol,
 )
@@ -56,3 +59,72 @@ def test_extended_contex_free_grammar_from_string():
             map(lambda char: Variable(char), expected_terminals)
         )
         assert extended_contex_free_grammar.starting_symbol == common_starting_symbol
+
+
+def test_extended_contex_free_grammar_productions():
+
+    for (
+        string_extended_contex_free_grammar,
+        _,
+        _,
+        expected_productions,
+    ) in extended_grammars:
+        extended_contex_free_grammar = extended_contex_free_grammar_from_string(
+            string_extended_contex_free_grammar, common_starting_symbol
+        )
+
+        assert set(extended_contex_free_grammar.productions) == set(
+            map(lambda char: Variable(char), expected_productions)
+        )
+
+        for nonterminal, regex in expected_productions.items():
+            production = extended_contex_free_grammar.productions[Variable(nonterminal)]
+
+            assert isinstance(production, LazyRegex)
+            assert production.to_epsilon_nfa().is_equivalent_to(
+                Regex(regex.replace("[", "(").replace("]", ")")).to_epsilon_nfa()
+            )
+
+
+def test_extended_contex_free_grammar_from_file():
+
+    for (
+        name_of_file,
+        starting_symbol,
+        expected_nonterminals,
+        expected_terminals,
+    ) in names_of_extended_grammar_files:
+        extended_contex_free_grammar = extended_contex_free_grammar_from_file(
+            path_to_grammars + name_of_file, starting_symbol
+        )
+
+        assert extended_contex_free_grammar.starting_symbol == starting_symbol
+        assert set(extended_contex_free_grammar.nonterminals) == set(
+            map(lambda char: Variable(char), expected_nonterminals)
+        )
+        assert set(extended_contex_free_grammar.terminals) == set(
+            map(lambda char: Variable(char), expected_terminals)
+        )
+
+
+def test_extended_contex_free_grammar_from_string_errors():
+
+    for string_extended_contex_free_grammar in [
+        "S a b",
+        "S ->",
+        "-> a",
+        "S -> ( a",
+        "S -> a )",
+        "S -> | ?",
+        "S -> ( ? a )",
+        "S -> a . ?",
+        "S -> a +?",
+        "S -> a | ?",
+    ]:
+        try:
+            extended_contex_free_grammar_from_string(
+                string_extended_contex_free_grammar, common_starting_symbol
+            )
+            assert False
+        except ExtendedContexFreeGrammarExepction:
+            assert True
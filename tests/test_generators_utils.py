@@ -0,0 +1,92 @@
+import pytest
+
+from cfpq_data import labeled_two_cycles_graph
+from numpy import unique
+
+from project.utils.edge_arrays_utils import (
+    graph_of_edge_arrays,
+    matrixes_of_edge_arrays,
+)
+from project.utils.generators_utils import (
+    GeneratorExepction,
+    gen_grid_edge_arrays,
+    gen_power_law_edge_arrays,
+    gen_random_edge_arrays,
+    gen_two_cycles_edge_arrays,
+)
+from common_info import two_cycles_edge_arrays_test
+
+
+def test_gen_two_cycles_edge_arrays():
+
+    for fst_num_nodes, snd_num_nodes in two_cycles_edge_arrays_test:
+        actual = graph_of_edge_arrays(
+            gen_two_cycles_edge_arrays(fst_num_nodes, snd_num_nodes, ("a", "b"))
+        )
+        expected = labeled_two_cycles_graph(
+            fst_num_nodes, snd_num_nodes, labels=("a", "b")
+        )
+
+        assert list(actual.nodes) == list(expected.nodes)
+        assert list(actual.edges(keys=True, data=True)) == list(
+            expected.edges(keys=True, data=True)
+        )
+
+    with pytest.raises(GeneratorExepction):
+        gen_two_cycles_edge_arrays(0, 1)
+
+
+def test_gen_random_edge_arrays():
+
+    edge_arrays = gen_random_edge_arrays(100, 0.1, ("a", "b", "c"), seed=42)
+
+    same_edge_arrays = gen_random_edge_arrays(100, 0.1, ("a", "b", "c"), 42)
+    for name in ("sources", "targets", "labels"):
+        assert (getattr(edge_arrays, name) == getattr(same_edge_arrays, name)).all()
+    assert 800 < len(edge_arrays.sources) < 1200
+    assert (edge_arrays.sources != edge_arrays.targets).all()
+    assert len(unique(edge_arrays.sources * 100 + edge_arrays.targets)) == len(
+        edge_arrays.sources
+    )
+    assert set(edge_arrays.labels) == {0, 1, 2}
+
+    assert len(gen_random_edge_arrays(10, 1).sources) == 90
+    assert len(gen_random_edge_arrays(10, 0).sources) == 0
+
+    with pytest.raises(GeneratorExepction):
+        gen_random_edge_arrays(10, 2)
+
+
+def test_gen_power_law_edge_arrays():
+
+    edge_arrays = gen_power_law_edge_arrays(1000, 5000, seed=42)
+    degrees = (
+        matrixes_of_edge_arrays(edge_arrays)["a"]
+        + matrixes_of_edge_arrays(edge_arrays)["b"]
+    ).sum(axis=1)
+
+    assert len(edge_arrays.sources) <= 5000
+    assert degrees[:10].sum() > degrees[-100:].sum()
+    assert (
+        gen_power_law_edge_arrays(1000, 5000, seed=42).labels == edge_arrays.labels
+    ).all()
+
+    with pytest.raises(GeneratorExepction):
+        gen_power_law_edge_arrays(10, 10, exponent=1)
+
+
+def test_gen_grid_edge_arrays():
+
+    edge_arrays = gen_grid_edge_arrays(2, 3, ("right", "down"))
+    graph = graph_of_edge_arrays(edge_arrays)
+
+    assert len(graph.nodes) == 6
+    assert set(graph.edges.data("label")) == {
+        (0, 1, "right"),
+        (1, 2, "right"),
+        (3, 4, "right"),
+        (4, 5, "right"),
+        (0, 3, "down"),
+        (1, 4, "down"),
+        (2, 5, "down"),
+    }
@@ -0,0 +1,66 @@
+import pytest
+
+from pyformlang.cfg import CFG, Variable
+
+from project.grammar.extended_contex_free_grammar import (
+    extended_contex_free_grammar_from_string,
+)
+from project.grammar.grammar_analysis import (
+    analyze_grammar,
+    prune_graph_by_grammar,
+)
+from project.utils.graph_utils import gen_labeled_two_cycles_graph
+from common_info import grammars_for_analysis, extended_grammars_for_analysis
+
+
+def test_analyze_contex_free_grammar():
+
+    for (
+        grammar,
+        starting_symbol,
+        expected_nullable,
+        expected_generating,
+        expected_reachable,
+        expected_first,
+        expected_follow,
+        expected_relevant_labels,
+    ) in grammars_for_analysis:
+        analysis = analyze_grammar(CFG.from_text(grammar, Variable(starting_symbol)))
+
+        assert analysis.starting_symbol == starting_symbol
+        assert analysis.nullable == expected_nullable
+        assert analysis.generating == expected_generating
+        assert analysis.reachable == expected_reachable
+        assert analysis.first == expected_first
+        assert analysis.follow == expected_follow
+        assert analysis.relevant_labels == expected_relevant_labels
+
+
+def test_analyze_extended_contex_free_grammar():
+
+    for (
+        grammar,
+        starting_symbol,
+        expected_nullable,
+        expected_reachable,
+        expected_relevant_labels,
+    ) in extended_grammars_for_analysis:
+        analysis = analyze_grammar(
+            extended_contex_free_grammar_from_string(grammar, starting_symbol)
+        )
+
+        assert analysis.nullable == expected_nullable
+        assert analysis.reachable == expected_reachable
+        assert analysis.relevant_labels == expected_relevant_labels
+
+
+def test_prune_graph_by_grammar():
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+    pruned_graph = prune_graph_by_grammar(
+        graph, CFG.from_text("S -> a S | a", Variable("S"))
+    )
+
+    assert set(pruned_graph.nodes) == set(graph.nodes)
+    assert pruned_graph.number_of_edges() == 4
+    assert {label for _, _, label in pruned_graph.edges(data="label")} == {"a"}
@@ -3,6 +3,7 @@ import pytest
 from pyformlang.cfg import CFG, Variable
 
 from project.utils.grammar_utils import (
+    clear_weak_chomsky_forms_cache,
     contex_free_to_weak_chomsky_form,
     read_contex_free_grammar_from_file,
 )
@@ -32,6 +33,52 @@ def test_contex_free_to_weak_chomsky_form():
         assert weak_chomsky_form.productions == expected_grammar.productions
 
 
+def test_contex_free_to_weak_chomsky_form_from_cfg():
+
+    for (
+        contex_free_form,
+        contex_free_form_starting_nonterminal,
+        expected_grammar,
+        expected_grammar_starting_symbol,
+    ) in contex_free_and_weak_chomsky_forms:
+        weak_chomsky_form = contex_free_to_weak_chomsky_form(
+            CFG.from_text(
+                contex_free_form, Variable(contex_free_form_starting_nonterminal)
+            )
+        )
+        expected_grammar = CFG.from_text(
+            expected_grammar, Variable(expected_grammar_starting_symbol)
+        )
+
+        assert weak_chomsky_form.start_symbol == expected_grammar.start_symbol
+        assert weak_chomsky_form.productions == expected_grammar.productions
+
+
+def test_contex_free_to_weak_chomsky_form_is_memoized():
+
+    clear_weak_chomsky_forms_cache()
+
+    for (
+        contex_free_form,
+        starting_nonterminal,
+        _,
+        _,
+    ) in contex_free_and_weak_chomsky_forms:
+        weak_chomsky_form = contex_free_to_weak_chomsky_form(
+            contex_free_form, starting_nonterminal
+        )
+
+        assert weak_chomsky_form is contex_free_to_weak_chomsky_form(
+            contex_free_form, starting_nonterminal
+        )
+        contex_free_grammar = CFG.from_text(
+            contex_free_form, Variable(starting_nonterminal)
+        )
+        assert contex_free_to_weak_chomsky_form(
+            contex_free_grammar
+        ) is contex_free_to_weak_chomsky_form(contex_free_grammar)
+
+
 def test_read_contex_free_grammar_from_file():
 
     for (
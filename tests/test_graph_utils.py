@@ -4,8 +4,10 @@ from filecmp import cmp
 
 from cfpq_data import labeled_two_cycles_graph
 from networkx import MultiDiGraph, algorithms, is_isomorphic
+from pyformlang.finite_automaton import State
 from pyformlang.regular_expression import Regex
 
+import project.utils.bin_matrix_utils as bin_matrix_utils
 from project.utils.graph_utils import (
     gen_labeled_two_cycles_graph,
     get_graph,
@@ -13,15 +15,29 @@ from project.utils.graph_utils import (
     get_set_of_edges,
     regular_request,
     bfs_regular_request,
+    semiring_regular_request,
     save_as_dot,
     load_from_dot,
+    bfs_by_direction,
+    decompose_graph,
+    exists,
+    exists_by_binary_matrixes,
+    iter_bfs_regular_request,
 )
+from project.utils.regex_utils import build_binary_matrix_by_reg
 from common_info import (
     path_to_graphs,
     path_to_results,
     path_to_bfs_test_graphs,
     regular_request_test,
     bfs_regular_request_test,
+    counting_paths_test,
+    batch_regular_request_test,
+)
+from project.utils.semiring_utils import (
+    BOOLEAN_SEMIRING,
+    MIN_PLUS_SEMIRING,
+    counting_semiring,
 )
 
 sample_info = get_info("skos")
@@ -176,3 +192,470 @@ def test_bfs_regular_non_separated_request_at_graph():
             bfs_regular_request(graph, Regex(regex), starting_states, final_states)
             == non_separated_variant_expected_set
         )
+
+
+def is_satisfying_path(graph: MultiDiGraph, path: list, regex: str) -> bool:
+
+    edges = get_set_of_edges(graph)
+
+    return (
+        all(edge in edges for edge in path)
+        and all(path[i][2] == path[i + 1][0] for i in range(len(path) - 1))
+        and Regex(regex).accepts([label for _, label, _ in path])
+    )
+
+
+def test_regular_request_with_witness():
+
+    for (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_states,
+        final_states,
+        expected_set,
+    ) in regular_request_test:
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+        paths = regular_request(
+            graph, starting_states, final_states, Regex(regex), witness=True
+        )
+
+        assert set(paths.keys()) == expected_set
+
+        for (starting_state, final_state), path in paths.items():
+            assert path[0][0] == starting_state and path[-1][2] == final_state
+            assert is_satisfying_path(graph, path, regex)
+
+
+def test_bfs_regular_request_with_witness():
+
+    for (
+        graph_name,
+        regex,
+        starting_states,
+        final_states,
+        separated_variant_expected_set,
+        non_separated_variant_expected_set,
+    ) in bfs_regular_request_test:
+        graph = load_from_dot(path_to_bfs_test_graphs + graph_name)
+
+        separated_paths = bfs_regular_request(
+            graph, Regex(regex), starting_states, final_states, True, witness=True
+        )
+        non_separated_paths = bfs_regular_request(
+            graph, Regex(regex), starting_states, final_states, witness=True
+        )
+
+        assert set(separated_paths.keys()) == separated_variant_expected_set
+        assert set(non_separated_paths.keys()) == non_separated_variant_expected_set
+
+        for (starting_state, final_state), path in separated_paths.items():
+            assert path[0][0] == starting_state and path[-1][2] == final_state
+            assert is_satisfying_path(graph, path, regex)
+
+        for final_state, path in non_separated_paths.items():
+            assert path[0][0] in starting_states and path[-1][2] == final_state
+            assert is_satisfying_path(graph, path, regex)
+
+
+def test_witness_paths_are_shortest():
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+    paths = regular_request(graph, {1}, {0}, Regex("a* b* a*"), witness=True)
+
+    assert paths == {(1, 0): [(1, "a", 2), (2, "a", 3), (3, "a", 0)]}
+
+
+def test_bounded_regular_request():
+
+    for (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_states,
+        final_states,
+        expected_set,
+    ) in regular_request_test:
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+        paths = regular_request(
+            graph, starting_states, final_states, Regex(regex), witness=True
+        )
+
+        for max_length in range(fst_num_nodes + snd_num_nodes + 2):
+            distances = regular_request(
+                graph,
+                starting_states,
+                final_states,
+                Regex(regex),
+                max_length=max_length,
+            )
+
+            assert distances == {
+                pair: len(path)
+                for pair, path in paths.items()
+                if len(path) <= max_length
+            }
+
+
+def test_bounded_bfs_regular_request():
+
+    for (
+        graph_name,
+        regex,
+        starting_states,
+        final_states,
+        _,
+        _,
+    ) in bfs_regular_request_test:
+        graph = load_from_dot(path_to_bfs_test_graphs + graph_name)
+
+        for separated_flag in [True, False]:
+            paths = bfs_regular_request(
+                graph,
+                Regex(regex),
+                starting_states,
+                final_states,
+                separated_flag,
+                witness=True,
+            )
+
+            for max_length in range(4):
+                distances = bfs_regular_request(
+                    graph,
+                    Regex(regex),
+                    starting_states,
+                    final_states,
+                    separated_flag,
+                    max_length=max_length,
+                )
+
+                assert distances == {
+                    key: len(path)
+                    for key, path in paths.items()
+                    if len(path) <= max_length
+                }
+
+
+def test_semiring_regular_request():
+
+    for (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_states,
+        final_states,
+        expected_set,
+    ) in regular_request_test:
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+        paths = regular_request(
+            graph, starting_states, final_states, Regex(regex), witness=True
+        )
+
+        reachable = semiring_regular_request(
+            graph, starting_states, final_states, Regex(regex), BOOLEAN_SEMIRING
+        )
+        distances = semiring_regular_request(
+            graph, starting_states, final_states, Regex(regex), MIN_PLUS_SEMIRING
+        )
+
+        assert set(reachable) == expected_set
+        assert distances == {pair: len(path) for pair, path in paths.items()}
+
+
+def test_counting_regular_request():
+
+    for (
+        edges,
+        regex,
+        starting_states,
+        final_states,
+        cap,
+        max_length,
+        expected,
+    ) in counting_paths_test:
+        graph = MultiDiGraph()
+        for state_from, mark, state_to in edges:
+            graph.add_edge(state_from, state_to, label=mark)
+
+        counts = semiring_regular_request(
+            graph,
+            starting_states,
+            final_states,
+            Regex(regex),
+            counting_semiring(cap),
+            max_length,
+        )
+
+        assert counts == expected
+
+
+def test_separated_bfs_regular_request_with_many_starting_vertices():
+
+    graph = gen_labeled_two_cycles_graph(4, 3, ("a", "b"))
+
+    for regex in batch_regular_request_test:
+        expected = {
+            (starting_vertex, final_vertex)
+            for starting_vertex in graph.nodes
+            for final_vertex in bfs_regular_request(
+                graph, Regex(regex), {starting_vertex}, None
+            )
+        }
+
+        assert bfs_regular_request(graph, Regex(regex), None, None, True) == expected
+
+
+def test_requests_with_threads():
+
+    graph = gen_labeled_two_cycles_graph(4, 3, ("a", "b"))
+
+    for regex in batch_regular_request_test:
+        for max_length in [None, 3]:
+            assert regular_request(
+                graph, set(), set(), Regex(regex), max_length=max_length, threads=4
+            ) == regular_request(
+                graph, set(), set(), Regex(regex), max_length=max_length
+            )
+            for separated_flag in [True, False]:
+                assert bfs_regular_request(
+                    graph,
+                    Regex(regex),
+                    separated_flag=separated_flag,
+                    max_length=max_length,
+                    threads=4,
+                ) == bfs_regular_request(
+                    graph,
+                    Regex(regex),
+                    separated_flag=separated_flag,
+                    max_length=max_length,
+                )
+
+
+def test_bfs_regular_request_in_all_directions():
+
+    graph = gen_labeled_two_cycles_graph(4, 3, ("a", "b"))
+    vertices = [
+        (set(), set()),
+        ({0, 1}, set()),
+        (set(), {2}),
+        ({3, 4, 5}, {1, 7}),
+    ]
+
+    for regex in batch_regular_request_test:
+        for starting_vertices, final_vertices in vertices:
+            for separated_flag in [True, False]:
+                for max_length in [None, 3]:
+                    expected = bfs_regular_request(
+                        graph,
+                        Regex(regex),
+                        set(starting_vertices),
+                        set(final_vertices),
+                        separated_flag,
+                        max_length=max_length,
+                        direction="forward",
+                    )
+                    for direction in ["backward", "bidirectional", None]:
+                        assert (
+                            bfs_regular_request(
+                                graph,
+                                Regex(regex),
+                                set(starting_vertices),
+                                set(final_vertices),
+                                separated_flag,
+                                max_length=max_length,
+                                direction=direction,
+                            )
+                            == expected
+                        )
+
+
+def test_bfs_regular_request_in_dense_and_sparse_formats(monkeypatch):
+
+    graph = gen_labeled_two_cycles_graph(4, 3, ("a", "b"))
+
+    for regex in batch_regular_request_test:
+        results = []
+        for dense_threshold in [0.0, 0.3, 2.0]:
+            monkeypatch.setattr(
+                bin_matrix_utils, "DENSITY_OF_DENSE_MATRIXES", dense_threshold
+            )
+            results.append(
+                [
+                    bfs_regular_request(
+                        graph,
+                        Regex(regex),
+                        {0, 1},
+                        None,
+                        separated_flag,
+                        max_length=max_length,
+                        threads=threads,
+                        direction="forward",
+                    )
+                    for separated_flag in [True, False]
+                    for max_length in [None, 3]
+                    for threads in [None, 2]
+                ]
+            )
+
+        assert results[0] == results[1] == results[2]
+
+
+def test_iter_bfs_regular_request():
+
+    for (
+        graph_name,
+        regex,
+        starting_states,
+        final_states,
+        separated_variant_expected_set,
+        expected_set,
+    ) in bfs_regular_request_test:
+        graph = load_from_dot(path_to_bfs_test_graphs + graph_name)
+        for separated_flag, expected in [
+            (True, separated_variant_expected_set),
+            (False, expected_set),
+        ]:
+            reached = list(
+                iter_bfs_regular_request(
+                    graph, Regex(regex), starting_states, final_states, separated_flag
+                )
+            )
+            assert len(reached) == len(expected)
+            assert set(reached) == expected
+            assert dict(
+                iter_bfs_regular_request(
+                    graph,
+                    Regex(regex),
+                    starting_states,
+                    final_states,
+                    separated_flag,
+                    max_length=2,
+                )
+            ) == bfs_regular_request(
+                graph,
+                Regex(regex),
+                starting_states,
+                final_states,
+                separated_flag,
+                max_length=2,
+            )
+
+
+def test_requests_with_limit():
+
+    for (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_vertices,
+        final_vertices,
+        expected_set,
+    ) in regular_request_test:
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+
+        for limit in [0, 1, 3, len(expected_set)]:
+            result = regular_request(
+                graph, starting_vertices, final_vertices, Regex(regex), limit=limit
+            )
+            assert len(result) == min(limit, len(expected_set))
+            assert result <= expected_set
+
+            result = bfs_regular_request(
+                graph, Regex(regex), starting_vertices, final_vertices, limit=limit
+            )
+            assert len(result) == min(
+                limit, len({vertex_to for _, vertex_to in expected_set})
+            )
+
+        paths = regular_request(
+            graph, starting_vertices, final_vertices, Regex(regex), witness=True
+        )
+        for limit in [0, 1, 3]:
+            result = regular_request(
+                graph,
+                starting_vertices,
+                final_vertices,
+                Regex(regex),
+                witness=True,
+                limit=limit,
+            )
+            assert len(result) == min(limit, len(paths))
+            assert all(len(path) == len(paths[key]) for key, path in result.items())
+
+        for options in [
+            {"memory_budget": 1024, "workers": 2},
+            {"memory_budget": 1024, "limit": 1},
+            {"workers": 2, "max_length": 3},
+            {"workers": 2, "witness": True},
+            {"threads": 2, "witness": True},
+            {"threads": 2, "memory_budget": 1024},
+        ]:
+            with pytest.raises(ValueError):
+                regular_request(
+                    graph, starting_vertices, final_vertices, Regex(regex), **options
+                )
+
+        for options in [{"threads": 2}, {"direction": "backward"}]:
+            with pytest.raises(ValueError):
+                bfs_regular_request(
+                    graph,
+                    Regex(regex),
+                    starting_vertices,
+                    final_vertices,
+                    witness=True,
+                    **options,
+                )
+
+
+def test_exists():
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+
+    assert exists(graph, 0, 1, Regex("a"))
+    assert exists(graph, 1, 0, Regex("a a a"))
+    assert exists(graph, 0, 0, Regex("a* b*"))
+    assert not exists(graph, 0, 1, Regex("b*"))
+    assert not exists(graph, 1, 0, Regex("a*"), max_length=2)
+    assert not exists(graph, 0, 42, Regex("a*"))
+    assert not exists(graph, 42, 0, Regex("a*"))
+
+    decomposition = decompose_graph(graph)
+    for (vertex_from, vertex_to, regex), expected in [
+        ((0, 1, "a"), True),
+        ((1, 0, "a a a"), True),
+        ((0, 1, "b*"), False),
+        ((0, 42, "a*"), False),
+    ]:
+        assert (
+            exists_by_binary_matrixes(
+                decomposition,
+                build_binary_matrix_by_reg(Regex(regex)),
+                vertex_from,
+                vertex_to,
+            )
+            == expected
+        )
+
+
+def test_streaming_bfs_stops_after_first_result():
+
+    graph = gen_labeled_two_cycles_graph(100, 100, ("a", "b"))
+    binary_matrix_of_request = build_binary_matrix_by_reg(Regex("a*"))
+    binary_matrix_of_graph = decompose_graph(graph)
+    binary_matrix_of_graph = binary_matrix_of_graph._replace(starting_states={State(1)})
+
+    for streaming, expected_count in [(True, 1), (False, 102)]:
+        expansions = []
+        next(
+            bfs_by_direction(
+                binary_matrix_of_request,
+                binary_matrix_of_graph,
+                on_iteration=expansions.append,
+                streaming=streaming,
+            )
+        )
+        assert len(expansions) == expected_count
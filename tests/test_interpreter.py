@@ -0,0 +1,142 @@
+import pytest
+
+import io
+
+from pyformlang.regular_expression import Regex
+
+import project.language.interpreter as interpreter
+from project.language.interpreter import (
+    QueryInterpreter,
+    QueryInterpreterExepction,
+    interpret,
+)
+from project.language.query_parser import QueryParserExepction
+from project.utils.graph_utils import load_from_dot, regular_request
+from common_info import (
+    path_to_graphs,
+    query_errors_test,
+    query_programs_test,
+    query_regular_requests_test,
+)
+
+
+def run_program(program: str) -> list:
+
+    output = io.StringIO()
+    interpret(program, output)
+
+    return output.getvalue().splitlines()
+
+
+def test_programs():
+
+    for program, expected_lines in query_programs_test:
+        assert run_program(program) == expected_lines
+
+
+def test_regular_requests_are_the_same_as_by_regular_request():
+
+    path = path_to_graphs + "sample_graph.dot"
+    graph = load_from_dot(path)
+
+    for (
+        regex,
+        expression,
+        starting_vertices,
+        final_vertices,
+    ) in query_regular_requests_test:
+        expected = {
+            (int(vertex_from.value), int(vertex_to.value))
+            for vertex_from, vertex_to in regular_request(
+                graph,
+                {str(vertex) for vertex in starting_vertices},
+                {str(vertex) for vertex in final_vertices},
+                Regex(regex),
+            )
+        }
+
+        program = f'let g = load("{path}")\n'
+        if starting_vertices:
+            program += f"let g = set_start({set(starting_vertices)}, g)\n"
+        if final_vertices:
+            program += f"let g = set_final({set(final_vertices)}, g)\n"
+        program += (
+            f"let r = get_reachable(g & ({expression}))\n"
+            "let r = map(fun ((u, _), (v, _)) -> (u, v), r)"
+        )
+
+        assert interpret(program, io.StringIO())["r"] == expected
+
+
+def test_subexpressions_are_memoized_and_lazy(monkeypatch):
+
+    compiled = []
+    build_binary_matrix_by_postfix = interpreter.build_binary_matrix_by_postfix
+    monkeypatch.setattr(
+        interpreter,
+        "build_binary_matrix_by_postfix",
+        lambda postfix: compiled.append(postfix)
+        or build_binary_matrix_by_postfix(postfix),
+    )
+
+    query_interpreter = QueryInterpreter(io.StringIO())
+    query_interpreter.run(
+        f'let g = load("{path_to_graphs}sample_graph.dot")\n'
+        'let q = ("a" | "b")* . "b"\n'
+        "let r = g & q\n"
+        'let missing = load("missing.dot") & q\n'
+        "print r"
+    )
+    assert compiled == []
+
+    query_interpreter.run(
+        "let first = get_reachable(r)\n"
+        'let second = get_reachable(g & ("a" | "b")* . "b")\n'
+        'let edges = get_edges(("a" | "b")* . "b")'
+    )
+    assert len(compiled) == 1
+    assert query_interpreter.environment["first"] == (
+        query_interpreter.environment["second"]
+    )
+    assert len(query_interpreter.compiled) == 3
+
+
+def test_shared_regular_subexpressions(monkeypatch):
+
+    compiled = []
+    build_binary_matrix_by_postfix = interpreter.build_binary_matrix_by_postfix
+    monkeypatch.setattr(
+        interpreter,
+        "build_binary_matrix_by_postfix",
+        lambda postfix: compiled.append(postfix)
+        or build_binary_matrix_by_postfix(postfix),
+    )
+
+    query_interpreter = QueryInterpreter(io.StringIO())
+    query_interpreter.run(
+        'let r = "a" . "b"*\n'
+        + "let r = r | r\n" * 40
+        + 'let g = load("missing.dot")\n'
+        + "let g = g | g\n"
+        + "let edges = get_edges(r)"
+    )
+    assert len(compiled) == 1 and len(compiled[0]) == 4
+    assert query_interpreter.environment["r"] == interpreter.Automaton(
+        "concat",
+        None,
+        (
+            interpreter.Automaton("symbol", "a", ()),
+            interpreter.Automaton(
+                "star", None, (interpreter.Automaton("symbol", "b", ()),)
+            ),
+        ),
+    )
+    assert query_interpreter.environment["g"].operation == "union"
+
+
+def test_errors():
+
+    for program, message in query_errors_test:
+        with pytest.raises((QueryParserExepction, QueryInterpreterExepction)) as error:
+            interpret(program, io.StringIO())
+        assert error.value.message.startswith(message)
@@ -0,0 +1,96 @@
+import pytest
+
+import io
+import subprocess
+import sys
+
+from pyformlang.regular_expression import Regex
+
+from project.__main__ import main
+from project.utils.graph_utils import (
+    gen_labeled_two_cycles_graph,
+    regular_request,
+    save_as_dot,
+)
+from common_info import contex_free_request_test, regular_request_test
+
+
+def run_command(arguments: list) -> set:
+
+    output = io.StringIO()
+    main(arguments, output)
+
+    return {tuple(line.split("\t")) for line in output.getvalue().splitlines()}
+
+
+def test_regular_command(tmp_path):
+
+    for i, (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_states,
+        final_states,
+        _,
+    ) in enumerate(regular_request_test):
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+        path = tmp_path / f"graph_{i}.dot"
+        save_as_dot(graph, path)
+
+        expected = {
+            (str(vertex_from.value), str(vertex_to.value))
+            for vertex_from, vertex_to in regular_request(
+                graph, starting_states, final_states, Regex(regex)
+            )
+        }
+        arguments = [str(path), regex, "--start", *map(str, starting_states)]
+        arguments += ["--final", *map(str, final_states)]
+
+        assert run_command(["regular", *arguments]) == expected
+        assert run_command(["regular", *arguments, "--algorithm", "bfs"]) == expected
+
+
+def test_cfg_command(tmp_path):
+
+    for i, (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        grammar,
+        starting_vertices,
+        final_vertices,
+        expected_set,
+    ) in enumerate(contex_free_request_test):
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+        path_to_graph = tmp_path / f"graph_{i}.dot"
+        save_as_dot(graph, path_to_graph)
+        path_to_grammar = tmp_path / f"grammar_{i}.txt"
+        path_to_grammar.write_text(grammar)
+
+        arguments = ["cfg", str(path_to_graph), str(path_to_grammar)]
+        arguments += ["--start", *map(str, starting_vertices or [])]
+        arguments += ["--final", *map(str, final_vertices or [])]
+
+        assert run_command(arguments) == {
+            (str(vertex_from), str(vertex_to))
+            for vertex_from, vertex_to in expected_set
+        }
+
+
+def test_heavy_modules_are_imported_lazily():
+
+    imported = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, project.__main__, project.utils.graph_utils;"
+            "print(' '.join(sorted(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    assert "cfpq_data" not in imported
+    assert "pydot" not in imported
@@ -0,0 +1,122 @@
+import pytest
+
+from project.language.query_parser import (
+    Expression,
+    Let,
+    Print,
+    QueryParserExepction,
+    parse_program,
+    tokenize_program,
+)
+
+
+def test_tokenize_program():
+
+    assert [
+        (token.kind, token.value)
+        for token in tokenize_program('let g\' = {0..10} # comment\nprint "a\\"b"')
+    ] == [
+        ("keyword", "let"),
+        ("name", "g'"),
+        ("=", "="),
+        ("{", "{"),
+        ("int", 0),
+        ("..", ".."),
+        ("int", 10),
+        ("}", "}"),
+        ("keyword", "print"),
+        ("string", 'a"b'),
+        ("end", None),
+    ]
+    assert tokenize_program("\n\nprint x")[-1].line == 3
+
+
+def test_priorities_of_operators():
+
+    symbol_a = Expression("string", "a", ())
+    symbol_b = Expression("string", "b", ())
+    symbol_c = Expression("string", "c", ())
+
+    assert parse_program('print "a" | "b" . "c"*') == [
+        Print(
+            Expression(
+                "union",
+                None,
+                (
+                    symbol_a,
+                    Expression(
+                        "concat",
+                        None,
+                        (symbol_b, Expression("star", None, (symbol_c,))),
+                    ),
+                ),
+            ),
+            1,
+        )
+    ]
+    assert parse_program('let x = "a" & "b" | "c"') == [
+        Let(
+            "x",
+            Expression(
+                "union",
+                None,
+                (Expression("intersect", None, (symbol_a, symbol_b)), symbol_c),
+            ),
+            1,
+        )
+    ]
+    assert parse_program("print not x in s or true")[0].expression == Expression(
+        "or",
+        None,
+        (
+            Expression(
+                "not",
+                None,
+                (
+                    Expression(
+                        "in",
+                        None,
+                        (Expression("var", "x", ()), Expression("var", "s", ())),
+                    ),
+                ),
+            ),
+            Expression("bool", True, ()),
+        ),
+    )
+
+
+def test_parse_constructions():
+
+    assert parse_program("print {}")[0].expression == Expression("set", None, ())
+    assert parse_program("print {1..2}")[0].expression == Expression(
+        "range", None, (Expression("int", 1, ()), Expression("int", 2, ()))
+    )
+    assert parse_program("print (1)")[0].expression == Expression("int", 1, ())
+    assert parse_program("print fun ((u, _), v) -> u")[0].expression == Expression(
+        "lambda", (("u", "_"), "v"), (Expression("var", "u", ()),)
+    )
+    assert parse_program('print set_start({1}, load("g.dot"))')[
+        0
+    ].expression == Expression(
+        "call",
+        "set_start",
+        (
+            Expression("set", None, (Expression("int", 1, ()),)),
+            Expression("call", "load", (Expression("string", "g.dot", ()),)),
+        ),
+    )
+
+
+def test_identical_subexpressions_are_equal():
+
+    first, second = parse_program('let x = ("a" | "b")* & g\nlet y = ("a" | "b")* & g')
+
+    assert first.expression == second.expression
+    assert hash(first.expression) == hash(second.expression)
+
+
+def test_misformed_programs():
+
+    for program in ["print", "let = 1", "let x 1", "print (1", "print {1,}", "x"]:
+        with pytest.raises(QueryParserExepction):
+            parse_program(program)
@@ -0,0 +1,188 @@
+import pytest
+
+import asyncio
+import json
+import time
+
+from pyformlang.regular_expression import Regex
+
+from project.server.query_server import QueryServer, QueryServerExepction
+from project.utils.graph_utils import (
+    gen_labeled_two_cycles_graph,
+    load_from_dot,
+    regular_request,
+)
+from common_info import path_to_graphs, regular_request_test
+
+
+async def send_requests(server: QueryServer, requests: list) -> dict:
+
+    tcp_server = await server.start()
+    host, port = tcp_server.sockets[0].getsockname()[:2]
+
+    reader, writer = await asyncio.open_connection(host, port)
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    writer.write_eof()
+
+    responses = {}
+    while line := await reader.readline():
+        response = json.loads(line)
+        responses[response["id"]] = response
+
+    writer.close()
+    server.close()
+
+    return responses
+
+
+def test_queries_over_socket():
+
+    graphs = {}
+    requests = []
+    expected = {}
+
+    for i, (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_states,
+        final_states,
+        expected_set,
+    ) in enumerate(regular_request_test):
+        name = f"{fst_num_nodes}_{snd_num_nodes}_{marks[0]}_{marks[1]}"
+        graphs[name] = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+        requests.append(
+            {
+                "id": i,
+                "graph": name,
+                "regex": regex,
+                "starting_vertices": list(starting_states),
+                "final_vertices": list(final_states),
+            }
+        )
+        expected[i] = expected_set
+
+    server = QueryServer(graphs, workers=2)
+    responses = asyncio.run(send_requests(server, requests))
+
+    for i, expected_set in expected.items():
+        assert {tuple(pair) for pair in responses[i]["result"]} == expected_set
+
+
+def test_errors_of_server():
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+    requests = [
+        {"id": "unknown graph", "graph": "other", "regex": "a"},
+        {"id": "unknown command", "command": "drop"},
+        {"id": "ping", "command": "ping"},
+        {"id": "graphs", "command": "graphs"},
+        {"id": "vertices", "graph": "graph", "regex": "a", "starting_vertices": 5},
+        {"id": "regex", "graph": "graph", "regex": 5},
+        {"id": "after errors", "graph": "graph", "regex": "a", "final_vertices": [1]},
+    ]
+
+    server = QueryServer({"graph": graph}, workers=1)
+    responses = asyncio.run(send_requests(server, requests))
+
+    assert "error" in responses["unknown graph"]
+    assert "error" in responses["unknown command"]
+    assert responses["ping"]["result"] == "pong"
+    assert responses["graphs"]["result"] == {"graph": {"nodes": 6, "edges": 7}}
+    assert "error" in responses["vertices"]
+    assert "error" in responses["regex"]
+    assert {tuple(pair) for pair in responses["after errors"]["result"]} == {(0, 1)}
+
+
+def test_admission_control_and_timeout():
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+    request = {"id": 0, "graph": "graph", "regex": "a* b*"}
+
+    server = QueryServer({"graph": graph}, workers=1, max_pending=0)
+    assert "error" in asyncio.run(server.handle_request(request))
+    server.close()
+
+    server = QueryServer({"graph": graph}, workers=1, timeout=0)
+    assert "error" in asyncio.run(server.handle_request(request))
+    server.close()
+
+    server = QueryServer({"graph": graph}, workers=1, heavy_cost=0)
+    response = asyncio.run(server.handle_request(request))
+    server.close()
+
+    assert {tuple(pair) for pair in response["result"]} == regular_request(
+        graph, set(), set(), Regex("a* b*")
+    )
+
+
+def test_timed_out_and_heavy_queries_do_not_block_workers():
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+    server = QueryServer({"graph": graph}, workers=1, timeout=0.5)
+
+    async def evaluate():
+        with pytest.raises(QueryServerExepction):
+            await server._evaluate(False, time.sleep, 30)
+        light = await server._evaluate(False, abs, -1)
+
+        heavy = asyncio.create_task(server._evaluate(True, time.sleep, 0.3))
+        await asyncio.sleep(0.1)
+        start = time.perf_counter()
+        assert await server._evaluate(False, abs, -2) == 2
+        is_waited = time.perf_counter() - start > 0.15
+        await heavy
+
+        return light, is_waited
+
+    start = time.perf_counter()
+    light, is_waited = asyncio.run(evaluate())
+    server.close()
+
+    assert light == 1 and not is_waited
+    assert time.perf_counter() - start < 10
+
+
+def test_vertices_are_matched_by_names():
+
+    graph = load_from_dot(path_to_graphs + "sample_graph.dot")
+    vertex = next(iter(graph.nodes))
+    server = QueryServer({"graph": graph}, workers=1)
+
+    async def answer():
+        return [
+            await server.handle_request(
+                {
+                    "id": 0,
+                    "graph": "graph",
+                    "regex": "a*",
+                    "starting_vertices": vertices,
+                }
+            )
+            for vertices in ([int(vertex)], [str(vertex)], ["missing"])
+        ]
+
+    by_number, by_name, missing = asyncio.run(answer())
+    server.close()
+
+    assert by_number["result"] == by_name["result"] != []
+    assert "error" in missing
+
+
+def test_unexpected_error_becomes_response(monkeypatch):
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+    server = QueryServer({"graph": graph}, workers=1)
+
+    async def broken_answer(request):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(server, "_answer", broken_answer)
+    response = asyncio.run(server.handle_request({"id": 7}))
+    server.close()
+
+    assert response["id"] == 7
+    assert "broken" in response["error"]
@@ -2,7 +2,16 @@ import pytest
 
 from copy import deepcopy
 
+from pyformlang.cfg import Variable
+from pyformlang.regular_expression import Regex
+
 from project.grammar.recursive_state_machines import (
+    _boxes_cache,
+    clear_boxes_cache,
+    compile_boxes,
+    compile_recursive_state_machine,
+    load_compiled_recursive_state_machine,
+    save_compiled_recursive_state_machine,
     recursive_state_machine_from_extended_contex_free_grammar,
     minimize_recursive_state_machine,
 )
@@ -64,3 +73,150 @@ def test_minimize_recursive_state_machine():
             assert minimized_recursive_state_machine.subautomatons[
                 nonterminal
             ].is_equivalent_to(recursive_state_machine.subautomatons[nonterminal])
+
+
+def test_parallel_recursive_state_machine_is_equal_to_serial():
+
+    string_extended_contex_free_grammar = "\n".join(
+        f"N{i} -> a N{i + 1}* | b ( c | N{i} )" for i in range(32)
+    )
+
+    clear_boxes_cache()
+    serial_recursive_state_machine = (
+        recursive_state_machine_from_extended_contex_free_grammar(
+            string_extended_contex_free_grammar, "N0", minimize=True, workers=1
+        )
+    )
+    clear_boxes_cache()
+    parallel_recursive_state_machine = (
+        recursive_state_machine_from_extended_contex_free_grammar(
+            string_extended_contex_free_grammar, "N0", minimize=True, workers=2
+        )
+    )
+
+    assert list(serial_recursive_state_machine.subautomatons) == list(
+        parallel_recursive_state_machine.subautomatons
+    )
+
+    for (
+        nonterminal,
+        subautomata,
+    ) in serial_recursive_state_machine.subautomatons.items():
+        assert subautomata.is_equivalent_to(
+            parallel_recursive_state_machine.subautomatons[nonterminal]
+        )
+
+    minimized_recursive_state_machine = minimize_recursive_state_machine(
+        recursive_state_machine_from_extended_contex_free_grammar(
+            string_extended_contex_free_grammar, "N0"
+        ),
+        workers=2,
+    )
+
+    for (
+        nonterminal,
+        subautomata,
+    ) in serial_recursive_state_machine.subautomatons.items():
+        assert subautomata.is_equivalent_to(
+            minimized_recursive_state_machine.subautomatons[nonterminal]
+        )
+
+
+def test_compile_boxes_reuses_unchanged_boxes():
+
+    clear_boxes_cache()
+    productions = {Variable("S"): Regex("a S b"), Variable("N"): Regex("c*")}
+
+    compile_boxes(productions)
+    productions[Variable("S")] = Regex("a S")
+
+    assert len(_boxes_cache) == 2
+    assert compile_boxes(productions)[Variable("N")].is_equivalent_to(
+        Regex("c*").to_epsilon_nfa()
+    )
+    assert len(_boxes_cache) == 3
+
+
+def test_compile_recursive_state_machine():
+
+    for string_extended_contex_free_grammar, _, _, _ in extended_grammars:
+        recursive_state_machine = minimize_recursive_state_machine(
+            recursive_state_machine_from_extended_contex_free_grammar(
+                string_extended_contex_free_grammar, common_starting_symbol
+            )
+        )
+        compiled_recursive_state_machine = compile_recursive_state_machine(
+            recursive_state_machine
+        )
+        binary_matrix = compiled_recursive_state_machine.binary_matrix
+
+        assert compiled_recursive_state_machine.starting_symbol == "S"
+        assert len(compiled_recursive_state_machine.nonterminals) == len(
+            recursive_state_machine.subautomatons
+        )
+        assert len(binary_matrix.indexes) == sum(
+            len(subautomata.states)
+            for subautomata in recursive_state_machine.subautomatons.values()
+        )
+        assert len(compiled_recursive_state_machine.boxes_of_states) == len(
+            binary_matrix.indexes
+        )
+
+        for box, (nonterminal, subautomata) in enumerate(
+            recursive_state_machine.subautomatons.items()
+        ):
+            assert compiled_recursive_state_machine.nonterminals[box] == str(
+                nonterminal.value
+            )
+            assert len(compiled_recursive_state_machine.starting_indexes[box]) == len(
+                subautomata.start_states
+            )
+            assert len(compiled_recursive_state_machine.final_indexes[box]) == len(
+                subautomata.final_states
+            )
+            assert all(
+                compiled_recursive_state_machine.boxes_of_states[index] == box
+                for index in compiled_recursive_state_machine.final_indexes[box]
+            )
+
+
+def test_save_and_load_compiled_recursive_state_machine(tmp_path):
+
+    path = tmp_path / "compiled_recursive_state_machine.npz"
+
+    for string_extended_contex_free_grammar, _, _, _ in extended_grammars:
+        compiled_recursive_state_machine = compile_recursive_state_machine(
+            recursive_state_machine_from_extended_contex_free_grammar(
+                string_extended_contex_free_grammar, common_starting_symbol
+            )
+        )
+        save_compiled_recursive_state_machine(compiled_recursive_state_machine, path)
+        loaded_recursive_state_machine = load_compiled_recursive_state_machine(path)
+
+        assert (
+            loaded_recursive_state_machine.starting_symbol
+            == compiled_recursive_state_machine.starting_symbol
+        )
+        assert (
+            loaded_recursive_state_machine.nonterminals
+            == compiled_recursive_state_machine.nonterminals
+        )
+        assert (
+            loaded_recursive_state_machine.binary_matrix.indexes
+            == compiled_recursive_state_machine.binary_matrix.indexes
+        )
+        assert (
+            loaded_recursive_state_machine.binary_matrix.starting_states
+            == compiled_recursive_state_machine.binary_matrix.starting_states
+        )
+        assert (
+            loaded_recursive_state_machine.binary_matrix.final_states
+            == compiled_recursive_state_machine.binary_matrix.final_states
+        )
+
+        matrix = compiled_recursive_state_machine.binary_matrix.matrix
+        loaded_matrix = loaded_recursive_state_machine.binary_matrix.matrix
+
+        assert matrix.keys() == loaded_matrix.keys()
+        for mark in matrix:
+            assert (matrix[mark] != loaded_matrix[mark]).nnz == 0
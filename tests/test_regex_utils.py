@@ -0,0 +1,63 @@
+import pytest
+
+from pyformlang.finite_automaton import DeterministicFiniteAutomaton, State
+from pyformlang.regular_expression import Regex
+
+from project.utils.automata_utils import gen_min_dfa_by_reg
+from project.utils.bin_matrix_utils import BinaryMatrix
+from project.utils.regex_utils import (
+    RegexExepction,
+    build_binary_matrix_by_reg,
+    parse_regex,
+)
+from common_info import reg_test, batch_regular_request_test, regex_compiler_test
+
+
+def dfa_of_binary_matrix(binary_matrix: BinaryMatrix) -> DeterministicFiniteAutomaton:
+
+    dfa = DeterministicFiniteAutomaton()
+
+    for state in binary_matrix.starting_states:
+        dfa.add_start_state(state)
+    for state in binary_matrix.final_states:
+        dfa.add_final_state(state)
+    for mark, matrix in binary_matrix.matrix.items():
+        for state_from, state_to in zip(*matrix.nonzero()):
+            dfa.add_transition(State(int(state_from)), mark, State(int(state_to)))
+
+    return dfa
+
+
+def test_build_binary_matrix_by_reg():
+
+    regexes = [reg for reg, _ in reg_test] + batch_regular_request_test
+    regexes += regex_compiler_test
+
+    for regex in regexes:
+        expected = gen_min_dfa_by_reg(Regex(regex))
+        for reg in [regex, Regex(regex)]:
+            minimal = build_binary_matrix_by_reg(reg)
+            assert len(minimal.indexes) == len(expected.states)
+            assert dfa_of_binary_matrix(minimal).is_equivalent_to(expected)
+
+            not_minimal = build_binary_matrix_by_reg(reg, minimize=False)
+            assert dfa_of_binary_matrix(not_minimal).is_equivalent_to(expected)
+
+
+def test_build_binary_matrix_by_huge_reg():
+
+    words = [[f"p{i}", f"p{i + 1}", f"p{i * 7 % 13}"] for i in range(2000)]
+    regex = " | ".join(" ".join(word) for word in words)
+
+    dfa = dfa_of_binary_matrix(build_binary_matrix_by_reg(regex))
+
+    for word in words:
+        assert dfa.accepts(word)
+        assert not dfa.accepts(word[:2])
+
+
+def test_misformed_regexes():
+
+    for regex in ["(a", "a)", "* a", "a |", "| a"]:
+        with pytest.raises(RegexExepction):
+            parse_regex(regex)
@@ -0,0 +1,92 @@
+import pytest
+
+import tracemalloc
+
+from pyformlang.regular_expression import Regex
+
+from project.utils.graph_utils import (
+    bfs_regular_request,
+    gen_labeled_two_cycles_graph,
+    regular_request,
+    semiring_regular_request,
+)
+from project.utils.semiring_utils import MIN_PLUS_SEMIRING
+from project.utils.stats_utils import QueryStats, add_stats_hook, remove_stats_hook
+from common_info import regular_request_test, stats_phases_test
+
+
+def test_requests_with_stats():
+
+    for (
+        fst_num_nodes,
+        snd_num_nodes,
+        marks,
+        regex,
+        starting_states,
+        final_states,
+        expected_set,
+    ) in regular_request_test:
+        graph = gen_labeled_two_cycles_graph(fst_num_nodes, snd_num_nodes, marks)
+
+        result, stats = regular_request(
+            graph, starting_states, final_states, Regex(regex), stats=True
+        )
+
+        assert result == expected_set
+        assert isinstance(stats, QueryStats)
+        assert list(stats.phases) == stats_phases_test["regular_request"]
+        assert stats.phases["transitive_closure"].iterations == len(
+            stats.phases["transitive_closure"].nnz
+        )
+        assert stats.wall_time == pytest.approx(
+            sum(phase["wall_time"] for phase in stats.as_dict()["phases"].values())
+        )
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+
+    _, stats = bfs_regular_request(graph, Regex("a* b"), {0}, stats=True)
+    assert list(stats.phases) == stats_phases_test["bfs_regular_request"]
+    assert stats.phases["bfs"].iterations > 0
+
+    _, stats = semiring_regular_request(
+        graph, {0}, set(), Regex("a* b"), MIN_PLUS_SEMIRING, stats=True
+    )
+    assert list(stats.phases) == stats_phases_test["semiring_regular_request"]
+
+
+def test_stats_hook():
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+    exported = []
+    add_stats_hook(exported.append)
+
+    try:
+        result = regular_request(graph, set(), set(), Regex("a*"))
+        bfs_regular_request(graph, Regex("a*"), {0})
+    finally:
+        remove_stats_hook(exported.append)
+
+    regular_request(graph, set(), set(), Regex("a*"))
+
+    assert isinstance(result, set)
+    assert [stats.query for stats in exported] == [
+        "regular_request",
+        "bfs_regular_request",
+    ]
+
+
+def test_peak_allocation_is_traced():
+
+    graph = gen_labeled_two_cycles_graph(3, 2, ("a", "b"))
+
+    _, stats = regular_request(graph, set(), set(), Regex("a*"), stats=True)
+    assert all(phase.peak_allocation is None for phase in stats.phases.values())
+
+    tracemalloc.start()
+    try:
+        _, stats = regular_request(graph, set(), set(), Regex("a*"), stats=True)
+    finally:
+        tracemalloc.stop()
+
+    assert all(phase.peak_allocation >= 0 for phase in stats.phases.values())
+    assert stats.phases["kronecker_product"].peak_allocation > 0